@@ -4,5 +4,11 @@ AI functionality without hardware dependencies
 """
 
 from .ai_processor import AIProcessor, AIResponse, ResponseType
+from .intent_classifier import IntentClassifier, IntentPrediction, load_intent_classifier, load_intent_threshold
+from .response_cache import ResponseCache, CacheConfig, load_cache_config
+from .structured_turn import WormTurn, TurnConfig, TurnStream, load_turn_config, request_turn, stream_turn
 
-__all__ = ['AIProcessor', 'AIResponse', 'ResponseType'] 
\ No newline at end of file
+__all__ = ['AIProcessor', 'AIResponse', 'ResponseType',
+           'IntentClassifier', 'IntentPrediction', 'load_intent_classifier', 'load_intent_threshold',
+           'ResponseCache', 'CacheConfig', 'load_cache_config',
+           'WormTurn', 'TurnConfig', 'TurnStream', 'load_turn_config', 'request_turn', 'stream_turn'] 
\ No newline at end of file
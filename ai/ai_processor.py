@@ -8,10 +8,45 @@ import openai
 import os
 import json
 import time
-from typing import Dict, List, Optional, Tuple
+import asyncio
+import threading
+from typing import Awaitable, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+from .response_cache import ResponseCache, load_cache_config, ANALYZE, CONVERSATION, MOVEMENTS
+from .structured_turn import request_turn_async, load_turn_config, COMMAND_GUIDE
+
+SETTINGS_FILE = "worm_settings.json"
+
+@dataclass
+class AITimeouts:
+    """Per-call time limits in seconds (worm_settings.json -> ai.timeouts)"""
+    turn: float = 10.0
+    reply: float = 10.0
+    analyze: float = 4.0
+    movements: float = 4.0
+    enrichment_grace: float = 0.5   # how long analysis/movements may trail the reply
+
+def load_ai_timeouts(settings_file: str = SETTINGS_FILE) -> AITimeouts:
+    """Read AI timeouts (defaults for anything missing)"""
+    try:
+        with open(settings_file, 'r') as f:
+            timeouts = json.load(f).get("ai", {}).get("timeouts", {})
+        known = AITimeouts.__dataclass_fields__
+        return AITimeouts(**{k: v for k, v in timeouts.items() if k in known})
+    except Exception as e:
+        print(f"⚠️  Could not load AI timeouts: {e}")
+        return AITimeouts()
+
+def _is_json(content: str) -> bool:
+    """Only parseable replies are worth caching"""
+    try:
+        json.loads(content)
+        return True
+    except ValueError:
+        return False
+
 class ResponseType(Enum):
     PREDEFINED = "predefined"
     AI_GENERATED = "ai_generated"
@@ -28,10 +63,21 @@ class AIResponse:
     metadata: Dict = None
 
 class AIProcessor:
-    """Pure AI processor for natural language understanding and generation"""
+    """Pure AI processor for natural language understanding and generation
+
+    Built on AsyncOpenAI: the *_async methods are the implementation, and
+    the plain methods run them on a private event loop thread so
+    synchronous callers keep the old API. Use one style per processor -
+    the client belongs to whichever loop first used it.
+    """
     
-    def __init__(self):
+    def __init__(self, cache: ResponseCache = None):
         self.client = None
+        self.cache = cache or ResponseCache(load_cache_config())
+        self.turn_config = load_turn_config()
+        self.timeouts = load_ai_timeouts()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
         self.setup_openai()
         self.conversation_history = []
         self.personality_context = self._load_personality()
@@ -44,7 +90,7 @@ class AIProcessor:
             return
             
         try:
-            self.client = openai.OpenAI(api_key=api_key)
+            self.client = openai.AsyncOpenAI(api_key=api_key)
             print("✅ OpenAI API ready")
         except Exception as e:
             print(f"⚠️  OpenAI setup failed: {e}")
@@ -87,8 +133,30 @@ class AIProcessor:
         """Check if AI functionality is available"""
         return self.client is not None
     
+    def _run(self, coroutine: Awaitable):
+        """Run a coroutine on the processor's loop thread and wait for its result"""
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._loop_thread = threading.Thread(target=self._loop.run_forever,
+                                                 name="ai-processor", daemon=True)
+            self._loop_thread.start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+    
+    @staticmethod
+    async def _bounded(coroutine: Awaitable, timeout: float, default, label: str):
+        """Await with a time limit - the default on timeout (the call is cancelled)"""
+        try:
+            return await asyncio.wait_for(coroutine, timeout)
+        except asyncio.TimeoutError:
+            print(f"⏱️  {label} timed out after {timeout:.1f}s")
+            return default
+    
     def analyze_input(self, user_input: str) -> Dict:
         """Analyze user input to determine intent and extract information"""
+        return self._run(self.analyze_input_async(user_input))
+    
+    async def analyze_input_async(self, user_input: str) -> Dict:
+        """analyze_input() without blocking the event loop"""
         if not self.is_available():
             return {"intent": "unknown", "confidence": 0.0}
         
@@ -117,14 +185,16 @@ class AIProcessor:
             }}
             """
             
-            response = self.client.chat.completions.create(
+            content = await self.cache.complete_async(
+                self.client, ANALYZE,
                 model="gpt-3.5-turbo",
                 messages=[{"role": "user", "content": prompt}],
+                accept=_is_json,
                 max_tokens=150,
                 temperature=0.3
             )
             
-            result = json.loads(response.choices[0].message.content)
+            result = json.loads(content)
             return result
             
         except Exception as e:
@@ -133,6 +203,15 @@ class AIProcessor:
     
     def generate_response(self, user_input: str, context: Dict = None) -> AIResponse:
         """Generate an AI response to user input"""
+        return self._run(self.generate_response_async(user_input, context))
+    
+    async def generate_response_async(self, user_input: str, context: Dict = None) -> AIResponse:
+        """One structured call, else reply, analysis and movement extraction at once
+
+        Latency is the slowest call, not the sum: the reply has its own time
+        limit, and analysis/movements still running shortly after the reply
+        arrives are cancelled rather than waited for.
+        """
         if not self.is_available():
             return AIResponse(
                 text="I'm sorry, my AI brain isn't working right now!",
@@ -140,62 +219,112 @@ class AIProcessor:
                 confidence=0.0
             )
         
+        # One structured call: analysis and reply together
+        if self.turn_config.enabled:
+            turn = await self._bounded(
+                request_turn_async(self.client, self.cache,
+                                   self._chat_messages(user_input, self.personality_context + "\n\n" + COMMAND_GUIDE),
+                                   self.turn_config),
+                self.timeouts.turn, None, "Structured AI call")
+            if turn is not None:
+                self._remember(user_input, turn.reply_text)
+                return AIResponse(
+                    text=turn.reply_text,
+                    response_type=ResponseType.COMMAND if turn.command else ResponseType.AI_GENERATED,
+                    emotion=turn.emotion,
+                    movement_hint=turn.command,
+                    metadata=turn.to_dict()
+                )
+        
+        # Fallback: the three sub-requests concurrently
+        unknown = {"intent": "unknown", "confidence": 0.0}
+        reply = asyncio.ensure_future(self._bounded(
+            self._reply_async(user_input), self.timeouts.reply, None, "AI reply"))
+        analysis = asyncio.ensure_future(self._bounded(
+            self.analyze_input_async(user_input), self.timeouts.analyze, unknown, "Input analysis"))
+        movements = asyncio.ensure_future(self._bounded(
+            self.extract_movement_commands_async(user_input), self.timeouts.movements, [],
+            "Movement extraction"))
+        extras = [analysis, movements]
+        
+        try:
+            ai_text = await reply
+        except asyncio.CancelledError:
+            for task in extras:
+                task.cancel()
+            raise
+        
+        if ai_text is None:
+            for task in extras:
+                task.cancel()
+            return AIResponse(
+                text="Oops! My circuits are a bit tangled right now. Can you try again?",
+                response_type=ResponseType.AI_GENERATED,
+                confidence=0.0
+            )
+        
+        # The reply is what gets spoken - extras only get a short grace period
+        _, pending = await asyncio.wait(extras, timeout=self.timeouts.enrichment_grace)
+        for task in pending:
+            task.cancel()
+        analysis = analysis.result() if analysis.done() and not analysis.cancelled() else unknown
+        movements = movements.result() if movements.done() and not movements.cancelled() else []
+        
+        self._remember(user_input, ai_text)
+        
+        return AIResponse(
+            text=ai_text,
+            response_type=ResponseType.AI_GENERATED,
+            confidence=analysis.get("confidence", 0.8),
+            emotion=analysis.get("emotion"),
+            movement_hint=analysis.get("movement_request") or (movements[0] if movements else None),
+            metadata=dict(analysis, movements=movements)
+        )
+    
+    async def _reply_async(self, user_input: str) -> Optional[str]:
+        """The conversational reply alone (None on error)"""
         try:
-            # Analyze the input first
-            analysis = self.analyze_input(user_input)
-            
             # Build conversation context
-            messages = [
-                {"role": "system", "content": self.personality_context}
-            ]
-            
-            # Add recent conversation history
-            for entry in self.conversation_history[-5:]:  # Last 5 exchanges
-                messages.append({"role": "user", "content": entry["user"]})
-                messages.append({"role": "assistant", "content": entry["assistant"]})
+            messages = self._chat_messages(user_input, self.personality_context)
             
-            # Add current input
-            messages.append({"role": "user", "content": user_input})
-            
-            response = self.client.chat.completions.create(
+            ai_text = await self.cache.complete_async(
+                self.client, CONVERSATION,
                 model="gpt-4-turbo-preview",
                 messages=messages,
                 max_tokens=200,
                 temperature=0.7
             )
-            
-            ai_text = response.choices[0].message.content.strip()
-            
-            # Store in conversation history
-            self.conversation_history.append({
-                "user": user_input,
-                "assistant": ai_text,
-                "timestamp": time.time()
-            })
-            
-            # Keep only last 10 exchanges
-            if len(self.conversation_history) > 10:
-                self.conversation_history = self.conversation_history[-10:]
-            
-            return AIResponse(
-                text=ai_text,
-                response_type=ResponseType.AI_GENERATED,
-                confidence=analysis.get("confidence", 0.8),
-                emotion=analysis.get("emotion"),
-                movement_hint=analysis.get("movement_request"),
-                metadata=analysis
-            )
+            return ai_text.strip()
             
         except Exception as e:
             print(f"❌ AI response generation error: {e}")
-            return AIResponse(
-                text="Oops! My circuits are a bit tangled right now. Can you try again?",
-                response_type=ResponseType.AI_GENERATED,
-                confidence=0.0
-            )
+            return None
+    
+    def _chat_messages(self, user_input: str, system: str) -> List[Dict]:
+        """System prompt, the last 5 exchanges, then the current input"""
+        messages = [{"role": "system", "content": system}]
+        for entry in self.conversation_history[-5:]:
+            messages.append({"role": "user", "content": entry["user"]})
+            messages.append({"role": "assistant", "content": entry["assistant"]})
+        messages.append({"role": "user", "content": user_input})
+        return messages
+    
+    def _remember(self, user_input: str, reply: str):
+        """Store an exchange in conversation history (last 10 kept)"""
+        self.conversation_history.append({
+            "user": user_input,
+            "assistant": reply,
+            "timestamp": time.time()
+        })
+        if len(self.conversation_history) > 10:
+            self.conversation_history = self.conversation_history[-10:]
     
     def extract_movement_commands(self, text: str) -> List[str]:
         """Extract movement commands from text"""
+        return self._run(self.extract_movement_commands_async(text))
+    
+    async def extract_movement_commands_async(self, text: str) -> List[str]:
+        """extract_movement_commands() without blocking the event loop"""
         if not self.is_available():
             return []
         
@@ -213,14 +342,16 @@ class AIProcessor:
             ["movement1", "movement2"]
             """
             
-            response = self.client.chat.completions.create(
+            content = await self.cache.complete_async(
+                self.client, MOVEMENTS,
                 model="gpt-3.5-turbo",
                 messages=[{"role": "user", "content": prompt}],
+                accept=_is_json,
                 max_tokens=100,
                 temperature=0.2
             )
             
-            movements = json.loads(response.choices[0].message.content)
+            movements = json.loads(content)
             return movements if isinstance(movements, list) else []
             
         except Exception as e:
@@ -261,4 +392,12 @@ class AIProcessor:
     def close(self):
         """Clean up AI resources"""
         self.clear_conversation_history()
+        if self._loop is not None:
+            if self.client is not None:
+                self._run(self.client.close())
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join(timeout=5)
+            self._loop.close()
+            self._loop = None
+        self.cache.close()
         print("🧠 AI processor closed") 
\ No newline at end of file
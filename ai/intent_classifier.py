@@ -0,0 +1,258 @@
+"""
+🧭 WORM INTENT CLASSIFIER
+On-box replacement for the GPT-4 movement translation: hashed bag of
+words (plus bigrams and character trigrams) into a softmax regression
+trained in NumPy
+Predicts one of the nine Arduino commands or "conversation" with a
+confidence; callers go to the API only when the confidence is low
+Trained from the README/help examples, response triggers and inputs the
+API has already labeled (intent_log.jsonl). Only imperative phrasings
+teach a movement - questions and remarks about dancing or moving are
+conversation, whatever the matching response happens to do
+"""
+
+import json
+import os
+import re
+import time
+import zlib
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+COMMANDS = ["fl", "fr", "bl", "br", "b", "om", "cm", "t", "d"]
+CONVERSATION = "conversation"
+LABELS = COMMANDS + [CONVERSATION]
+
+MODEL_FILE = "intent_model.npz"
+INTENT_LOG = "intent_log.jsonl"
+RESPONSES_FILE = "worm_responses.json"
+
+FEATURE_DIM = 4096
+DEFAULT_THRESHOLD = 0.8
+SETTINGS_FILE = "worm_settings.json"
+
+# A response trigger starting with one of these is a request to move
+IMPERATIVE_VERBS = {
+    "move", "go", "turn", "tilt", "lean", "face", "scoot", "wiggle", "reset", "straighten",
+    "stand", "stop", "return", "open", "close", "shut", "zip", "flap", "dance", "boogie", "bust",
+}
+
+# README and help-text phrasings, plus paraphrases of each
+SEED_EXAMPLES: List[Tuple[str, str]] = [
+    ("move forward", "fl"), ("go forward", "fl"), ("wiggle forward", "fl"),
+    ("tilt front left", "fl"), ("lean forward", "fl"), ("scoot ahead", "fl"),
+    ("move front left", "fl"), ("go ahead and move forward", "fl"),
+    ("turn right", "fr"), ("go right", "fr"), ("tilt front right", "fr"),
+    ("lean right", "fr"), ("move to the right", "fr"), ("face right", "fr"),
+    ("lean back", "bl"), ("tilt back left", "bl"), ("lean back left", "bl"),
+    ("move back left", "bl"), ("turn left", "bl"), ("go left", "bl"),
+    ("tilt back right", "br"), ("lean back right", "br"), ("move back right", "br"),
+    ("back up to the right", "br"),
+    ("reset", "b"), ("reset position", "b"), ("go back to neutral", "b"),
+    ("straighten up", "b"), ("stand still", "b"), ("neutral position", "b"),
+    ("stop moving", "b"), ("return to center", "b"),
+    ("open mouth", "om"), ("open your mouth", "om"), ("open wide", "om"),
+    ("say ah", "om"), ("show me your mouth", "om"),
+    ("close mouth", "cm"), ("close your mouth", "cm"), ("shut your mouth", "cm"),
+    ("mouth closed", "cm"), ("zip it", "cm"),
+    ("talk", "t"), ("do the talk sequence", "t"), ("move your mouth", "t"),
+    ("flap your mouth", "t"), ("do the talking animation", "t"),
+    ("dance", "d"), ("dance for me", "d"), ("do a dance", "d"), ("boogie", "d"),
+    ("wiggle", "d"), ("show me your moves", "d"), ("do your dance routine", "d"),
+    ("bust a move", "d"), ("let's dance", "d"),
+    ("how are you", CONVERSATION), ("i love pizza", CONVERSATION),
+    ("what's your name", CONVERSATION), ("tell me a joke", CONVERSATION),
+    ("what is your favorite color", CONVERSATION), ("what is your favorite food", CONVERSATION),
+    ("do you like music", CONVERSATION), ("where do you live", CONVERSATION),
+    ("i had a long day", CONVERSATION), ("good job", CONVERSATION),
+    ("you are funny", CONVERSATION), ("what time is it", CONVERSATION),
+    ("who made you", CONVERSATION), ("are you a real worm", CONVERSATION),
+    ("tell me about yourself", CONVERSATION), ("i'm bored", CONVERSATION),
+    ("what do worms eat", CONVERSATION), ("do you have friends", CONVERSATION),
+    ("that's cool", CONVERSATION), ("thank you", CONVERSATION),
+    ("how old are you", CONVERSATION), ("it's raining outside", CONVERSATION),
+    ("my dog is named max", CONVERSATION), ("can you help me with homework", CONVERSATION),
+    ("what's the weather like", CONVERSATION), ("hello", CONVERSATION),
+    ("good night", CONVERSATION), ("why is the sky blue", CONVERSATION),
+    # Movement words outside a request
+    ("you are a good dancer", CONVERSATION), ("i like the way you move", CONVERSATION),
+    ("do you like dancing", CONVERSATION), ("who taught you to dance", CONVERSATION),
+    ("that dance was awesome", CONVERSATION), ("your dancing is silly", CONVERSATION),
+    ("what kind of music do you dance to", CONVERSATION), ("i went dancing last night", CONVERSATION),
+    ("why is your mouth so big", CONVERSATION), ("does it hurt to open your mouth", CONVERSATION),
+    ("how fast can worms move", CONVERSATION), ("where do you go at night", CONVERSATION),
+    ("i turned eight today", CONVERSATION), ("my mom told me to lean on her", CONVERSATION),
+    ("what is your favorite song", CONVERSATION), ("what is your favorite kind of weather", CONVERSATION),
+    ("what is your favorite movie", CONVERSATION), ("good morning", CONVERSATION),
+    ("nice to see you", CONVERSATION), ("that was amazing", CONVERSATION),
+]
+
+
+def tokenize(text: str) -> List[str]:
+    return re.sub(r"[^a-z0-9' ]+", " ", text.lower()).split()
+
+
+def is_imperative(words: List[str]) -> bool:
+    """A movement request ("dance for me") rather than a question or remark"""
+    return bool(words) and words[0] in IMPERATIVE_VERBS
+
+
+def featurize(text: str, dim: int = FEATURE_DIM) -> np.ndarray:
+    """Hashed feature indices: words, word bigrams and character trigrams"""
+    words = tokenize(text)
+    features = [f"w:{word}" for word in words]
+    features += [f"b:{a} {b}" for a, b in zip(words, words[1:])]
+    for word in words:
+        padded = f" {word} "
+        features += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+    # crc32 rather than hash() - Python salts str hashes per process
+    return np.unique(np.array([zlib.crc32(feature.encode()) % dim for feature in features],
+                              dtype=np.int64))
+
+
+@dataclass
+class IntentPrediction:
+    label: str
+    confidence: float
+    seconds: float = 0.0
+
+    @property
+    def command(self) -> Optional[str]:
+        """The Arduino command, or None for conversation"""
+        return None if self.label == CONVERSATION else self.label
+
+
+class IntentClassifier:
+    """Multinomial logistic regression over hashed features"""
+
+    def __init__(self, dim: int = FEATURE_DIM, labels: List[str] = None):
+        self.dim = dim
+        self.labels = list(labels or LABELS)
+        self.weights = np.zeros((dim, len(self.labels)), dtype=np.float32)
+        self.bias = np.zeros(len(self.labels), dtype=np.float32)
+
+    def _matrix(self, texts: List[str]) -> np.ndarray:
+        """L2-normalized binary feature rows"""
+        X = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            indices = featurize(text, self.dim)
+            if len(indices):
+                X[row, indices] = 1.0 / np.sqrt(len(indices))
+        return X
+
+    def fit(self, texts: List[str], labels: List[str], epochs: int = 400,
+            learning_rate: float = 2.0, l2: float = 1e-4) -> "IntentClassifier":
+        """Full-batch gradient descent on class-balanced cross-entropy"""
+        X = self._matrix(texts)
+        y = np.array([self.labels.index(label) for label in labels])
+        Y = np.eye(len(self.labels), dtype=np.float32)[y]
+        # Every class counts the same, however many examples it has
+        counts = np.bincount(y, minlength=len(self.labels)).astype(np.float32)
+        sample_weight = (len(y) / (len(self.labels) * np.maximum(counts, 1)))[y][:, None]
+
+        W = np.zeros((self.dim, len(self.labels)), dtype=np.float32)
+        b = np.zeros(len(self.labels), dtype=np.float32)
+        for _ in range(epochs):
+            logits = X @ W + b
+            logits -= logits.max(axis=1, keepdims=True)
+            probs = np.exp(logits)
+            probs /= probs.sum(axis=1, keepdims=True)
+            error = (probs - Y) * sample_weight / len(y)
+            W -= learning_rate * (X.T @ error + l2 * W)
+            b -= learning_rate * error.sum(axis=0)
+        self.weights, self.bias = W, b
+        return self
+
+    def predict(self, text: str) -> IntentPrediction:
+        """Classify one input - a few dozen row lookups and a softmax"""
+        started = time.perf_counter()
+        indices = featurize(text, self.dim)
+        logits = self.bias.copy()
+        if len(indices):
+            logits += self.weights[indices].sum(axis=0) / np.sqrt(len(indices))
+        probs = np.exp(logits - logits.max())
+        probs /= probs.sum()
+        best = int(np.argmax(probs))
+        return IntentPrediction(self.labels[best], float(probs[best]), time.perf_counter() - started)
+
+    def save(self, path: str = MODEL_FILE):
+        np.savez(path, weights=self.weights, bias=self.bias, labels=np.array(self.labels))
+
+    @classmethod
+    def load(cls, path: str = MODEL_FILE) -> "IntentClassifier":
+        data = np.load(path)
+        model = cls(dim=data["weights"].shape[0], labels=[str(label) for label in data["labels"]])
+        model.weights = data["weights"]
+        model.bias = data["bias"]
+        return model
+
+
+def training_examples(responses_file: str = RESPONSES_FILE,
+                      log_file: str = INTENT_LOG) -> List[Tuple[str, str]]:
+    """Seed examples, response triggers and logged API labels
+
+    A response trigger teaches its response's Arduino command only when it
+    is phrased as a request ("dance for me"); any other trigger ("what is
+    your favorite kind of dirt") is conversation, even if the worm moves
+    while it answers.
+    """
+    examples = list(SEED_EXAMPLES)
+
+    try:
+        with open(responses_file, 'r') as f:
+            responses = json.load(f).get("responses", {})
+        for key, entry in responses.items():
+            words = tokenize(key.replace("_", " "))
+            movement = entry.get("movement")
+            commanded = movement in COMMANDS and movement != "t" and is_imperative(words)
+            examples.append((" ".join(words), movement if commanded else CONVERSATION))
+    except Exception as e:
+        print(f"⚠️  Could not read {responses_file} for intent training: {e}")
+
+    if os.path.exists(log_file):
+        with open(log_file, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get("label") in LABELS and record.get("text"):
+                    examples.append((record["text"], record["label"]))
+
+    return examples
+
+
+def log_example(text: str, label: str, log_file: str = INTENT_LOG):
+    """Remember an API-labeled input for the next training run"""
+    try:
+        with open(log_file, 'a') as f:
+            f.write(json.dumps({"text": text, "label": label}) + "\n")
+    except Exception as e:
+        print(f"⚠️  Could not log intent example: {e}")
+
+
+def load_intent_threshold(settings_file: str = SETTINGS_FILE) -> float:
+    """Confidence needed to act on a local prediction (worm_settings.json -> ai.intent_threshold)
+
+    Separate from ai_confidence_threshold: a wrong local answer moves the
+    worm with no API call to catch it, so this one is set higher.
+    """
+    try:
+        with open(settings_file, 'r') as f:
+            return float(json.load(f).get("ai", {}).get("intent_threshold", DEFAULT_THRESHOLD))
+    except Exception as e:
+        print(f"⚠️  Could not load intent threshold: {e}")
+        return DEFAULT_THRESHOLD
+
+
+def load_intent_classifier(model_file: str = MODEL_FILE) -> IntentClassifier:
+    """The trained model from train_intent_classifier.py, or one trained now"""
+    if os.path.exists(model_file):
+        try:
+            return IntentClassifier.load(model_file)
+        except Exception as e:
+            print(f"⚠️  Could not load {model_file}: {e} - retraining")
+    texts, labels = zip(*training_examples())
+    return IntentClassifier().fit(list(texts), list(labels))
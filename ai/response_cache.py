@@ -0,0 +1,253 @@
+"""
+🗄️ WORM AI RESPONSE CACHE
+Disk-backed (SQLite) cache of OpenAI chat completions, so the same
+question every show costs one API call instead of one per show
+Keys are a hash of the canonical request (model, messages, parameters);
+each call type has its own TTL, and the table is capped by entry count
+(least recently used go first)
+
+Temperature 0 calls are deterministic and always cached. Sampled calls
+(temperature > 0) are only cached in "variants" mode: the first k replies
+are stored and later calls pick one of them at random
+"""
+
+import hashlib
+import json
+import random
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+
+SETTINGS_FILE = "worm_settings.json"
+
+# Call types
+TRANSLATE = "translate"         # natural language -> Arduino command
+CONVERSATION = "conversation"   # conversational replies
+ANALYZE = "analyze"             # AIProcessor.analyze_input
+MOVEMENTS = "movements"         # AIProcessor.extract_movement_commands
+TURN = "turn"                   # one structured call: intent, command and reply
+
+# Never part of the key - they change how the reply arrives, not what it says
+TRANSPORT_PARAMS = {"stream", "timeout"}
+
+
+@dataclass
+class CacheConfig:
+    """Response cache settings (worm_settings.json -> ai.cache)"""
+    enabled: bool = True
+    path: str = "ai_cache.sqlite3"
+    max_entries: int = 5000
+    variants: int = 0               # replies kept per sampled request (0 = never cache them)
+    ttl_hours: Dict[str, float] = field(default_factory=lambda: {
+        TRANSLATE: 24 * 30,
+        MOVEMENTS: 24 * 30,
+        ANALYZE: 24 * 7,
+        CONVERSATION: 24,
+        TURN: 24,
+    })
+    default_ttl_hours: float = 24
+
+
+def load_cache_config(settings_file: str = SETTINGS_FILE) -> CacheConfig:
+    """Read cache settings (defaults for anything missing)"""
+    try:
+        with open(settings_file, 'r') as f:
+            cache = json.load(f).get("ai", {}).get("cache", {})
+        known = CacheConfig.__dataclass_fields__
+        config = CacheConfig(**{k: v for k, v in cache.items() if k in known and k != "ttl_hours"})
+        config.ttl_hours.update(cache.get("ttl_hours", {}))
+        return config
+    except Exception as e:
+        print(f"⚠️  Could not load AI cache settings: {e}")
+        return CacheConfig()
+
+
+def request_key(model: str, messages: list, **params) -> str:
+    """SHA-256 of the request in canonical form
+
+    Key order, surrounding whitespace in message text, unset parameters and
+    transport-only parameters (stream, timeout) never change the key.
+    """
+    canonical = {
+        "model": model,
+        "messages": [{"role": message["role"], "content": str(message["content"]).strip()}
+                     for message in messages],
+        "params": {name: value for name, value in params.items()
+                   if value is not None and name not in TRANSPORT_PARAMS},
+    }
+    encoded = json.dumps(canonical, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def is_deterministic(params: Dict) -> bool:
+    return params.get("temperature", 1.0) == 0
+
+
+class ResponseCache:
+    """SQLite table of request key -> reply text (one row per stored variant)"""
+
+    def __init__(self, config: CacheConfig = None):
+        self.config = config or CacheConfig()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if self.config.enabled:
+            try:
+                self._db = sqlite3.connect(self.config.path, check_same_thread=False)
+                self._db.execute("""
+                    CREATE TABLE IF NOT EXISTS responses (
+                        key TEXT NOT NULL,
+                        variant INTEGER NOT NULL,
+                        kind TEXT NOT NULL,
+                        content TEXT NOT NULL,
+                        created REAL NOT NULL,
+                        expires REAL NOT NULL,
+                        last_used REAL NOT NULL,
+                        PRIMARY KEY (key, variant)
+                    )""")
+                self._db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+                self.purge_expired()
+            except sqlite3.Error as e:
+                print(f"⚠️  AI cache disabled ({self.config.path}): {e}")
+                self._db = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._db is not None
+
+    def cacheable(self, params: Dict) -> bool:
+        return self.enabled and (is_deterministic(params) or self.config.variants > 0)
+
+    def _ttl_seconds(self, kind: str) -> float:
+        return self.config.ttl_hours.get(kind, self.config.default_ttl_hours) * 3600
+
+    def lookup(self, kind: str, model: str, messages: list, **params) -> Optional[str]:
+        """A stored reply for this request, or None if the API should be asked
+
+        In variants mode a sampled request misses until k replies are stored.
+        """
+        if not self.cacheable(params):
+            return None
+        key = request_key(model, messages, **params)
+        now = time.time()
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT variant, content FROM responses WHERE key = ? AND expires > ?",
+                (key, now)).fetchall()
+            wanted = 1 if is_deterministic(params) else self.config.variants
+            if len(rows) < wanted:
+                self.misses += 1
+                return None
+            variant, content = random.choice(rows)
+            self._db.execute("UPDATE responses SET last_used = ? WHERE key = ? AND variant = ?",
+                             (now, key, variant))
+            self._db.commit()
+            self.hits += 1
+            return content
+
+    def store(self, kind: str, content: str, model: str, messages: list, **params):
+        """Remember a reply (as the next variant for sampled requests)"""
+        if not self.cacheable(params):
+            return
+        key = request_key(model, messages, **params)
+        now = time.time()
+        try:
+            with self._lock:
+                self._db.execute("DELETE FROM responses WHERE key = ? AND expires <= ?", (key, now))
+                variant = self._db.execute(
+                    "SELECT COALESCE(MAX(variant) + 1, 0) FROM responses WHERE key = ?",
+                    (key,)).fetchone()[0]
+                if is_deterministic(params):
+                    variant = 0
+                # Another caller may already have stored the k-th variant
+                if is_deterministic(params) or variant < self.config.variants:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (key, variant, kind, content, now, now + self._ttl_seconds(kind), now))
+                    self._evict()
+                self._db.commit()
+        except sqlite3.Error as e:
+            print(f"⚠️  AI cache write failed: {e}")
+
+    def _evict(self):
+        """Drop least recently used rows beyond max_entries (lock held)"""
+        count = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        excess = count - self.config.max_entries
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM responses WHERE rowid IN "
+                "(SELECT rowid FROM responses ORDER BY last_used LIMIT ?)", (excess,))
+            self.evictions += excess
+
+    def complete(self, client, kind: str, model: str, messages: list,
+                 accept: Callable[[str], bool] = None, **params) -> str:
+        """chat.completions.create through the cache - returns the reply text
+
+        accept: replies it rejects (unparseable JSON, invalid commands) are
+        returned but not stored, so a bad answer is never replayed
+        """
+        cached = self.lookup(kind, model, messages, **params)
+        if cached is not None:
+            return cached
+        response = client.chat.completions.create(model=model, messages=messages, **params)
+        content = response.choices[0].message.content or ""
+        if accept is None or accept(content):
+            self.store(kind, content, model, messages, **params)
+        return content
+
+    async def complete_async(self, client, kind: str, model: str, messages: list,
+                             accept: Callable[[str], bool] = None, **params) -> str:
+        """complete() for an AsyncOpenAI client (the SQLite side stays synchronous - it is fast)"""
+        cached = self.lookup(kind, model, messages, **params)
+        if cached is not None:
+            return cached
+        response = await client.chat.completions.create(model=model, messages=messages, **params)
+        content = response.choices[0].message.content or ""
+        if accept is None or accept(content):
+            self.store(kind, content, model, messages, **params)
+        return content
+
+    def purge_expired(self) -> int:
+        if not self.enabled:
+            return 0
+        with self._lock:
+            removed = self._db.execute("DELETE FROM responses WHERE expires <= ?",
+                                       (time.time(),)).rowcount
+            self._db.commit()
+        return removed
+
+    def clear(self):
+        if self.enabled:
+            with self._lock:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get_metrics(self) -> dict:
+        entries = 0
+        if self.enabled:
+            with self._lock:
+                entries = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {
+            "enabled": self.enabled,
+            "entries": entries,
+            "max_entries": self.config.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "evictions": self.evictions,
+        }
+
+    def close(self):
+        if self._db is not None:
+            with self._lock:
+                self._db.close()
+            self._db = None
@@ -0,0 +1,332 @@
+"""
+🧩 WORM STRUCTURED TURN
+One chat completion that both understands and answers an input:
+    {intent, arduino_command, emotion, mouth_movements, reply_text}
+Requested with a strict JSON schema (OpenAI structured outputs) and
+validated against the same schema on arrival, so callers can fall back to
+the separate translate / converse calls whenever it is missing or malformed
+Structured outputs keep the schema's key order, so with reply_text last a
+streamed turn can start moving as soon as the command arrives and speak
+the reply while it is still being written
+"""
+
+import json
+import re
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, Iterator, List, Optional
+
+from .response_cache import ResponseCache, TURN
+
+SETTINGS_FILE = "worm_settings.json"
+
+COMMANDS = ["fl", "fr", "bl", "br", "b", "om", "cm", "t", "d"]
+INTENTS = ["command", "question", "conversation", "compliment", "greeting"]
+EMOTIONS = ["happy", "sad", "excited", "neutral", "playful", "thoughtful"]
+
+TURN_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "intent": {"type": "string", "enum": INTENTS},
+        "arduino_command": {"type": ["string", "null"], "enum": COMMANDS + [None]},
+        "emotion": {"type": "string", "enum": EMOTIONS},
+        "mouth_movements": {"type": "integer", "enum": [1, 2]},
+        "reply_text": {"type": "string"},    # last - it is streamed to speech
+    },
+    "required": ["intent", "arduino_command", "emotion", "mouth_movements", "reply_text"],
+    "additionalProperties": False,
+}
+
+RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "worm_turn", "strict": True, "schema": TURN_SCHEMA},
+}
+
+COMMAND_GUIDE = """Arduino commands - set arduino_command ONLY for a clear movement or action request:
+- fl = tilt front left (moving forward)
+- fr = tilt front right (turning right)
+- bl = tilt back left (tilting back left)
+- br = tilt back right (tilting back right)
+- b  = reset to neutral position
+- om = open mouth
+- cm = close mouth
+- t  = choreographed talking sequence
+- d  = dance sequence
+For conversation, questions or statements (like "how are you", "I love pizza") use null.
+Always write reply_text - what the worm says, also when it moves or opens/closes its mouth.
+mouth_movements: 1 for a 6-syllable reply, 2 for a 12-syllable reply."""
+
+_JSON_TYPES = {"string": str, "integer": int, "object": dict, "null": type(None)}
+
+
+@dataclass
+class TurnConfig:
+    """Structured turn settings (worm_settings.json -> ai.structured_turn)"""
+    enabled: bool = True
+    model: str = "gpt-4o"           # structured outputs need gpt-4o or newer
+    temperature: float = 0.7
+    max_tokens: int = 120
+
+
+def load_turn_config(settings_file: str = SETTINGS_FILE) -> TurnConfig:
+    """Read structured turn settings (defaults for anything missing)"""
+    try:
+        with open(settings_file, 'r') as f:
+            turn = json.load(f).get("ai", {}).get("structured_turn", {})
+        known = TurnConfig.__dataclass_fields__
+        return TurnConfig(**{k: v for k, v in turn.items() if k in known})
+    except Exception as e:
+        print(f"⚠️  Could not load structured turn settings: {e}")
+        return TurnConfig()
+
+
+@dataclass
+class WormTurn:
+    """What to do with an input and what to say"""
+    intent: str
+    arduino_command: Optional[str]
+    emotion: str
+    mouth_movements: int
+    reply_text: str
+
+    @property
+    def command(self) -> Optional[str]:
+        """The Arduino command, or None for conversation"""
+        return self.arduino_command if self.intent == "command" else None
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def schema_errors(value, schema: Dict = TURN_SCHEMA, path: str = "turn") -> List[str]:
+    """Check a value against the subset of JSON Schema used by TURN_SCHEMA"""
+    types = schema.get("type")
+    if types is not None:
+        allowed = tuple(_JSON_TYPES[name] for name in ([types] if isinstance(types, str) else types))
+        # bool is an int subclass, but never a valid integer here
+        if not isinstance(value, allowed) or (isinstance(value, bool) and bool not in allowed):
+            return [f"{path}: expected {types}, got {type(value).__name__}"]
+    if "enum" in schema and value not in schema["enum"]:
+        return [f"{path}: {value!r} is not one of {schema['enum']}"]
+
+    errors = []
+    if isinstance(value, dict):
+        properties = schema.get("properties", {})
+        for name in schema.get("required", []):
+            if name not in value:
+                errors.append(f"{path}.{name}: missing")
+        if schema.get("additionalProperties") is False:
+            errors += [f"{path}.{name}: unexpected" for name in value if name not in properties]
+        for name, subschema in properties.items():
+            if name in value:
+                errors += schema_errors(value[name], subschema, f"{path}.{name}")
+    return errors
+
+
+def _half_answer(turn: WormTurn) -> bool:
+    """A command intent without a command (or the reverse)"""
+    return (turn.intent == "command") != (turn.arduino_command is not None)
+
+
+def parse_turn(content: str) -> Optional[WormTurn]:
+    """A WormTurn if the reply is valid JSON matching TURN_SCHEMA, else None"""
+    try:
+        data = json.loads(content)
+    except (TypeError, ValueError):
+        return None
+    if schema_errors(data):
+        return None
+    turn = WormTurn(**data)
+    if _half_answer(turn):
+        return None
+    if not turn.reply_text.strip():
+        return None
+    return turn
+
+
+def _turn_request(messages: list, config: TurnConfig) -> Dict:
+    return {
+        "model": config.model,
+        "messages": messages,
+        "accept": lambda reply: parse_turn(reply) is not None,
+        "response_format": RESPONSE_FORMAT,
+        "temperature": config.temperature,
+        "max_tokens": config.max_tokens,
+    }
+
+
+def _checked_turn(content: str) -> Optional[WormTurn]:
+    turn = parse_turn(content)
+    if turn is None:
+        print("⚠️  Structured AI reply did not match the schema")
+    return turn
+
+
+def request_turn(client, cache: ResponseCache, messages: list,
+                 config: TurnConfig = None) -> Optional[WormTurn]:
+    """One structured completion - None on any API error or invalid reply"""
+    try:
+        content = cache.complete(client, TURN, **_turn_request(messages, config or TurnConfig()))
+    except Exception as e:
+        print(f"⚠️  Structured AI call failed: {e}")
+        return None
+    return _checked_turn(content)
+
+
+async def request_turn_async(client, cache: ResponseCache, messages: list,
+                             config: TurnConfig = None) -> Optional[WormTurn]:
+    """request_turn() for an AsyncOpenAI client"""
+    try:
+        content = await cache.complete_async(client, TURN, **_turn_request(messages, config or TurnConfig()))
+    except Exception as e:
+        print(f"⚠️  Structured AI call failed: {e}")
+        return None
+    return _checked_turn(content)
+
+
+# Everything before reply_text, up to its opening quote
+_REPLY_START = re.compile(r'"reply_text"\s*:\s*"')
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class TurnStream:
+    """A structured turn read off a streamed completion
+
+    head() returns the turn as soon as every field before reply_text has
+    arrived (with reply_text still empty); reply() then yields the reply as
+    the model writes it. Once reply() is exhausted, turn holds the whole
+    validated turn (None if the finished reply did not match the schema).
+    """
+
+    def __init__(self, chunks: Iterator[str], on_complete: Callable[[str], None] = None):
+        self._chunks = chunks
+        self._on_complete = on_complete
+        self._content = ""
+        self._head_end: Optional[int] = None   # index of the "reply_text" key
+        self._reply_at: Optional[int] = None   # index of the first reply_text character
+        self._finished = False
+        self.turn: Optional[WormTurn] = None
+
+    def _pull(self) -> bool:
+        """Read one more chunk - False once the completion has ended"""
+        try:
+            self._content += next(self._chunks)
+            return True
+        except StopIteration:
+            return False
+
+    def head(self) -> Optional[WormTurn]:
+        """Intent, command, emotion and mouth plan - None if the turn is invalid"""
+        try:
+            while self._reply_at is None:
+                match = _REPLY_START.search(self._content)
+                if match is not None:
+                    self._head_end, self._reply_at = match.start(), match.end()
+                elif not self._pull():
+                    break
+
+            data = None
+            if self._reply_at is not None:
+                try:
+                    data = json.loads(self._content[:self._head_end].rstrip().rstrip(",") + "}")
+                    data["reply_text"] = ""
+                except ValueError:
+                    data = None
+            if data is None or schema_errors(data):
+                # Keys out of order or malformed - judge the whole reply instead
+                while self._pull():
+                    pass
+                self._finish()
+                return self.turn
+        except Exception as e:
+            print(f"⚠️  Structured AI stream failed: {e}")
+            return None
+
+        head = WormTurn(**data)
+        return None if _half_answer(head) else head
+
+    def reply(self) -> Iterator[str]:
+        """reply_text, decoded piece by piece as it streams"""
+        if self._finished:
+            # Read whole by head() - nothing left to stream
+            if self.turn is not None:
+                yield self.turn.reply_text
+            return
+
+        position = self._reply_at
+        try:
+            while True:
+                text, position, closed = self._decode(position)
+                if text:
+                    yield text
+                if closed:
+                    break
+                if not self._pull():
+                    break
+            while self._pull():
+                pass
+        except Exception as e:
+            print(f"⚠️  Structured AI stream failed: {e}")
+            return
+        self._finish()
+
+    def _decode(self, position: int):
+        """Decode the JSON string from position as far as it has arrived"""
+        content, pieces = self._content, []
+        while position < len(content):
+            char = content[position]
+            if char == '"':
+                return "".join(pieces), position + 1, True
+            if char != "\\":
+                pieces.append(char)
+                position += 1
+                continue
+            # An escape split across chunks waits for the rest
+            if position + 1 >= len(content):
+                break
+            code = content[position + 1]
+            if code == "u":
+                # Characters outside the BMP come as a surrogate pair of escapes
+                if position + 6 > len(content):
+                    break
+                width = 12 if 0xD800 <= int(content[position + 2:position + 6], 16) < 0xDC00 else 6
+                if position + width > len(content):
+                    break
+                pieces.append(json.loads(f'"{content[position:position + width]}"'))
+                position += width
+            else:
+                pieces.append(_ESCAPES.get(code, code))
+                position += 2
+        return "".join(pieces), position, False
+
+    def _finish(self):
+        self._finished = True
+        self.turn = _checked_turn(self._content)
+        if self.turn is not None and self._on_complete is not None:
+            self._on_complete(self._content)
+
+
+def stream_turn(client, cache: ResponseCache, messages: list,
+                config: TurnConfig = None) -> Optional[TurnStream]:
+    """request_turn() as a stream - None if the request could not be made"""
+    request = _turn_request(messages, config or TurnConfig())
+    accept = request.pop("accept")
+    cached = cache.lookup(TURN, **request)
+    if cached is not None:
+        return TurnStream(iter([cached]))
+
+    try:
+        response = client.chat.completions.create(stream=True, **request)
+    except Exception as e:
+        print(f"⚠️  Structured AI call failed: {e}")
+        return None
+
+    def chunks() -> Iterator[str]:
+        for chunk in response:
+            if chunk.choices:
+                yield chunk.choices[0].delta.content or ""
+
+    def remember(content: str):
+        if accept(content):
+            cache.store(TURN, content, **request)
+
+    return TurnStream(chunks(), remember)
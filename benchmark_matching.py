@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+📈 WORM MATCHING SCALABILITY BENCHMARK
+Generates synthetic worm_responses.json libraries (1k, 10k, 100k
+responses by default, configurable trigger lengths) and input corpora of
+hits, near-misses (one typo per telling word) and misses, then times every
+matching strategy against them and reports accuracy, throughput, latency
+percentiles, build time and memory as JSON
+
+Strategies:
+    linear_scan     the pre-index loop (key phrases, then keywords, one by one)
+    store_exact     ResponseStore.find
+    config_manager  ConfigManager.find_response
+    trigger_index   Aho-Corasick containment
+    fuzzy           char n-gram TF-IDF
+    phonetic        sound-alike keys
+    pipeline        what worm_system.resolve_response runs
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config_manager import ConfigManager
+from matching import (build_trigger_index, build_fuzzy_matcher, build_phonetic_index, best_match,
+                      load_fuzzy_threshold, load_phonetic_threshold, normalize_input, phonetic_key)
+from response_store import ResponseStore, normalize_trigger
+
+ONSETS = ["b", "d", "f", "g", "h", "k", "l", "m", "n", "p", "r", "s", "t", "v", "w",
+          "bl", "br", "cr", "dr", "fl", "gr", "pl", "sh", "sl", "st", "th", "tr"]
+NUCLEI = ["a", "e", "i", "o", "u", "ai", "ee", "oo", "ou"]
+CODAS = ["", "", "", "n", "m", "t", "ck", "ng", "rd", "sh", "st"]
+# Misses are built from onsets the libraries never use
+MISS_ONSETS = ["j", "y", "z", "qu", "ch", "sk", "sp", "sw", "gl", "kn"]
+
+MOVEMENTS = ["fl", "fr", "bl", "br", "b", "t", "d", "choreographedTalk"]
+FILLER = ["hey worm", "can you", "please", "ok", "so", "now", "tell me"]
+CONVERSATION = ["what did you have for lunch", "i think it might rain today",
+                "how was your weekend", "my cousin is visiting tomorrow"]
+
+DEFAULT_SIZES = "1000,10000,100000"
+DEFAULT_LENGTHS = "1:0.1,2:0.3,3:0.35,4:0.2,5:0.05"
+STRATEGIES = ["linear_scan", "store_exact", "config_manager", "trigger_index",
+              "fuzzy", "phonetic", "pipeline"]
+
+HIT = "hit"
+NEAR_MISS = "near_miss"
+MISS = "miss"
+
+
+def parse_lengths(spec: str) -> Tuple[List[int], List[float]]:
+    """"2:0.3,3:0.7" -> trigger word counts and their probabilities"""
+    lengths, weights = [], []
+    for part in spec.split(","):
+        words, weight = part.split(":")
+        lengths.append(int(words))
+        weights.append(float(weight))
+    total = sum(weights)
+    return lengths, [weight / total for weight in weights]
+
+
+def make_word(rng: random.Random, onsets: List[str]) -> str:
+    return "".join(rng.choice(onsets) + rng.choice(NUCLEI) + rng.choice(CODAS)
+                   for _ in range(rng.choice([1, 1, 2, 2, 3])))
+
+
+def make_vocabulary(rng: random.Random, size: int, onsets: List[str],
+                    exclude: frozenset = frozenset()) -> List[str]:
+    words = set()
+    while len(words) < size:
+        word = make_word(rng, onsets)
+        if len(word) > 2 and word not in exclude:
+            words.add(word)
+    return sorted(words)
+
+
+def generate_library(size: int, lengths: Tuple[List[int], List[float]], rng: random.Random,
+                     alias_rate: float = 0.2, keyword_rate: float = 0.05,
+                     custom_rate: float = 0.1) -> Dict:
+    """A worm_responses.json document with `size` keyed responses
+
+    Some responses get an alias and a keyword (like the hand-written
+    library); a share of extra custom/* entries with triggers exercises
+    the categorized schema too.
+    """
+    vocabulary = make_vocabulary(rng, max(200, int(size ** 0.75) * 4), ONSETS)
+    word_counts, weights = lengths
+
+    def phrase(taken: set) -> str:
+        while True:
+            words = rng.choices(vocabulary, k=rng.choices(word_counts, weights)[0])
+            candidate = " ".join(words)
+            if candidate not in taken:
+                taken.add(candidate)
+                return candidate
+
+    taken = set()
+    responses = {}
+    for _ in range(size):
+        trigger = phrase(taken)
+        entry = {
+            "speech": f"Synthetic reply to {trigger}",
+            "movement": rng.choice(MOVEMENTS),
+            "mouth_movements": rng.randint(1, 3),
+        }
+        if rng.random() < alias_rate:
+            entry["aliases"] = [phrase(taken)]
+        if rng.random() < keyword_rate:
+            entry["keywords"] = [max(trigger.split(), key=len)]
+        responses[trigger.replace(" ", "_")] = entry
+
+    custom = {"synthetic": [
+        {"text": f"Custom reply {i}", "movement": rng.choice(MOVEMENTS), "emotion": "happy",
+         "trigger": phrase(taken)}
+        for i in range(int(size * custom_rate))
+    ]}
+    return {
+        "startup_message": "Synthetic library",
+        "responses": responses,
+        "custom": custom,
+        "fallbacks": [{"text": "I'm not sure about that", "movement": "t"}],
+        "system_messages": {"command_failed": "Command failed"},
+    }
+
+
+def misspell(word: str, rng: random.Random) -> str:
+    """One substitution, deletion or transposition"""
+    if len(word) < 4:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    kind = rng.choice(["substitute", "delete", "transpose"])
+    if kind == "substitute":
+        return word[:i] + rng.choice("aeioudtnmrs") + word[i + 1:]
+    if kind == "delete":
+        return word[:i] + word[i + 1:]
+    return word[:i - 1] + word[i] + word[i - 1] + word[i + 1:]
+
+
+def generate_corpus(library: Dict, count: int, rng: random.Random) -> List[Tuple[str, str, Optional[str]]]:
+    """(kind, text, expected response key) - a third each of hits, near-misses and misses"""
+    keys = list(library["responses"])
+    used = {word for key in keys for word in key.split("_")}
+    # Neither spelled nor sounding like any library word
+    sounds = {phonetic_key(word) for word in used}
+    miss_words = [word for word in make_vocabulary(rng, 2000, MISS_ONSETS, frozenset(used))
+                  if phonetic_key(word) not in sounds][:500] or ["zyzzyva"]
+    corpus = []
+    for i in range(count):
+        kind = (HIT, NEAR_MISS, MISS)[i % 3]
+        if kind == MISS:
+            if rng.random() < 0.5:
+                text = rng.choice(CONVERSATION)
+            else:
+                text = " ".join(rng.choices(miss_words, k=rng.randint(2, 5)))
+            corpus.append((MISS, text, None))
+            continue
+
+        key = rng.choice(keys)
+        text = key.replace("_", " ")
+        if kind == NEAR_MISS:
+            text = " ".join(misspell(word, rng) for word in text.split())
+            if normalize_trigger(text) == normalize_trigger(key):
+                kind = HIT  # every word too short to misspell
+        if rng.random() < 0.5:
+            text = f"{rng.choice(FILLER)} {text}"
+        corpus.append((kind, text, key))
+    rng.shuffle(corpus)
+    return corpus
+
+
+class LinearScan:
+    """The matching worm_system did before the trigger index, for comparison"""
+
+    def __init__(self, responses: Dict):
+        self.responses = responses.get("responses", {})
+        self.keywords = [(keyword, key) for key, entry in self.responses.items()
+                         for keyword in entry.get("keywords", [])]
+
+    def find(self, text: str) -> Optional[str]:
+        for key in self.responses:
+            if key.replace("_", " ") in text:
+                return key
+        for keyword, key in self.keywords:
+            if keyword in text:
+                return key
+        return None
+
+
+def measure_build(build: Callable, memory: bool) -> Tuple[object, dict]:
+    """Build a structure, timing it; optionally build again under tracemalloc"""
+    started = time.perf_counter()
+    built = build()
+    report = {"build_seconds": time.perf_counter() - started}
+    if memory:
+        # Tracing slows allocation down, so it gets its own build
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        traced = build()
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        retained = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+        report["memory_bytes"] = retained
+        report["peak_bytes"] = peak
+        del traced
+    return built, report
+
+
+def build_strategies(library: Dict, path: str, threshold: float, phonetic_threshold: float,
+                     wanted: List[str], memory: bool) -> Tuple[Dict[str, Callable], Dict[str, dict]]:
+    """Lookup functions (normalized text -> response key or None) and their build costs"""
+    builds: Dict[str, dict] = {}
+
+    def load_store():
+        store = ResponseStore(path)
+        store.load()
+        return store
+
+    def load_config_manager():
+        with contextlib.redirect_stdout(sys.stderr):
+            return ConfigManager(path)
+
+    store = index = fuzzy = phonetic = None
+    if {"store_exact", "pipeline"} & set(wanted):
+        store, builds["store"] = measure_build(load_store, memory)
+    if {"trigger_index", "pipeline"} & set(wanted):
+        index, builds["trigger_index"] = measure_build(lambda: build_trigger_index(library), memory)
+    if {"fuzzy", "pipeline"} & set(wanted):
+        fuzzy, builds["fuzzy"] = measure_build(lambda: build_fuzzy_matcher(library), memory)
+    if {"phonetic", "pipeline"} & set(wanted):
+        phonetic, builds["phonetic"] = measure_build(lambda: build_phonetic_index(library), memory)
+
+    def key_of(match) -> Optional[str]:
+        return match.key if match is not None else None
+
+    def pipeline(text: str) -> Optional[str]:
+        entry = store.find(text)
+        if entry is not None:
+            return entry.name
+        hit = index.best(text)
+        if hit is not None:
+            return hit.key
+        return key_of(best_match(text, (fuzzy, threshold), (phonetic, phonetic_threshold)))
+
+    strategies: Dict[str, Callable] = {}
+    if "linear_scan" in wanted:
+        scan, builds["linear_scan"] = measure_build(lambda: LinearScan(library), memory)
+        strategies["linear_scan"] = scan.find
+    if "store_exact" in wanted:
+        def store_exact(text: str) -> Optional[str]:
+            entry = store.find(text)
+            return entry.name if entry is not None else None
+        strategies["store_exact"] = store_exact
+    if "config_manager" in wanted:
+        manager, builds["config_manager"] = measure_build(load_config_manager, memory)
+
+        def config_manager(text: str) -> Optional[str]:
+            response = manager.find_response(text)
+            # A fallback (no trigger) means nothing matched
+            return response.triggers[0] if response and response.triggers else None
+        strategies["config_manager"] = config_manager
+    if "trigger_index" in wanted:
+        strategies["trigger_index"] = lambda text: key_of(index.best(text))
+    if "fuzzy" in wanted:
+        strategies["fuzzy"] = lambda text: key_of(fuzzy.best(text, threshold))
+    if "phonetic" in wanted:
+        strategies["phonetic"] = lambda text: key_of(best_match(text, (phonetic, phonetic_threshold)))
+    if "pipeline" in wanted:
+        strategies["pipeline"] = pipeline
+    return strategies, builds
+
+
+def is_correct(result: Optional[str], expected: Optional[str]) -> bool:
+    """Keys and store names (normalized triggers) both count"""
+    if expected is None or result is None:
+        return result == expected
+    return normalize_trigger(result) == normalize_trigger(expected)
+
+
+def run_strategy(lookup: Callable, corpus: List[Tuple[str, str, Optional[str]]], repeats: int) -> dict:
+    timings = []
+    outcomes = {kind: [0, 0, 0] for kind in (HIT, NEAR_MISS, MISS)}  # [correct, resolved, total]
+    for repeat in range(repeats):
+        for kind, text, expected in corpus:
+            text = normalize_input(text)
+            started = time.perf_counter()
+            result = lookup(text)
+            timings.append(time.perf_counter() - started)
+            if repeat == 0:
+                outcomes[kind][0] += is_correct(result, expected)
+                outcomes[kind][1] += result is not None
+                outcomes[kind][2] += 1
+
+    timings = np.array(timings)
+    micros = timings * 1e6
+    return {
+        "lookups": len(timings),
+        "throughput_per_second": len(timings) / timings.sum() if timings.sum() else None,
+        "latency_us": {
+            "mean": float(micros.mean()),
+            "p50": float(np.percentile(micros, 50)),
+            "p90": float(np.percentile(micros, 90)),
+            "p99": float(np.percentile(micros, 99)),
+            "max": float(micros.max()),
+        },
+        "accuracy": {kind: (correct / total if total else None)
+                     for kind, (correct, _, total) in outcomes.items()},
+        "resolved_rate": {kind: (resolved / total if total else None)
+                          for kind, (_, resolved, total) in outcomes.items()},
+    }
+
+
+def benchmark_size(size: int, args, lengths, wanted: List[str], threshold: float,
+                   phonetic_threshold: float) -> dict:
+    rng = random.Random(args.seed + size)
+    started = time.perf_counter()
+    library = generate_library(size, lengths, rng, args.alias_rate, args.keyword_rate, args.custom_rate)
+    corpus = generate_corpus(library, args.queries, rng)
+    generated = time.perf_counter() - started
+
+    directory = args.save or tempfile.mkdtemp(prefix="worm_matching_")
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"worm_responses_{size}.json")
+    with open(path, 'w') as f:
+        json.dump(library, f, indent=2)
+    with open(os.path.join(directory, f"inputs_{size}.json"), 'w') as f:
+        json.dump([{"kind": kind, "text": text, "expected": expected}
+                   for kind, text, expected in corpus], f, indent=2)
+
+    file_bytes = os.path.getsize(path)
+
+    print(f"📚 {size} responses ({generated:.1f}s to generate), building indexes...", file=sys.stderr)
+    strategies, builds = build_strategies(library, path, threshold, phonetic_threshold, wanted,
+                                          not args.no_memory)
+
+    results = {}
+    for name in wanted:
+        if name == "linear_scan" and size > args.linear_max:
+            results[name] = {"skipped": f"library larger than --linear-max {args.linear_max}"}
+            continue
+        print(f"⏱️  {size}: {name}", file=sys.stderr)
+        results[name] = run_strategy(strategies[name], corpus, args.repeats)
+
+    if not args.save:
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
+        os.rmdir(directory)
+
+    return {
+        "responses": size,
+        "triggers": sum(1 + len(entry.get("aliases", [])) for entry in library["responses"].values()),
+        "custom_triggers": len(library["custom"]["synthetic"]),
+        "file_bytes": file_bytes,
+        "queries": {kind: sum(1 for k, _, _ in corpus if k == kind) for kind in (HIT, NEAR_MISS, MISS)},
+        "builds": builds,
+        "strategies": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark WORM response matching on synthetic libraries")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help='Library sizes, comma separated')
+    parser.add_argument('--lengths', default=DEFAULT_LENGTHS,
+                        help='Trigger word-count distribution, words:weight pairs')
+    parser.add_argument('--queries', type=int, default=600, help='Inputs per library (hits/near/misses)')
+    parser.add_argument('--repeats', type=int, default=3, help='Passes over the inputs when timing')
+    parser.add_argument('--strategies', default=",".join(STRATEGIES), help='Which strategies to run')
+    parser.add_argument('--threshold', type=float,
+                        help='N-gram similarity threshold (default: matching.fuzzy_threshold)')
+    parser.add_argument('--phonetic-threshold', type=float,
+                        help='Sound-alike threshold (default: matching.phonetic_threshold)')
+    parser.add_argument('--alias-rate', type=float, default=0.2, help='Share of responses with an alias')
+    parser.add_argument('--keyword-rate', type=float, default=0.05, help='Share with a keyword')
+    parser.add_argument('--custom-rate', type=float, default=0.1,
+                        help='Custom triggered entries, as a share of the library size')
+    parser.add_argument('--linear-max', type=int, default=100000,
+                        help='Skip the linear scan above this library size')
+    parser.add_argument('--no-memory', action='store_true', help='Skip tracemalloc measurements')
+    parser.add_argument('--save', help='Keep generated libraries and inputs in this directory')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write JSON here instead of stdout')
+    args = parser.parse_args()
+
+    wanted = [name.strip() for name in args.strategies.split(",") if name.strip()]
+    unknown = set(wanted) - set(STRATEGIES)
+    if unknown:
+        parser.error(f"unknown strategies: {', '.join(sorted(unknown))}")
+    threshold = args.threshold if args.threshold is not None else load_fuzzy_threshold()
+    phonetic_threshold = (args.phonetic_threshold if args.phonetic_threshold is not None
+                          else load_phonetic_threshold())
+    lengths = parse_lengths(args.lengths)
+
+    print("📈 WORM Matching Benchmark", file=sys.stderr)
+    report = {
+        "threshold": threshold,
+        "phonetic_threshold": phonetic_threshold,
+        "lengths": dict(zip(*lengths)),
+        "libraries": [benchmark_size(int(size), args, lengths, wanted, threshold, phonetic_threshold)
+                      for size in args.sizes.split(",")],
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+        print(f"✅ Report written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
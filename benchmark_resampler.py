@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+🎚️ WORM RESAMPLER CHECK
+Verifies the streaming capture resampler against a direct (non-streaming)
+upsample-filter-decimate reference at common mic rates, checks passband
+and alias rejection, and measures CPU per second of audio
+Exit code is non-zero if any check fails
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from core.resample import PolyphaseResampler, design_lowpass, TARGET_RATE
+
+RATES = [48000, 44100, 32000, 22050, 16000]
+
+
+def reference_resample(samples: np.ndarray, resampler: PolyphaseResampler) -> np.ndarray:
+    """Textbook rational resampling: zero-stuff, filter, keep every down-th sample"""
+    prototype = design_lowpass(resampler.up, resampler.down, resampler.taps)
+    upsampled = np.zeros(len(samples) * resampler.up)
+    upsampled[::resampler.up] = samples
+    filtered = np.convolve(upsampled, prototype)[:len(upsampled)]
+    return np.clip(np.rint(filtered[::resampler.down]), -32768, 32767)
+
+
+def stream(resampler: PolyphaseResampler, samples: np.ndarray, block_sizes) -> np.ndarray:
+    """Feed samples through in the given block sizes"""
+    out, offset = [], 0
+    for size in block_sizes:
+        if offset >= len(samples):
+            break
+        out.append(resampler.process(samples[offset:offset + size].tobytes()).copy())
+        offset += size
+    return np.concatenate(out)
+
+
+def tone_rms(rate: int, frequency: float) -> float:
+    """RMS of a 10000-amplitude tone after resampling (edges trimmed)"""
+    tone = (np.sin(2 * np.pi * frequency * np.arange(rate) / rate) * 10000).astype(np.int16)
+    output = PolyphaseResampler(rate).process(tone.tobytes()).astype(np.float64)[500:-500]
+    return float(np.sqrt(np.mean(output ** 2)))
+
+
+def check_rate(rate: int, seconds: float) -> dict:
+    rng = np.random.default_rng(rate)
+    samples = (rng.standard_normal(rate * 2) * 3000).astype(np.int16)
+
+    # Random block sizes - boundaries must not change the output
+    resampler = PolyphaseResampler(rate)
+    streamed = stream(resampler, samples, rng.integers(1, 6000, size=len(samples)))
+    if resampler.passthrough:
+        max_error = float(np.max(np.abs(streamed.astype(int) - samples.astype(int))))
+    else:
+        expected = reference_resample(samples, resampler)
+        max_error = float(np.max(np.abs(streamed - expected[:len(streamed)])))
+
+    # CPU for live-sized 100 ms blocks
+    audio = (rng.standard_normal(int(rate * seconds)) * 3000).astype(np.int16)
+    resampler = PolyphaseResampler(rate)
+    block = rate // 10
+    started = time.process_time()
+    for offset in range(0, len(audio), block):
+        resampler.process(audio[offset:offset + block].tobytes())
+    cpu = (time.process_time() - started) / seconds
+
+    full_scale = 10000 / np.sqrt(2)
+    result = {
+        "rate": rate,
+        "up": resampler.up,
+        "down": resampler.down,
+        "max_error_lsb": max_error,
+        "passband_1k_db": float(20 * np.log10(tone_rms(rate, 1000) / full_scale)),
+        "cpu_per_audio_second": cpu,
+    }
+    if rate > 2 * 10000:
+        # 10 kHz is above the 8 kHz output Nyquist - it must not alias into speech
+        result["alias_10k_db"] = float(20 * np.log10(max(tone_rms(rate, 10000), 1e-3) / full_scale))
+
+    result["ok"] = bool(max_error <= 1
+                        and abs(result["passband_1k_db"]) < 0.5
+                        and result.get("alias_10k_db", -100) < -40)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify and benchmark the capture resampler")
+    parser.add_argument('--seconds', type=float, default=10.0, help='Audio per CPU benchmark')
+    args = parser.parse_args()
+
+    print(f"🎚️  Resampler check (target {TARGET_RATE} Hz)", file=sys.stderr)
+    results = [check_rate(rate, args.seconds) for rate in RATES]
+    for result in results:
+        status = "✅" if result["ok"] else "❌"
+        print(f"{status} {result['rate']} Hz: error {result['max_error_lsb']:.0f} LSB, "
+              f"CPU {result['cpu_per_audio_second'] * 1000:.2f} ms per audio second", file=sys.stderr)
+
+    print(json.dumps(results, indent=2))
+    sys.exit(0 if all(result["ok"] for result in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
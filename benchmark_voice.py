@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+📏 WORM VOICE BENCHMARK
+Replays labeled 16 kHz WAV files through the same recognition pipeline as
+get_voice_input (shared Vosk model, response grammar, VAD, streaming
+recognizer with early trigger dispatch) and reports accuracy and latency
+as JSON, so model/grammar/VAD changes can be compared run to run
+
+Labels live in <dir>/labels.json:
+    {"dance.wav": "dance for me",
+     "hello.wav": {"text": "hello there worm", "intent": "hello_there_worm"}}
+A file without an explicit intent is expected to resolve to whatever its
+reference text resolves to.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import wave
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from core.grammar import ResponseGrammar, GrammarFallbackRecognizer, RESPONSES_FILE
+from core.streaming_recognizer import (StreamingRecognizer, RecognitionEvent, EARLY, FINAL,
+                                      normalize_transcript)
+from core.vad import VoiceActivityDetector, load_vad_config
+from core.vosk_models import VoskModelRegistry
+from matching import ResponseResolver
+from response_store import ResponseStore
+
+SAMPLE_RATE = 16000
+BLOCK_SAMPLES = 1600  # same 100 ms blocks as the live capture
+
+
+def word_errors(reference: str, hypothesis: str) -> int:
+    """Word-level edit distance"""
+    ref = normalize_transcript(reference).split()
+    hyp = normalize_transcript(hypothesis).split()
+    row = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        previous, row[0] = row[0], i
+        for j, hyp_word in enumerate(hyp, 1):
+            current = min(row[j] + 1, row[j - 1] + 1, previous + (ref_word != hyp_word))
+            previous, row[j] = row[j], current
+    return row[-1]
+
+
+def load_labels(directory: str) -> Dict[str, dict]:
+    """labels.json entries normalized to {"text": ..., "intent": ...}"""
+    with open(os.path.join(directory, "labels.json"), 'r') as f:
+        raw = json.load(f)
+    labels = {}
+    for name, label in raw.items():
+        if isinstance(label, str):
+            label = {"text": label}
+        labels[name] = label
+    return labels
+
+
+def read_wav(path: str) -> np.ndarray:
+    """16 kHz mono int16 samples"""
+    with wave.open(path, 'rb') as wav:
+        if wav.getframerate() != SAMPLE_RATE or wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: expected 16 kHz mono 16-bit PCM")
+        return np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+
+
+class VoiceBenchmark:
+    """Runs fixtures through the live recognition pipeline"""
+
+    def __init__(self, responses_file: str = RESPONSES_FILE, use_grammar: bool = True,
+                 use_vad: bool = True, speed: float = 0.0):
+        """speed: 1.0 replays in real time, 0 as fast as possible"""
+        store = ResponseStore(responses_file)
+        if not store.load():
+            raise RuntimeError(f"Could not load {responses_file}")
+        self.speed = speed
+        self.registry = VoskModelRegistry.get()
+        if self.registry.wait() is None:
+            raise RuntimeError("Vosk model not available")
+
+        self.grammar = ResponseGrammar(responses_file) if use_grammar else None
+        self.vad_config = load_vad_config()
+        self.vad_config.enabled = use_vad
+        # The live lookup: exact and early matches, resolve order and thresholds
+        self.resolver = ResponseResolver(store)
+
+    def _recognizer(self):
+        if self.grammar is None:
+            return self.registry.recognizer()
+        # No AI offline - out-of-grammar speech is dropped, as in the live system
+        return GrammarFallbackRecognizer(self.registry.recognizer(grammar=self.grammar.phrases))
+
+    def run_file(self, path: str, label: dict) -> dict:
+        """Recognize one fixture the way get_voice_input would"""
+        samples = read_wav(path)
+        duration = len(samples) / SAMPLE_RATE
+        streaming = StreamingRecognizer(self._recognizer(), self.resolver.match_exact,
+                                        vad=VoiceActivityDetector(self.vad_config))
+
+        partial_at = final_at = None
+        early = None
+        transcript = None
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+
+        for offset in range(0, len(samples), BLOCK_SAMPLES):
+            block = samples[offset:offset + BLOCK_SAMPLES]
+            position = (offset + len(block)) / SAMPLE_RATE
+            if self.speed > 0:
+                # Pace against the wall clock like a live microphone
+                due = wall_start + position / self.speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+            event = streaming.accept(block.tobytes())
+            if event is None:
+                continue
+            if partial_at is None and event.kind != FINAL:
+                partial_at = position
+            if event.kind == EARLY and early is None:
+                early = event
+            if event.kind == FINAL and event.text:
+                final_at = position
+                transcript = event.text
+                break
+
+        if transcript is None:
+            transcript = streaming.finish().text
+            final_at = duration
+        else:
+            streaming.finish()
+
+        cpu = time.process_time() - cpu_start
+        reference = label.get("text", "")
+        resolve = self.resolver.find_key
+        expected = label.get("intent", resolve(reference))
+        confirmed = early is not None and streaming.confirms(RecognitionEvent(FINAL, transcript), resolve)
+        # A confirmed early dispatch stands; otherwise the final text is what gets acted on
+        predicted = early.match if confirmed else resolve(transcript)
+
+        return {
+            "file": os.path.basename(path),
+            "reference": reference,
+            "transcript": transcript,
+            "word_errors": word_errors(reference, transcript),
+            "reference_words": len(reference.split()),
+            "expected_intent": expected,
+            "predicted_intent": predicted,
+            "intent_correct": expected == predicted,
+            "early_dispatch": early is not None,
+            "early_confirmed": confirmed,
+            "audio_seconds": duration,
+            "time_to_partial": partial_at,
+            "time_to_final": final_at,
+            "cpu_seconds": cpu,
+        }
+
+    def run(self, directory: str) -> dict:
+        """Benchmark every labeled file and summarize"""
+        labels = load_labels(directory)
+        results: List[dict] = []
+        for name in sorted(labels):
+            path = os.path.join(directory, name)
+            if not os.path.exists(path):
+                print(f"⚠️  Missing fixture: {name}", file=sys.stderr)
+                continue
+            result = self.run_file(path, labels[name])
+            print(f"   {name}: '{result['transcript']}' "
+                  f"({result['word_errors']} errors)", file=sys.stderr)
+            results.append(result)
+
+        return {
+            "config": {
+                "grammar": self.grammar is not None,
+                "vad": self.vad_config.enabled,
+                "speed": self.speed,
+                "model": self.registry.get_stats(),
+            },
+            "summary": summarize(results),
+            "files": results,
+        }
+
+
+def _mean(values: List[float]) -> Optional[float]:
+    values = [value for value in values if value is not None]
+    return float(np.mean(values)) if values else None
+
+
+def summarize(results: List[dict]) -> dict:
+    """Corpus-level numbers"""
+    if not results:
+        return {}
+    reference_words = sum(result["reference_words"] for result in results)
+    audio_seconds = sum(result["audio_seconds"] for result in results)
+    return {
+        "files": len(results),
+        "wer": sum(result["word_errors"] for result in results) / max(reference_words, 1),
+        "intent_accuracy": sum(result["intent_correct"] for result in results) / len(results),
+        "early_dispatch_rate": sum(result["early_dispatch"] for result in results) / len(results),
+        "mean_time_to_partial": _mean([result["time_to_partial"] for result in results]),
+        "mean_time_to_final": _mean([result["time_to_final"] for result in results]),
+        "cpu_per_audio_second": sum(result["cpu_seconds"] for result in results) / audio_seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark WORM voice recognition on WAV fixtures")
+    parser.add_argument('directory', help='Directory with 16 kHz mono WAVs and labels.json')
+    parser.add_argument('--speed', type=float, default=0.0,
+                        help='Replay speed (1 = real time, 0 = as fast as possible)')
+    parser.add_argument('--no-grammar', action='store_true', help='Free-form recognition')
+    parser.add_argument('--no-vad', action='store_true', help='Feed all audio to Vosk')
+    parser.add_argument('--responses', default=RESPONSES_FILE, help='Responses file for intents')
+    parser.add_argument('--output', help='Write JSON here instead of stdout')
+    args = parser.parse_args()
+
+    print("📏 WORM Voice Benchmark", file=sys.stderr)
+    benchmark = VoiceBenchmark(args.responses, use_grammar=not args.no_grammar,
+                               use_vad=not args.no_vad, speed=args.speed)
+    report = benchmark.run(args.directory)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+        print(f"✅ Report written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
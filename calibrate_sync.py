@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+⏱️ WORM SYNC CALIBRATION
+Measures audio output latency (mixer buffer + speaker-to-mic loopback) and
+serial-to-servo latency, then stores the offsets in worm_settings.json so
+mouth cues line up with audible speech
+"""
+
+import argparse
+
+import pygame
+
+from core.latency_calibration import calibrate, load_sync_offsets, SETTINGS_FILE
+from core.worm_controller import WormController
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate WORM mouth/speech sync")
+    parser.add_argument('--trials', type=int, default=5, help='Measurements per test')
+    parser.add_argument('--no-arduino', action='store_true', help='Skip the serial latency test')
+    parser.add_argument('--settings', default=SETTINGS_FILE, help='Settings file to update')
+    args = parser.parse_args()
+
+    print("⏱️  WORM Sync Calibration")
+    print("=" * 30)
+
+    offsets = load_sync_offsets(args.settings)
+    pygame.mixer.init(buffer=offsets.mixer_buffer)
+
+    controller = None
+    if not args.no_arduino:
+        controller = WormController()
+
+    try:
+        connection = controller.serial_connection if controller and controller.is_connected() else None
+        calibrate(connection, args.settings, args.trials)
+    finally:
+        if controller:
+            controller.close()
+        pygame.mixer.quit()
+
+    print("\n✅ Calibration complete!")
+    print("💡 Fine-tune servo_travel in worm_settings.json if the mouth still lags")
+
+
+if __name__ == "__main__":
+    main()
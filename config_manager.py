@@ -6,9 +6,10 @@ No AI or hardware dependencies
 
 import json
 import os
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional
 from dataclasses import dataclass
 import random
+from response_store import ResponseStore
 
 @dataclass
 class PredefinedResponse:
@@ -24,6 +25,7 @@ class ConfigManager:
     
     def __init__(self, responses_file: str = "worm_responses.json"):
         self.responses_file = responses_file
+        self.store = ResponseStore(responses_file)
         self.responses = {}
         self.settings = {}
         self.load_responses()
@@ -31,34 +33,27 @@ class ConfigManager:
     
     def load_responses(self) -> bool:
         """Load predefined responses from JSON file"""
-        try:
-            if not os.path.exists(self.responses_file):
-                print(f"Responses file {self.responses_file} not found")
-                self.responses = self._create_default_responses()
-                self.save_responses()
-                return True
-            
-            with open(self.responses_file, 'r', encoding='utf-8') as f:
-                self.responses = json.load(f)
-            
-            print(f"Loaded {len(self.responses)} response categories")
+        if not os.path.exists(self.responses_file):
+            print(f"Responses file {self.responses_file} not found")
+            self.store.use(self._create_default_responses())
+            self.responses = self.store.data
+            self.save_responses()
             return True
-            
-        except Exception as e:
-            print(f"Error loading responses: {e}")
-            self.responses = self._create_default_responses()
-            return False
+        
+        loaded = self.store.load()
+        if not loaded:
+            self.store.use(self._create_default_responses())
+        self.responses = self.store.data
+        print(f"Loaded {len(self.store)} responses in {len(self.store.categories())} categories")
+        return loaded
     
     def save_responses(self) -> bool:
-        """Save responses to JSON file"""
-        try:
-            with open(self.responses_file, 'w', encoding='utf-8') as f:
-                json.dump(self.responses, f, indent=2, ensure_ascii=False)
+        """Save responses to JSON file (also picks up direct edits to self.responses)"""
+        self.store.data = self.responses
+        if self.store.save():
             print(f"Responses saved to {self.responses_file}")
             return True
-        except Exception as e:
-            print(f"Error saving responses: {e}")
-            return False
+        return False
     
     def _create_default_responses(self) -> Dict:
         """Create default response structure"""
@@ -69,86 +64,50 @@ class ConfigManager:
         }
     
     def find_response(self, query: str, category: str = None) -> Optional[PredefinedResponse]:
-        """Find a matching predefined response"""
-        query_lower = query.lower().strip()
-        
-        # For custom responses, try to find exact trigger matches
-        if 'custom' in self.responses:
-            for subcategory, response_list in self.responses['custom'].items():
-                if isinstance(response_list, list):
-                    for response in response_list:
-                        if 'trigger' in response and response['trigger'].lower().strip() == query_lower:
-                            return PredefinedResponse(
-                                text=response.get('text', ''),
-                                movement=response.get('movement')
-                            )
+        """Find a matching predefined response
+
+        Exact custom/* trigger first (one dictionary lookup), then a random
+        response from the requested category, then a fallback. Keyed
+        responses.<key> entries are left to the keyed runtime's matcher.
+        """
+        entry = self.store.find(query, keyed=False)
         
-        # No matches found - use fallback
-        if 'fallbacks' in self.responses and self.responses['fallbacks']:
-            fallback = random.choice(self.responses['fallbacks'])
-            return PredefinedResponse(
-                text=fallback.get('text', ''),
-                movement=fallback.get('movement')
-            )
+        if entry is None and category:
+            candidates = self.store.by_category(category)
+            entry = random.choice(candidates) if candidates else None
         
-        return None
-    
-    def _search_in_category(self, query: str, category_data: Any) -> Optional[Dict]:
-        """Search for response in a specific category"""
-        if isinstance(category_data, dict):
-            # Category has subcategories
-            for subcategory in category_data.values():
-                if isinstance(subcategory, list):
-                    return random.choice(subcategory) if subcategory else None
-        elif isinstance(category_data, list):
-            # Category is a list of responses
-            return random.choice(category_data) if category_data else None
+        if entry is None:
+            entry = self.store.random_fallback()
         
-        return None
+        if entry is None:
+            return None
+        return PredefinedResponse(
+            text=entry.text,
+            movement=entry.movement,
+            triggers=[entry.trigger] if entry.trigger else None,
+            emotion=entry.emotion
+        )
     
     def add_response(self, category: str, subcategory: str, text: str, 
-                    movement: str = None, emotion: str = None) -> bool:
+                    movement: str = None, emotion: str = None, trigger: str = None) -> bool:
         """Add a new predefined response"""
-        try:
-            if category not in self.responses:
-                self.responses[category] = {}
-            
-            if subcategory not in self.responses[category]:
-                self.responses[category][subcategory] = []
-            
-            new_response = {
-                "text": text,
-                "movement": movement,
-                "emotion": emotion
-            }
-            
-            self.responses[category][subcategory].append(new_response)
-            self.save_responses()
+        self.store.data = self.responses
+        if self.store.add(category, subcategory, text, movement, emotion, trigger):
             print(f"Added response to {category}/{subcategory}")
             return True
-            
-        except Exception as e:
-            print(f"Error adding response: {e}")
-            return False
+        print("Error adding response")
+        return False
     
     def remove_response(self, category: str, subcategory: str, index: int) -> bool:
         """Remove a predefined response"""
-        try:
-            if (category in self.responses and 
-                subcategory in self.responses[category] and
-                0 <= index < len(self.responses[category][subcategory])):
-                
-                removed = self.responses[category][subcategory].pop(index)
-                self.save_responses()
-                print(f"Removed response: {removed['text'][:50]}...")
-                return True
-            else:
-                print(f"Response not found at {category}/{subcategory}[{index}]")
-                return False
-                
-        except Exception as e:
-            print(f"Error removing response: {e}")
+        self.store.data = self.responses
+        self.store.reindex()
+        removed = self.store.remove_at(category, subcategory, index)
+        if removed is None:
+            print(f"Response not found at {category}/{subcategory}[{index}]")
             return False
+        print(f"Removed response: {removed.text[:50]}...")
+        return True
     
     def list_responses(self, category: str = None) -> Dict:
         """List all responses or responses in a specific category"""
@@ -158,15 +117,7 @@ class ConfigManager:
     
     def get_response_count(self) -> int:
         """Get total number of predefined responses"""
-        count = 0
-        for category in self.responses.values():
-            if isinstance(category, dict):
-                for subcategory in category.values():
-                    if isinstance(subcategory, list):
-                        count += len(subcategory)
-            elif isinstance(category, list):
-                count += len(category)
-        return count
+        return len(self.store)
     
     def load_settings(self):
         """Load system settings"""
@@ -207,11 +158,45 @@ class ConfigManager:
             "ai": {
                 "use_ai_fallback": True,
                 "ai_confidence_threshold": 0.6,
+                "intent_threshold": 0.8,
                 "max_response_length": 200
             },
+            "matching": {
+                "fuzzy_threshold": 0.55,
+                "phonetic_threshold": 0.75
+            },
             "debug": {
                 "verbose_logging": False,
                 "simulation_mode": False
+            },
+            "sync": {
+                "mixer_buffer": 512,
+                "audio_output_latency": 0.0,
+                "servo_latency": 0.0,
+                "servo_travel": 0.0
+            },
+            "voice": {
+                "vad": {
+                    "enabled": True,
+                    "energy_threshold": 300.0,
+                    "noise_ratio": 3.0,
+                    "zcr_max": 0.25,
+                    "loud_ratio": 3.0,
+                    "hangover_ms": 400,
+                    "preroll_ms": 300
+                },
+                "echo": {
+                    "enabled": True,
+                    "over_subtraction": 2.0,
+                    "spectral_floor": 0.05,
+                    "barge_in_ms": 300,
+                    "barge_in_ratio": 2.0
+                },
+                "wake_word": {
+                    "enabled": True,
+                    "phrases": ["worm", "hey worm"],
+                    "window_seconds": 8.0
+                }
             }
         }
     
@@ -270,7 +255,7 @@ class ConfigManager:
         """Get statistics about the configuration"""
         return {
             "total_responses": self.get_response_count(),
-            "categories": len(self.responses),
+            "categories": len(self.store.categories()),
             "settings_loaded": len(self.settings) > 0,
             "responses_file": self.responses_file,
             "file_exists": os.path.exists(self.responses_file)
@@ -7,175 +7,228 @@ Handles TTS, voice recognition, and audio playback
 import pygame
 import time
 import threading
-from gtts import gTTS
-import tempfile
-import os
-from typing import Optional, Callable
-import vosk
-import json
+from typing import Optional, Callable, List
+from collections import deque
 import sounddevice as sd
-import queue
+from concurrent.futures import Future
+from .speech_stream import SpeechStream
+from .playback import resolved
+from .vad import VoiceActivityDetector, load_vad_config
+from .streaming_recognizer import StreamingRecognizer, EARLY, FINAL
+from .vosk_models import preload_vosk_model
+from .audio_ring import AudioRingBuffer
+from .echo import PlaybackReference, EchoSuppressor, BargeInDetector, load_echo_config, capture_time
+from .latency_calibration import load_sync_offsets
+from .resample import PolyphaseResampler, device_capture_rate
+from .wake_word import WakeWordSpotter, load_wake_word_config, wake_grammar
 
 class AudioController:
     """Pure audio controller for the worm robot"""
     
     def __init__(self):
+        self.speech_stream = None
         self.setup_audio()
-        self.vosk_model = None
+        self.voice_models = preload_vosk_model()  # Shared model, loading in the background
         self.recognizer = None
-        self.vosk_checked = False
+        self.wake_word = None
         self.is_speaking = False
-        self.audio_queue = queue.Queue()
+        self.audio_ring = AudioRingBuffer()  # Bounded capture buffer - drops oldest if we fall behind
+        # Open the mic at its native rate and resample to Vosk's 16 kHz ourselves
+        self.capture_rate = device_capture_rate()
+        self.resampler = PolyphaseResampler(self.capture_rate)
+        self.vad = VoiceActivityDetector(load_vad_config())
+        
+        # Our own speech is the echo reference, so we can listen while talking
+        self.playback_reference = PlaybackReference(load_sync_offsets().audio_output_latency)
+        if self.speech_stream:
+            self.playback_reference.attach(self.speech_stream.player)
+        self.echo = EchoSuppressor(self.playback_reference, load_echo_config())
+        self.barge_in = BargeInDetector(self.vad.config, self.echo.config)
         
     def setup_audio(self):
         """Initialize audio components for voice input/output"""
         try:
             # Initialize pygame for audio playback
             pygame.mixer.init()
+            self.speech_stream = SpeechStream()
             print("Audio playback ready")
         except Exception as e:
             print(f"⚠️  Audio setup failed: {e}")
     
         
-    def speak(self, text: str, speed: int = 150, blocking: bool = True):
-        """Convert text to speech and play it"""
+    def speak(self, text: str, speed: int = 150, blocking: bool = True) -> Future:
+        """Convert text to speech and play it
+
+        Returns a future resolved when playback finishes (True) or is cut off (False).
+        """
         if self.is_speaking and blocking:
-            return  # Prevent overlapping speech
+            return resolved(False)  # Prevent overlapping speech
             
         def _speak():
             self.is_speaking = True
             try:
-                # Create TTS with female voice
-                tts = gTTS(text=text, lang='en', slow=(speed < 100))
-                
-                # Save to temporary file
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as tmp_file:
-                    tts.save(tmp_file.name)
-                    
-                    # Play audio
-                    pygame.mixer.music.load(tmp_file.name)
-                    pygame.mixer.music.play()
-                    
-                    # Wait for playback to finish
-                    while pygame.mixer.music.get_busy():
-                        time.sleep(0.1)
-                    
-                    # Clean up
-                    os.unlink(tmp_file.name)
+                # Stream clauses through gTTS so playback starts with the first clause
+                completion = self.speech_stream.speak(text, slow=(speed < 100))
+                # Resolved by the playback monitor
+                done.set_result(completion.result())
                     
             except Exception as e:
                 print(f"❌ Speech error: {e}")
             finally:
                 self.is_speaking = False
+                if not done.done():
+                    done.set_result(False)
         
+        done = Future()
         if blocking:
             _speak()
         else:
             # Run in background thread
             threading.Thread(target=_speak, daemon=True).start()
+        return done
     
     def is_active(self) -> bool:
         """Check if audio is currently playing"""
-        return pygame.mixer.music.get_busy() or self.is_speaking
+        return self.speech_stream.is_busy() or self.is_speaking
     
     def setup_voice_recognition(self) -> bool:
-        """Setup voice recognition (lazy loading)"""
-        if self.vosk_checked:
-            return self.vosk_model is not None
-            
-        self.vosk_checked = True
-        
-        try:
-            # Look for Vosk model
-            model_paths = [
-                "vosk-model-small-en-us-0.15",
-                "model/vosk-model-small-en-us-0.15"
-            ]
-            
-            model_path = None
-            for path in model_paths:
-                if os.path.exists(path):
-                    model_path = path
-                    break
-            
-            if not model_path:
-                print("⚠️  Vosk model not found - voice recognition disabled")
-                return False
-            
-            self.vosk_model = vosk.Model(model_path)
-            self.recognizer = vosk.KaldiRecognizer(self.vosk_model, 16000)
-            print("✅ Voice recognition ready")
+        """Setup voice recognition on the shared, preloaded model"""
+        if self.recognizer is not None:
             return True
             
-        except Exception as e:
-            print(f"⚠️  Voice recognition setup failed: {e}")
+        self.recognizer = self.voice_models.recognizer()
+        if self.recognizer is None:
+            print("⚠️  Voice recognition unavailable")
             return False
+            
+        wake_config = load_wake_word_config()
+        if wake_config.enabled:
+            # Its own VAD - the shared one tracks the full recognizer's segments
+            spotter = self.voice_models.recognizer(grammar=wake_grammar(wake_config))
+            self.wake_word = WakeWordSpotter(spotter, wake_config,
+                                             VoiceActivityDetector(self.vad.config))
+            print(f"👂 Wake word enabled: {', '.join(wake_config.phrases)}")
+            
+        print("✅ Voice recognition ready")
+        return True
     
     def listen_for_speech(self, timeout: float = 5.0, callback: Optional[Callable] = None) -> Optional[str]:
-        """Listen for speech input"""
+        """Listen for one utterance
+
+        Audio is fed to Vosk as it is captured and we return as soon as the
+        utterance ends (VAD hangover or Kaldi endpoint); timeout only caps
+        how long we wait.
+        """
         if not self.setup_voice_recognition():
             return None
         
         print("🎤 Listening...")
         
+        streaming = StreamingRecognizer(self.recognizer, vad=self.vad)
+        self.vad.reset()
+        text = ""
+        
         try:
-            # Audio recording parameters
-            sample_rate = 16000
-            duration = timeout
+            self.audio_ring.clear()
+            self.echo.reset()
+            self.resampler.reset()
+            # 100 ms blocks - the endpoint is noticed within one block
+            with sd.RawInputStream(samplerate=self.capture_rate, blocksize=self.capture_rate // 10,
+                                   dtype='int16', channels=1, callback=self._audio_callback):
+                deadline = time.time() + timeout
+                while time.time() < deadline:
+                    data = self.audio_ring.read(timeout=0.1)
+                    if data is None:
+                        continue
+                        
+                    data = self.echo.process(data, self.audio_ring.last_read_time)
+                    if not data:
+                        continue
+                    event = streaming.accept(data)
+                    if event is not None and event.kind == FINAL and event.text:
+                        text = event.text
+                        break
             
-            # Record audio
-            audio_data = sd.rec(int(duration * sample_rate), 
-                              samplerate=sample_rate, 
-                              channels=1, 
-                              dtype='int16')
-            sd.wait()  # Wait for recording to complete
+            if not text:
+                # Out of time - take whatever the recognizer has so far
+                text = streaming.finish().text
             
-            # Process with Vosk
-            if self.recognizer.AcceptWaveform(audio_data.tobytes()):
-                result = json.loads(self.recognizer.Result())
-                text = result.get('text', '').strip()
-                
-                if text:
-                    print(f"🎤 Heard: '{text}'")
-                    if callback:
-                        callback(text)
-                    return text
-                else:
-                    print("🔇 No speech detected")
-                    return None
-            else:
-                print("🔇 Speech recognition failed")
-                return None
+            if text:
+                print(f"🎤 Heard: '{text}' ({streaming.final_at:.2f}s)")
+                if callback:
+                    callback(text)
+                return text
+            
+            print("🔇 No speech detected")
+            return None
                 
         except Exception as e:
             print(f"❌ Voice recognition error: {e}")
             return None
     
-    def start_continuous_listening(self, callback: Callable[[str], None]):
-        """Start continuous voice recognition in background"""
+    def start_continuous_listening(self, callback: Callable[[str], None],
+                                   exact_matcher: Optional[Callable[[str], Optional[str]]] = None,
+                                   on_rollback: Optional[Callable[[str], None]] = None,
+                                   on_barge_in: Optional[Callable[[], None]] = None,
+                                   resolver: Optional[Callable[[str], Optional[str]]] = None):
+        """Start continuous voice recognition in background
+
+        With an exact_matcher, a stable partial that is exactly a trigger is
+        passed to callback before the endpoint; if the final text resolves
+        differently, on_rollback receives the final text. The final text is
+        checked with resolver - pass the full matcher the callback dispatches
+        with (exact, contained trigger, fuzzy), so a final that the callback
+        would resolve to the same response is not rolled back. Without one,
+        exact_matcher is used.
+        Speech over our own playback stops it and calls on_barge_in (e.g. to
+        stop motion).
+        With the wake word enabled, only the spotter runs until it hears
+        "worm"; full recognition then stays on for a window that each
+        recognized utterance extends.
+        """
         if not self.setup_voice_recognition():
             return False
+        resolver = resolver or exact_matcher
         
         def _listen_continuously():
             print("🎤 Continuous listening started...")
+            streaming = StreamingRecognizer(self.recognizer, exact_matcher, vad=self.vad)
+            held = deque(maxlen=(self.echo.config.barge_in_ms + self.vad.config.preroll_ms) // 100 + 1)
+            recent = deque(maxlen=10)  # last second, so the wake phrase reaches the full recognizer
             
-            with sd.InputStream(samplerate=16000, channels=1, dtype='int16',
-                              callback=self._audio_callback):
+            self.audio_ring.clear()
+            self.echo.reset()
+            self.resampler.reset()
+            with sd.RawInputStream(samplerate=self.capture_rate, blocksize=self.capture_rate // 10,
+                                   dtype='int16', channels=1, callback=self._audio_callback):
                 while True:
                     try:
-                        # Process audio queue
-                        if not self.audio_queue.empty():
-                            audio_chunk = self.audio_queue.get_nowait()
+                        # Woken as soon as a block is captured - no polling
+                        audio_chunk = self.audio_ring.read(timeout=0.5)
+                        if audio_chunk is None:
+                            continue
                             
-                            if self.recognizer.AcceptWaveform(audio_chunk):
-                                result = json.loads(self.recognizer.Result())
-                                text = result.get('text', '').strip()
+                        blocks = self._cleaned_blocks(audio_chunk, held, on_barge_in)
+                        for block in self._wake_gate(blocks, recent, streaming):
+                            event = streaming.accept(block)
+                            
+                            if event is not None and event.kind == EARLY:
+                                print(f"⚡ Early match on partial: '{event.text}'")
+                                callback(event.text)
+                            elif event is not None and event.kind == FINAL:
+                                text = event.text
                                 
-                                if text:
+                                if streaming.dispatched is not None:
+                                    # Already acted on this utterance - only roll back on disagreement
+                                    if not streaming.confirms(event, resolver) and on_rollback:
+                                        print(f"↩️  Heard '{text}' - rolling back early match")
+                                        on_rollback(text)
+                                elif text:
                                     print(f"🎤 Heard: '{text}'")
+                                    if self.wake_word:
+                                        self.wake_word.extend()
                                     callback(text)
-                        
-                        time.sleep(0.1)
+                                streaming.reset()
                         
                     except KeyboardInterrupt:
                         break
@@ -187,18 +240,77 @@ class AudioController:
         threading.Thread(target=_listen_continuously, daemon=True).start()
         return True
     
-    def _audio_callback(self, indata, frames, time, status):
+    def _wake_gate(self, blocks: List[bytes], recent: deque,
+                   streaming: StreamingRecognizer) -> List[bytes]:
+        """Pass audio to the full recognizer only while awake"""
+        if self.wake_word is None:
+            return blocks
+        
+        if self.wake_word.is_awake():
+            return blocks
+        
+        if self.vad.in_speech:
+            # Window ran out mid-utterance - let it finish
+            return blocks
+        
+        if streaming.first_partial_at is not None:
+            print("💤 Wake window closed")
+            streaming.finish()
+            streaming.reset()
+        
+        for index, block in enumerate(blocks):
+            if self.wake_word.accept(block):
+                # Replay the wake phrase so the full transcript still contains it
+                woken = list(recent) + blocks[index:]
+                recent.clear()
+                self.vad.reset()
+                return woken
+            recent.append(block)
+        return []
+    
+    def _cleaned_blocks(self, data, held: deque,
+                        on_barge_in: Optional[Callable[[], None]] = None) -> List[bytes]:
+        """Echo-suppress one capture block and decide what reaches the recognizer
+
+        While we are talking, cleaned audio is held back so leftover echo is
+        never transcribed; a barge-in stops playback and releases it.
+        """
+        cleaned = self.echo.process(data, self.audio_ring.last_read_time)
+        if not cleaned:
+            return []
+        
+        if not self.is_active():
+            self.barge_in.reset()
+            held.clear()
+            return [cleaned]
+        
+        if not self.barge_in.update(cleaned):
+            held.append(cleaned)
+            return []
+        
+        print("✋ Barge-in - stopping speech")
+        self.stop_audio()
+        if on_barge_in:
+            on_barge_in()
+        blocks = list(held) + [cleaned]
+        held.clear()
+        return blocks
+    
+    def _audio_callback(self, indata, frames, time_info, status):
         """Callback for continuous audio input"""
         if status:
             print(f"Audio input status: {status}")
         
-        # Add audio data to queue for processing
-        self.audio_queue.put(indata.copy().tobytes())
+        # Copied straight into the preallocated ring - constant memory
+        self.audio_ring.write(self.resampler.process(indata),
+                              capture_time(time_info, frames, self.capture_rate))
     
     def stop_audio(self):
         """Stop all audio playback"""
         try:
             pygame.mixer.music.stop()
+            if self.speech_stream:
+                self.speech_stream.stop()
             self.is_speaking = False
         except Exception as e:
             print(f"❌ Error stopping audio: {e}")
@@ -207,11 +319,15 @@ class AudioController:
         """Set audio volume (0.0 to 1.0)"""
         try:
             pygame.mixer.music.set_volume(max(0.0, min(1.0, volume)))
+            if self.speech_stream:
+                self.speech_stream.set_volume(volume)
         except Exception as e:
             print(f"❌ Error setting volume: {e}")
     
     def close(self):
         """Clean up audio resources"""
         self.stop_audio()
+        if self.speech_stream:
+            self.speech_stream.close()
         pygame.mixer.quit()
         print("🔇 Audio controller closed") 
\ No newline at end of file
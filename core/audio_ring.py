@@ -0,0 +1,119 @@
+"""
+🔁 WORM AUDIO RING BUFFER
+Fixed-size capture buffer between the sounddevice callback and recognition
+Memory never grows: if recognition falls behind, the oldest audio is
+dropped (and counted) so latency stays bounded. The reader blocks on a
+condition instead of polling.
+"""
+
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    """Single-producer, single-consumer int16 ring with drop-oldest overflow"""
+
+    def __init__(self, seconds: float = 2.0, sample_rate: int = 16000, read_block: int = 1600):
+        """
+        seconds: audio held before the oldest samples are dropped
+        read_block: samples returned per read (100 ms at 16 kHz)
+        """
+        self.sample_rate = sample_rate
+        self.capacity = int(seconds * sample_rate)
+        self.read_block = read_block
+        self._data = np.zeros(self.capacity, dtype=np.int16)
+        self._out = np.zeros(read_block, dtype=np.int16)
+        self._written = 0  # total samples ever written
+        self._read = 0     # total samples ever consumed or dropped
+        self._closed = False
+        # Capture clock: perf_counter time of sample index _clock_index
+        self._clock_index = 0
+        self._clock_time = time.perf_counter()
+        self.last_read_time = self._clock_time  # capture time of the last read's first sample
+        self._cond = threading.Condition()
+
+        self.overruns = 0
+        self.dropped_samples = 0
+
+    @property
+    def available(self) -> int:
+        """Samples waiting to be read"""
+        return self._written - self._read
+
+    def write(self, data, captured_at: Optional[float] = None) -> None:
+        """Append captured audio (called from the audio callback - never blocks on the reader)
+
+        captured_at: perf_counter time of the first sample, if the caller knows it
+        """
+        samples = np.frombuffer(data, dtype=np.int16)
+        if captured_at is None:
+            captured_at = time.perf_counter() - len(samples) / self.sample_rate
+        with self._cond:
+            if len(samples) > self.capacity:
+                skipped = len(samples) - self.capacity
+                self.dropped_samples += skipped
+                captured_at += skipped / self.sample_rate
+                samples = samples[-self.capacity:]
+            self._clock_index = self._written
+            self._clock_time = captured_at
+
+            count = len(samples)
+            overflow = self.available + count - self.capacity
+            if overflow > 0:
+                # Drop the oldest audio rather than block the capture thread
+                self._read += overflow
+                self.dropped_samples += overflow
+                self.overruns += 1
+
+            start = self._written % self.capacity
+            first = min(count, self.capacity - start)
+            self._data[start:start + first] = samples[:first]
+            self._data[:count - first] = samples[first:]
+            self._written += count
+            self._cond.notify()
+
+    def read(self, timeout: Optional[float] = None) -> Optional[memoryview]:
+        """Wait for a block of audio
+
+        Returns up to read_block samples as a memoryview over an internal
+        buffer (valid until the next read), a shorter tail if the timeout
+        expires with some audio waiting, or None if nothing arrived.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self.available >= self.read_block or self._closed,
+                                timeout)
+            count = min(self.available, self.read_block)
+            if count == 0:
+                return None
+
+            self.last_read_time = (self._clock_time
+                                   + (self._read - self._clock_index) / self.sample_rate)
+            start = self._read % self.capacity
+            first = min(count, self.capacity - start)
+            self._out[:first] = self._data[start:start + first]
+            self._out[first:count] = self._data[:count - first]
+            self._read += count
+            return memoryview(self._out[:count])
+
+    def clear(self):
+        """Discard everything captured so far"""
+        with self._cond:
+            self._read = self._written
+
+    def close(self):
+        """Wake a blocked reader (reads then return what is left, then None)"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def get_metrics(self) -> dict:
+        """Overrun counters for tuning capacity"""
+        return {
+            "capacity_samples": self.capacity,
+            "available": self.available,
+            "overruns": self.overruns,
+            "dropped_samples": self.dropped_samples,
+        }
@@ -0,0 +1,231 @@
+"""
+⚙️ WORM AUDIO WORKERS
+Out-of-process TTS synthesis and audio decoding
+gTTS requests, MP3 decoding and PCM conversion run in worker processes so
+they never compete for the GIL with recognition and the serial loop.
+Decoded PCM comes back through shared memory.
+"""
+
+import io
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Tuple
+
+import pygame
+
+# Times a job is retried on a fresh worker before it fails
+MAX_ATTEMPTS = 2
+
+# How often the supervisor checks worker health (seconds)
+SUPERVISOR_INTERVAL = 1.0
+
+# Longest a blocking synthesis call waits for its worker (seconds)
+JOB_TIMEOUT = 15.0
+
+
+def _worker_main(tasks, results, mixer_format: Tuple[int, int, int]):
+    """Worker process: synthesize text and decode it to mixer-format PCM"""
+    # Workers decode only - they must never open the sound card
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    from gtts import gTTS
+
+    frequency, size, channels = mixer_format
+    pygame.mixer.init(frequency=frequency, size=size, channels=channels)
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+
+        job_id, text, slow = task
+        try:
+            mp3_data = io.BytesIO()
+            gTTS(text=text, lang='en', slow=slow, tld='com').write_to_fp(mp3_data)
+            mp3_data.seek(0)
+            pcm = pygame.mixer.Sound(mp3_data).get_raw()
+
+            shm = shared_memory.SharedMemory(create=True, size=max(1, len(pcm)))
+            shm.buf[:len(pcm)] = pcm
+            results.put(("done", job_id, shm.name, len(pcm)))
+            # The parent unlinks the segment once it has copied the PCM
+            shm.close()
+        except Exception as e:
+            results.put(("error", job_id, str(e)))
+
+
+class AudioWorkerPool:
+    """Supervised pool of synthesis/decoding processes"""
+
+    def __init__(self, workers: int = 2):
+        mixer_format = pygame.mixer.get_init()
+        if not mixer_format:
+            raise RuntimeError("pygame.mixer must be initialized before the worker pool")
+
+        # spawn, not fork - workers must not inherit the mixer, Vosk or serial state
+        self._ctx = mp.get_context("spawn")
+        self._mixer_format = mixer_format
+        self._results = self._ctx.Queue()
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        # job_id -> (future, text, slow, attempts)
+        self._jobs: Dict[int, Tuple[Future, str, bool, int]] = {}
+        # job_id -> pid of the worker it was assigned to
+        self._owners: Dict[int, int] = {}
+        self._workers: Dict[int, mp.Process] = {}
+        # Each worker has its own task queue, so a job's owner is known
+        # the moment it is assigned - a worker dying mid-job can't lose it
+        self._queues: Dict[int, mp.Queue] = {}
+        self._running = True
+        self.restarts = 0
+
+        for _ in range(max(1, workers)):
+            self._spawn_worker()
+
+        threading.Thread(target=self._collect, daemon=True).start()
+        threading.Thread(target=self._supervise, daemon=True).start()
+        print(f"✅ Audio worker pool ready ({len(self._workers)} processes)")
+
+    def _spawn_worker(self):
+        """Start one worker process"""
+        tasks = self._ctx.Queue()
+        process = self._ctx.Process(target=_worker_main,
+                                    args=(tasks, self._results, self._mixer_format),
+                                    daemon=True)
+        process.start()
+        with self._lock:
+            self._workers[process.pid] = process
+            self._queues[process.pid] = tasks
+
+    def _assign(self, job_id: int, text: str, slow: bool):
+        """Hand a job to the live worker with the fewest jobs (lock held)"""
+        load = {pid: 0 for pid, process in self._workers.items() if process.is_alive()}
+        for owner in self._owners.values():
+            if owner in load:
+                load[owner] += 1
+        # No live worker - the supervisor resubmits once it has restarted one
+        pid = min(load, key=load.get) if load else next(iter(self._workers))
+        self._owners[job_id] = pid
+        self._queues[pid].put((job_id, text, slow))
+
+    def synthesize(self, text: str, slow: bool = False) -> Future:
+        """Queue text for synthesis - the future resolves to a pygame Sound"""
+        future = Future()
+        future.set_running_or_notify_cancel()
+        job_id = next(self._ids)
+        with self._lock:
+            self._jobs[job_id] = (future, text, slow, 1)
+            self._assign(job_id, text, slow)
+        return future
+
+    def synthesize_sound(self, text: str, slow: bool = False,
+                         timeout: float = JOB_TIMEOUT) -> pygame.mixer.Sound:
+        """Blocking synthesis - drop-in for speech_stream.synthesize_clause"""
+        future = self.synthesize(text, slow)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            # A hung gTTS request - give up on it and recycle its worker, so the
+            # supervisor hands the jobs queued behind it to a fresh process
+            with self._lock:
+                for job_id, job in list(self._jobs.items()):
+                    if job[0] is future:
+                        del self._jobs[job_id]
+                        owner = self._workers.get(self._owners.pop(job_id, None))
+                        if owner is not None:
+                            owner.terminate()
+            raise RuntimeError(f"TTS timed out after {timeout:.0f}s: {text!r}")
+
+    def _collect(self):
+        """Turn worker results into Sounds and resolve their futures"""
+        while self._running:
+            try:
+                message = self._results.get(timeout=SUPERVISOR_INTERVAL)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+
+            kind, job_id = message[0], message[1]
+            with self._lock:
+                self._owners.pop(job_id, None)
+                job = self._jobs.pop(job_id, None)
+
+            if kind == "done":
+                sound = self._load_pcm(message[2], message[3])
+                if job is not None:
+                    job[0].set_result(sound)
+            elif job is not None:
+                job[0].set_exception(RuntimeError(f"TTS worker error: {message[2]}"))
+
+    def _load_pcm(self, name: str, size: int) -> pygame.mixer.Sound:
+        """Copy PCM out of shared memory into a Sound and free the segment"""
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            return pygame.mixer.Sound(buffer=shm.buf[:size])
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def _supervise(self):
+        """Restart crashed workers and resubmit the jobs they were running"""
+        while self._running:
+            time.sleep(SUPERVISOR_INTERVAL)
+            with self._lock:
+                dead = [(pid, process) for pid, process in self._workers.items()
+                        if not process.is_alive()]
+            for pid, process in dead:
+                if not self._running:
+                    return
+                print(f"⚠️  Audio worker {pid} exited ({process.exitcode}) - restarting")
+                # Replacement first, so there is always a worker to assign to
+                self._spawn_worker()
+                with self._lock:
+                    del self._workers[pid]
+                    del self._queues[pid]
+                    self.restarts += 1
+                    self._resubmit_jobs_of(pid)
+
+    def _resubmit_jobs_of(self, pid: int):
+        """Retry (or fail) the jobs a dead worker had been given (lock held)"""
+        orphaned = [job_id for job_id, owner in self._owners.items() if owner == pid]
+        for job_id in orphaned:
+            del self._owners[job_id]
+            future, text, slow, attempts = self._jobs.pop(job_id)
+            if attempts >= MAX_ATTEMPTS:
+                future.set_exception(RuntimeError("TTS worker crashed"))
+                continue
+            self._jobs[job_id] = (future, text, slow, attempts + 1)
+            self._assign(job_id, text, slow)
+
+    def get_stats(self) -> Dict:
+        """Worker and queue status"""
+        with self._lock:
+            return {
+                "workers": len(self._workers),
+                "alive": sum(p.is_alive() for p in self._workers.values()),
+                "pending_jobs": len(self._jobs),
+                "restarts": self.restarts,
+            }
+
+    def close(self, timeout: Optional[float] = 2.0):
+        """Stop all workers"""
+        self._running = False
+        with self._lock:
+            workers = list(self._workers.values())
+            for tasks in self._queues.values():
+                tasks.put(None)
+        for process in workers:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        with self._lock:
+            for future, *_ in self._jobs.values():
+                if not future.done():
+                    future.set_exception(RuntimeError("Audio worker pool closed"))
+            self._jobs.clear()
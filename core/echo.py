@@ -0,0 +1,278 @@
+"""
+🔇 WORM ECHO SUPPRESSION & BARGE-IN
+The worm knows exactly what it is playing, so that PCM is used as a
+reference to subtract its own voice from the microphone (frequency-domain
+spectral subtraction with an adaptive per-bin coupling estimate)
+Whatever speech survives is the user talking over the worm - a barge-in
+"""
+
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+import pygame
+
+from .vad import VADConfig, VoiceActivityDetector
+
+SETTINGS_FILE = "worm_settings.json"
+SAMPLE_RATE = 16000
+
+
+@dataclass
+class EchoConfig:
+    """Tunable echo suppression parameters (worm_settings.json -> voice.echo)"""
+    enabled: bool = True
+    frame: int = 512                 # FFT size (32 ms), 50% overlap
+    over_subtraction: float = 2.0    # remove this many times the predicted echo
+    spectral_floor: float = 0.05     # never attenuate a bin below this gain
+    initial_coupling: float = 1.0    # start high so early frames count as echo-only
+    adapt: float = 0.1               # coupling smoothing on echo-only frames
+    doubletalk_ratio: float = 2.0    # mic energy above this x predicted echo = user talking
+    slack_frames: int = 2            # reference frames either side to absorb misalignment
+    barge_in_ms: int = 300           # sustained speech over playback before interrupting
+    barge_in_ratio: float = 2.0      # barge-in needs this much more energy than normal VAD
+
+
+def load_echo_config(settings_file: str = SETTINGS_FILE) -> EchoConfig:
+    """Read echo settings (defaults for anything missing)"""
+    try:
+        with open(settings_file, 'r') as f:
+            echo = json.load(f).get("voice", {}).get("echo", {})
+        known = EchoConfig.__dataclass_fields__
+        return EchoConfig(**{k: v for k, v in echo.items() if k in known})
+    except Exception as e:
+        print(f"⚠️  Could not load echo settings: {e}")
+        return EchoConfig()
+
+
+def sound_to_reference(sound: pygame.mixer.Sound) -> np.ndarray:
+    """Mono float32 PCM at the capture rate"""
+    frequency, _, _ = pygame.mixer.get_init()
+    pcm = pygame.sndarray.array(sound).astype(np.float32)
+    if pcm.ndim > 1:
+        pcm = pcm.mean(axis=1)
+    if frequency == SAMPLE_RATE:
+        return pcm
+
+    target = np.arange(int(len(pcm) * SAMPLE_RATE / frequency)) * (frequency / SAMPLE_RATE)
+    return np.interp(target, np.arange(len(pcm)), pcm).astype(np.float32)
+
+
+class PlaybackReference:
+    """Timeline of what the speaker is playing, in capture time
+
+    Attach to a ChannelPlayer's on_start/on_stop taps. Sounds are
+    converted lazily, the first time the suppressor needs them.
+    """
+
+    def __init__(self, output_latency: float = 0.0, keep_seconds: float = 30.0):
+        """output_latency: play() -> audible at the mic (SyncOffsets.audio_output_latency)"""
+        self.output_latency = output_latency
+        self.keep_seconds = keep_seconds
+        self._lock = threading.Lock()
+        # [audible_at, sound or converted PCM, audible_until]
+        self._segments: List[list] = []
+
+    def attach(self, player):
+        """Tap a ChannelPlayer so its output becomes the reference"""
+        player.on_start = self.on_start
+        player.on_stop = self.on_stop
+
+    def on_start(self, sound: pygame.mixer.Sound):
+        """A sound just started on the speech channel"""
+        audible_at = time.perf_counter() + self.output_latency
+        with self._lock:
+            self._segments.append([audible_at, sound, audible_at + sound.get_length()])
+            cutoff = audible_at - self.keep_seconds
+            self._segments = [seg for seg in self._segments if seg[2] > cutoff]
+
+    def on_stop(self):
+        """Playback was cut off - nothing after now (+ latency) is audible"""
+        cut = time.perf_counter() + self.output_latency
+        with self._lock:
+            for segment in self._segments:
+                segment[2] = min(segment[2], cut)
+
+    def is_active(self, start: float, end: float) -> bool:
+        """Is any reference audible in [start, end)?"""
+        with self._lock:
+            return any(seg[0] < end and seg[2] > start for seg in self._segments)
+
+    def window(self, start: float, length: int) -> np.ndarray:
+        """Reference samples audible from `start` (capture time) for `length` samples"""
+        out = np.zeros(length, dtype=np.float32)
+        end = start + length / SAMPLE_RATE
+        with self._lock:
+            segments = [seg for seg in self._segments if seg[0] < end and seg[2] > start]
+            for segment in segments:
+                if isinstance(segment[1], pygame.mixer.Sound):
+                    segment[1] = sound_to_reference(segment[1])
+
+        for audible_at, pcm, audible_until in segments:
+            offset = int(round((audible_at - start) * SAMPLE_RATE))
+            stop = min(len(pcm), int((audible_until - audible_at) * SAMPLE_RATE))
+            src_from = max(0, -offset)
+            dst_from = max(0, offset)
+            count = min(length - dst_from, stop - src_from)
+            if count > 0:
+                out[dst_from:dst_from + count] += pcm[src_from:src_from + count]
+        return out
+
+
+class EchoSuppressor:
+    """Streaming spectral subtraction of the playback reference from mic audio
+
+    Output is delayed by up to one frame but keeps the sample count; when
+    nothing is playing, audio passes through untouched.
+    """
+
+    def __init__(self, reference: PlaybackReference, config: EchoConfig = None):
+        self.reference = reference
+        self.config = config or EchoConfig()
+        self.frame = self.config.frame
+        self.hop = self.frame // 2
+        # Periodic Hann sums to one at 50% overlap
+        self._window = np.hanning(self.frame + 1)[:-1].astype(np.float32)
+        bins = self.frame // 2 + 1
+        # Running least-squares estimate: coupling = E[|mic||ref|] / E[|ref|^2]
+        self._cross = np.full(bins, self.config.initial_coupling, dtype=np.float32)
+        self._power = np.ones(bins, dtype=np.float32)
+        self.coupling = self._cross / self._power
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._tail = np.zeros(self.hop, dtype=np.float32)
+        self._pending_time = 0.0
+
+        self.processed_seconds = 0.0
+        self.suppressed_db = 0.0
+
+    def _frames(self, signal: np.ndarray, n_frames: int) -> np.ndarray:
+        index = np.arange(self.frame)[None, :] + self.hop * np.arange(n_frames)[:, None]
+        return signal[index] * self._window
+
+    def process(self, block, captured_at: float) -> bytes:
+        """Clean one capture block; captured_at is the capture time of its first sample"""
+        samples = np.frombuffer(block, dtype=np.int16).astype(np.float32)
+        block_end = captured_at + len(samples) / SAMPLE_RATE
+
+        if not self.config.enabled or (
+                not self._pending.size and not self.reference.is_active(captured_at, block_end)):
+            return bytes(block)
+
+        if not self._pending.size:
+            self._pending_time = captured_at
+        signal = np.concatenate([self._pending, samples])
+        start = self._pending_time
+        n_frames = (len(signal) - self.frame) // self.hop + 1 if len(signal) >= self.frame else 0
+        if n_frames <= 0:
+            self._pending = signal
+            return b""
+
+        reference = self.reference.window(start, len(signal))
+        mic_spec = np.fft.rfft(self._frames(signal, n_frames), axis=1)
+        ref_mag = np.abs(np.fft.rfft(self._frames(reference, n_frames), axis=1))
+        mic_mag = np.abs(mic_spec)
+
+        self._adapt(mic_mag, ref_mag)
+
+        # Widen the reference in time so small alignment errors still suppress
+        slack = self.config.slack_frames
+        if slack:
+            padded = np.pad(ref_mag, ((slack, slack), (0, 0)))
+            ref_mag = np.max([padded[i:i + n_frames] for i in range(2 * slack + 1)], axis=0)
+
+        echo = self.coupling * ref_mag
+        gain = np.maximum(1.0 - self.config.over_subtraction * echo / (mic_mag + 1e-6),
+                          self.config.spectral_floor)
+        cleaned = np.fft.irfft(mic_spec * gain, n=self.frame, axis=1)
+
+        # Overlap-add, carrying the last half-frame into the next call
+        out = np.zeros(n_frames * self.hop + self.hop, dtype=np.float32)
+        out[:self.hop] += self._tail
+        for i, frame in enumerate(cleaned):
+            out[i * self.hop:i * self.hop + self.frame] += frame
+
+        consumed = n_frames * self.hop
+        self.processed_seconds += consumed / SAMPLE_RATE
+        energy_in = float(np.sum(mic_mag ** 2))
+        if energy_in > 0:
+            energy_out = float(np.sum((mic_mag * gain) ** 2))
+            self.suppressed_db = 10 * np.log10(energy_in / max(energy_out, 1e-9))
+
+        if not self.reference.is_active(start, start + len(signal) / SAMPLE_RATE):
+            # Playback is over for this whole span - every gain was one, so the
+            # remainder is exact without waiting for the next frame
+            result = np.concatenate([out[:consumed], signal[consumed:]])
+            self._pending = np.zeros(0, dtype=np.float32)
+            self._tail = np.zeros(self.hop, dtype=np.float32)
+        else:
+            result = out[:consumed]
+            self._pending = signal[consumed:]
+            self._pending_time = start + consumed / SAMPLE_RATE
+            self._tail = out[consumed:]
+
+        return np.clip(result, -32768, 32767).astype(np.int16).tobytes()
+
+    def _adapt(self, mic_mag: np.ndarray, ref_mag: np.ndarray):
+        """Track echo coupling per bin on frames the echo alone explains"""
+        a = self.config.adapt
+        for mic, ref in zip(mic_mag, ref_mag):
+            predicted = float(np.sum((self.coupling * ref) ** 2))
+            if predicted <= 0 or float(np.sum(mic ** 2)) > self.config.doubletalk_ratio * predicted:
+                continue  # silence in the reference, or the user is talking too
+            scale = float(np.mean(ref ** 2)) or 1.0
+            self._cross = (1 - a) * self._cross + a * mic * ref / scale
+            self._power = (1 - a) * self._power + a * ref * ref / scale
+            self.coupling = self._cross / np.maximum(self._power, 1e-6)
+
+    def reset(self):
+        """Drop buffered audio (keeps the learned coupling)"""
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._tail = np.zeros(self.hop, dtype=np.float32)
+
+
+class BargeInDetector:
+    """Sustained near-end speech while the worm is talking"""
+
+    def __init__(self, vad_config: VADConfig, config: EchoConfig = None):
+        self.config = config or EchoConfig()
+        # Residual echo is louder than room noise - raise the bar while playing
+        strict = VADConfig(**{**vad_config.__dict__,
+                              "energy_threshold": vad_config.energy_threshold * self.config.barge_in_ratio})
+        self.vad = VoiceActivityDetector(strict)
+        self.required_frames = max(1, self.config.barge_in_ms // strict.frame_ms)
+        self._speech_frames = 0
+        self._remainder = np.zeros(0, dtype=np.int16)
+        self.barge_ins = 0
+
+    def update(self, cleaned: bytes) -> bool:
+        """Feed echo-suppressed audio; True once the user has talked over playback"""
+        samples = np.concatenate([self._remainder, np.frombuffer(cleaned, dtype=np.int16)])
+        size = self.vad.frame_samples
+        n_frames = len(samples) // size
+        self._remainder = samples[n_frames * size:]
+        if n_frames == 0:
+            return False
+
+        for is_speech in self.vad.classify(samples[:n_frames * size].reshape(n_frames, size)):
+            self._speech_frames = self._speech_frames + 1 if is_speech else 0
+            if self._speech_frames >= self.required_frames:
+                self.barge_ins += 1
+                self.reset()
+                return True
+        return False
+
+    def reset(self):
+        self._speech_frames = 0
+        self._remainder = np.zeros(0, dtype=np.int16)
+
+
+def capture_time(time_info, frames: int, sample_rate: int = SAMPLE_RATE) -> float:
+    """perf_counter time of the first sample in a sounddevice input callback"""
+    delay = time_info.currentTime - time_info.inputBufferAdcTime
+    if not 0.0 <= delay < 1.0:
+        # Backend doesn't report ADC time - assume the block just finished
+        delay = frames / sample_rate
+    return time.perf_counter() - delay
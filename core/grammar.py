@@ -0,0 +1,136 @@
+"""
+📜 WORM RECOGNIZER GRAMMAR
+Builds a Vosk grammar from the response library so recognition is
+constrained to the phrases the worm actually responds to
+Free-form recognition is kept only as a fallback for unknown speech
+"""
+
+import json
+from typing import List
+
+from response_store import ResponseStore, RESPONSES_FILE
+
+# Handled by process_command before any response lookup
+SYSTEM_COMMAND_PHRASES = [
+    "voice", "text", "quit", "exit", "stop", "help",
+    "stop listening", "back to text mode",
+]
+
+# Spoken forms of the Arduino commands (see show_help)
+ARDUINO_COMMAND_PHRASES = [
+    "move forward", "turn right", "turn left", "lean back", "dance",
+    "open mouth", "close mouth", "talk", "reset", "wiggle",
+]
+
+UNKNOWN = "[unk]"
+
+# Audio kept from before the first partial, so the fallback hears the onset (16 kHz int16)
+FALLBACK_PREROLL = 16000 * 2 // 2
+# Cap on the audio buffered for one utterance (seconds at 16 kHz)
+MAX_FALLBACK_AUDIO = 15 * 16000 * 2
+
+
+def build_phrases(store: ResponseStore) -> List[str]:
+    """Grammar phrase list: every trigger, alias and keyword, system and Arduino commands, [unk]"""
+    phrases = store.spoken_phrases() + SYSTEM_COMMAND_PHRASES + ARDUINO_COMMAND_PHRASES
+
+    # Keep order stable and drop duplicates/empties
+    unique = list(dict.fromkeys(phrase for phrase in phrases if phrase))
+    return unique + [UNKNOWN]
+
+
+def _without_unknown(text: str) -> str:
+    """Drop [unk] tokens from a transcript"""
+    return " ".join(word for word in text.split() if word != UNKNOWN)
+
+
+class ResponseGrammar:
+    """Grammar phrases that track changes to the responses file"""
+
+    def __init__(self, responses_file: str = RESPONSES_FILE):
+        self.responses_file = responses_file
+        self.store = ResponseStore(responses_file)
+        self.phrases: List[str] = []
+        self.refresh()
+
+    def changed(self) -> bool:
+        """Has the responses file been edited since the grammar was built?"""
+        return self.store.changed()
+
+    def refresh(self) -> bool:
+        """Rebuild the phrase list if the responses file changed"""
+        if self.phrases and not self.changed():
+            return False
+
+        # An unreadable file leaves the store empty - commands only
+        self.store.load()
+        self.phrases = build_phrases(self.store)
+        print(f"📜 Recognizer grammar built ({len(self.phrases) - 1} phrases)")
+        return True
+
+
+class GrammarFallbackRecognizer:
+    """KaldiRecognizer look-alike: grammar first, free-form only for [unk]
+
+    The current utterance is buffered while the constrained recognizer runs.
+    As soon as a partial contains [unk] the buffer is handed to the free-form
+    recognizer and the rest of the utterance is fed to both, so the fallback
+    decode is spread over the utterance instead of landing on the capture
+    thread all at once at the endpoint.
+    """
+
+    def __init__(self, grammar_recognizer, fallback_recognizer=None):
+        self.grammar = grammar_recognizer
+        self.fallback = fallback_recognizer
+        self._buffer = bytearray()
+        self._live = False
+        self.fallback_count = 0
+
+    def AcceptWaveform(self, data: bytes) -> bool:
+        if self._live:
+            self.fallback.AcceptWaveform(data)
+        elif self.fallback is not None and len(self._buffer) < MAX_FALLBACK_AUDIO:
+            self._buffer.extend(data)
+        return self.grammar.AcceptWaveform(data)
+
+    def PartialResult(self) -> str:
+        partial = json.loads(self.grammar.PartialResult()).get("partial", "")
+        if self.fallback is not None and not self._live:
+            if not partial:
+                # Between utterances - keep only the pre-roll
+                del self._buffer[:-FALLBACK_PREROLL]
+            elif UNKNOWN in partial.split():
+                self._go_live()
+        return json.dumps({"partial": _without_unknown(partial)})
+
+    def Result(self) -> str:
+        return self._resolve(self.grammar.Result())
+
+    def FinalResult(self) -> str:
+        return self._resolve(self.grammar.FinalResult())
+
+    def _go_live(self):
+        """Catch the fallback up on the utterance so far and keep feeding it"""
+        self._live = True
+        self.fallback.AcceptWaveform(bytes(self._buffer))
+        self._buffer.clear()
+
+    def _resolve(self, result_json: str) -> str:
+        """Swap an unknown grammar result for the free-form decode of the same audio"""
+        text = json.loads(result_json).get("text", "")
+        unknown = self.fallback is not None and UNKNOWN in text.split()
+        if unknown and not self._live:
+            # [unk] only showed up in the final result
+            self._go_live()
+
+        live, self._live = self._live, False
+        self._buffer.clear()
+        if not unknown:
+            if live:
+                # A partial guessed [unk] but the grammar settled - flush the fallback
+                self.fallback.FinalResult()
+            # Without a fallback, out-of-grammar speech is simply not heard
+            return json.dumps({"text": _without_unknown(text)})
+
+        self.fallback_count += 1
+        return self.fallback.FinalResult()
@@ -0,0 +1,200 @@
+"""
+⏱️ WORM LATENCY CALIBRATION
+Measures how late audio and servo motion are relative to the moment we
+issue them, so mouth cues can be lined up with audible speech
+Offsets are stored in worm_settings.json under "sync"
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import List, Optional
+
+import numpy as np
+import pygame
+import sounddevice as sd
+
+from .resample import device_capture_rate
+
+SETTINGS_FILE = "worm_settings.json"
+
+# Harmless command used to time the serial link - the sketch prints
+# "Command received: ..." as soon as it has parsed a line
+SERIAL_PROBE_COMMAND = "cm"
+
+# A loopback click is "heard" once the mic signal exceeds this many times
+# the pre-click noise floor
+ONSET_THRESHOLD = 8.0
+
+
+@dataclass
+class SyncOffsets:
+    """Measured latencies in seconds"""
+    mixer_buffer: int = 512           # pygame mixer buffer size (samples)
+    audio_output_latency: float = 0.0  # play() -> audible
+    servo_latency: float = 0.0         # serial write -> servo starts moving
+    servo_travel: float = 0.0          # extra mechanical delay, tuned by hand
+
+    @property
+    def cue_offset(self) -> float:
+        """Seconds to delay the mouth cue after play() (negative: cue first)"""
+        return self.audio_output_latency - (self.servo_latency + self.servo_travel)
+
+
+def load_sync_offsets(settings_file: str = SETTINGS_FILE) -> SyncOffsets:
+    """Read offsets from the settings file (defaults if never calibrated)"""
+    try:
+        with open(settings_file, 'r') as f:
+            sync = json.load(f).get("sync", {})
+        known = SyncOffsets.__dataclass_fields__
+        return SyncOffsets(**{k: v for k, v in sync.items() if k in known})
+    except Exception as e:
+        print(f"⚠️  Could not load sync offsets: {e}")
+        return SyncOffsets()
+
+
+def save_sync_offsets(offsets: SyncOffsets, settings_file: str = SETTINGS_FILE) -> bool:
+    """Write offsets into the "sync" section of the settings file"""
+    try:
+        settings = {}
+        if os.path.exists(settings_file):
+            with open(settings_file, 'r') as f:
+                settings = json.load(f)
+
+        settings["sync"] = asdict(offsets)
+        with open(settings_file, 'w') as f:
+            json.dump(settings, f, indent=2)
+        print(f"✅ Sync offsets saved to {settings_file}")
+        return True
+    except Exception as e:
+        print(f"❌ Could not save sync offsets: {e}")
+        return False
+
+
+def mixer_buffer_latency(buffer_size: int) -> float:
+    """Latency added by the pygame mixer buffer alone"""
+    init = pygame.mixer.get_init()
+    if not init:
+        return 0.0
+    frequency = init[0]
+    return buffer_size / frequency
+
+
+def _click_sound(duration: float = 0.01) -> pygame.mixer.Sound:
+    """Short full-scale click in the mixer's format"""
+    frequency, _, channels = pygame.mixer.get_init()
+    samples = int(frequency * duration)
+    click = np.zeros((samples, channels), dtype=np.int16)
+    click[: samples // 2] = 30000
+    return pygame.mixer.Sound(buffer=click.tobytes())
+
+
+def measure_loopback_latency(trials: int = 5, samplerate: int = 16000) -> Optional[float]:
+    """Play clicks through the mixer and time them arriving at the microphone
+
+    Needs the speaker audible to the mic. Returns the median play() ->
+    audible latency in seconds, or None if no click was detected.
+    """
+    click = _click_sound()
+    channel = pygame.mixer.find_channel(True)
+    results: List[float] = []
+
+    for trial in range(trials):
+        blocks = []
+        lock = threading.Lock()
+
+        def _record(indata, frames, time_info, status):
+            with lock:
+                blocks.append((time_info.inputBufferAdcTime, indata[:, 0].copy()))
+
+        with sd.InputStream(samplerate=samplerate, channels=1, dtype='float32',
+                            callback=_record) as stream:
+            time.sleep(0.3)  # collect the noise floor
+            played_at = stream.time
+            channel.play(click)
+            time.sleep(0.7)
+
+        with lock:
+            captured = list(blocks)
+        latency = _find_onset(captured, played_at, samplerate)
+        if latency is None:
+            print(f"⚠️  Trial {trial + 1}: click not detected")
+            continue
+
+        print(f"   Trial {trial + 1}: {latency * 1000:.1f} ms")
+        results.append(latency)
+
+    return float(np.median(results)) if results else None
+
+
+def _find_onset(blocks, played_at: float, samplerate: int) -> Optional[float]:
+    """Stream-clock time from play() to the first loud sample"""
+    if not blocks:
+        return None
+
+    start_time = blocks[0][0]
+    signal = np.abs(np.concatenate([samples for _, samples in blocks]))
+
+    # Noise floor from the audio captured before play()
+    pre_click = int((played_at - start_time) * samplerate)
+    if pre_click <= 0:
+        return None
+    floor = max(float(np.median(signal[:pre_click])), 1e-4)
+
+    loud = np.nonzero(signal[pre_click:] > floor * ONSET_THRESHOLD)[0]
+    if loud.size == 0:
+        return None
+    return (pre_click + loud[0]) / samplerate - (played_at - start_time)
+
+
+def measure_serial_latency(connection, trials: int = 5) -> Optional[float]:
+    """Time the Arduino's "Command received" reply to estimate one-way serial latency"""
+    results: List[float] = []
+
+    for _ in range(trials):
+        connection.reset_input_buffer()
+        sent_at = time.perf_counter()
+        connection.write(f"{SERIAL_PROBE_COMMAND}\n".encode())
+        reply = connection.readline().decode('utf-8', errors='ignore').strip()
+        round_trip = time.perf_counter() - sent_at
+
+        if not reply:
+            continue
+        # The sketch acts on the command as it prints the reply
+        results.append(round_trip / 2)
+        time.sleep(0.2)
+
+    return float(np.median(results)) if results else None
+
+
+def calibrate(serial_connection=None, settings_file: str = SETTINGS_FILE,
+              trials: int = 5) -> SyncOffsets:
+    """Run all measurements and store the offsets"""
+    offsets = load_sync_offsets(settings_file)
+
+    print("⏱️  Measuring audio output latency (speaker must be audible to the mic)...")
+    loopback = measure_loopback_latency(trials, device_capture_rate())
+    if loopback is not None:
+        offsets.audio_output_latency = loopback
+    else:
+        # Without a loopback path the buffer is the best lower bound we have
+        offsets.audio_output_latency = mixer_buffer_latency(offsets.mixer_buffer)
+        print("⚠️  Loopback failed - using mixer buffer latency only")
+    print(f"🔊 Audio output latency: {offsets.audio_output_latency * 1000:.1f} ms")
+
+    if serial_connection is not None:
+        print("⏱️  Measuring serial-to-servo latency...")
+        serial_latency = measure_serial_latency(serial_connection, trials)
+        if serial_latency is not None:
+            offsets.servo_latency = serial_latency
+            print(f"🤖 Servo latency: {offsets.servo_latency * 1000:.1f} ms")
+        else:
+            print("⚠️  Arduino did not reply - servo latency unchanged")
+    else:
+        print("🤖 No Arduino connected - servo latency unchanged")
+
+    print(f"🎯 Mouth cue offset: {offsets.cue_offset * 1000:+.1f} ms")
+    save_sync_offsets(offsets, settings_file)
+    return offsets
@@ -0,0 +1,181 @@
+"""
+🔔 WORM PLAYBACK
+Playback completion futures for mixer channels
+Every sound played gets a future resolved when the channel moves past it.
+One monitor thread polls get_busy/get_sound while any sound is in flight
+and sleeps on an event otherwise, so callers wait on a future and nothing
+wakes up while the worm is silent. No SDL video/event subsystem is
+needed - its events must be pumped on the thread that initialised video,
+which a background waiter cannot do on macOS
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Deque, List, Optional, Tuple
+
+import pygame
+
+# How often the monitor checks busy channels (seconds) - well under a mixer buffer
+POLL_INTERVAL = 0.01
+
+
+class ChannelPlayer:
+    """Plays sounds back-to-back on one channel with completion futures"""
+
+    def __init__(self, channel: pygame.mixer.Channel):
+        self.channel = channel
+        self._lock = threading.Lock()
+        # Sounds handed to the channel (playing + queued slot), oldest first
+        self._active: Deque[Tuple[pygame.mixer.Sound, Future]] = deque()
+        # Sounds waiting for the channel's single queue slot
+        self._waiting: Deque[Tuple[pygame.mixer.Sound, Future]] = deque()
+        # Playback taps (e.g. the echo suppressor's reference) - called with the lock held
+        self.on_start: Optional[Callable[[pygame.mixer.Sound], None]] = None
+        self.on_stop: Optional[Callable[[], None]] = None
+        # Wakes the monitor when the player goes from idle to busy
+        self.on_busy: Optional[Callable[[], None]] = None
+
+    def play(self, sound: pygame.mixer.Sound) -> Future:
+        """Play now, or after everything already submitted - returns a completion future"""
+        future = Future()
+        future.set_running_or_notify_cancel()
+
+        with self._lock:
+            submitted = self._waiting or self._active
+            if submitted and sound is submitted[-1][0]:
+                # Completion is detected by the channel's sound changing, so
+                # back-to-back plays of one Sound need distinct objects
+                sound = pygame.mixer.Sound(buffer=sound.get_raw())
+            if not self._active:
+                self._start(sound, future)
+            elif len(self._active) == 1:
+                self.channel.queue(sound)
+                self._active.append((sound, future))
+            else:
+                self._waiting.append((sound, future))
+        if self.on_busy is not None:
+            self.on_busy()
+        return future
+
+    def _start(self, sound: pygame.mixer.Sound, future: Future):
+        """Start a sound on the idle channel (lock held)"""
+        self.channel.play(sound)
+        self._active.append((sound, future))
+        self._notify_start(sound)
+
+    def _notify_start(self, sound: pygame.mixer.Sound):
+        """Tell the playback tap a sound just became audible"""
+        if self.on_start is not None:
+            self.on_start(sound)
+
+    def poll(self):
+        """Resolve the oldest sound once the channel has moved past it (monitor thread)"""
+        with self._lock:
+            if not self._active:
+                return
+            current = self.channel.get_sound() if self.channel.get_busy() else None
+            if current is self._active[0][0]:
+                return
+            sound, future = self._active.popleft()
+
+            if self._active:
+                # The queued sound started playing when this one ended
+                self._notify_start(self._active[0][0])
+
+            if self._waiting:
+                next_sound, next_future = self._waiting.popleft()
+                if self._active:
+                    self.channel.queue(next_sound)
+                    self._active.append((next_sound, next_future))
+                else:
+                    self._start(next_sound, next_future)
+
+        if not future.done():
+            future.set_result(True)
+
+    def is_busy(self) -> bool:
+        """Check if anything is playing or waiting to play"""
+        with self._lock:
+            return bool(self._active or self._waiting)
+
+    def stop(self):
+        """Stop playback and resolve every outstanding future as cut off"""
+        with self._lock:
+            pending = list(self._active) + list(self._waiting)
+            self._active.clear()
+            self._waiting.clear()
+            self.channel.stop()
+            if self.on_stop is not None:
+                self.on_stop()
+
+        for _, future in pending:
+            if not future.done():
+                future.set_result(False)
+
+
+class PlaybackMonitor:
+    """One thread that advances every ChannelPlayer as its channel finishes
+
+    Polls only while some player has sounds in flight; otherwise it blocks
+    until the next play().
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        self._players: List[ChannelPlayer] = []
+        self._running = True
+        self._wakeup = threading.Event()
+        threading.Thread(target=self._watch, name="playback-monitor", daemon=True).start()
+
+    @classmethod
+    def get(cls) -> "PlaybackMonitor":
+        """Process-wide monitor"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def player(self, channel: pygame.mixer.Channel) -> ChannelPlayer:
+        """Create a player for a channel and start watching it"""
+        player = ChannelPlayer(channel)
+        player.on_busy = self._wakeup.set
+        self._players = self._players + [player]
+        return player
+
+    def _watch(self):
+        """Poll each channel and resolve completions as sounds finish"""
+        while self._running:
+            # Cleared before checking, so a play() from here on wakes the wait
+            self._wakeup.clear()
+            if not any(player.is_busy() for player in self._players):
+                self._wakeup.wait()
+                continue
+            for player in self._players:
+                try:
+                    player.poll()
+                except pygame.error:
+                    # Mixer shut down underneath us
+                    return
+            time.sleep(POLL_INTERVAL)
+
+    def close(self):
+        """Stop watching channels"""
+        self._running = False
+        self._wakeup.set()
+
+
+def reserve_player(channel_id: int = 0) -> ChannelPlayer:
+    """Reserve a mixer channel and return a player bound to it"""
+    pygame.mixer.set_reserved(channel_id + 1)
+    return PlaybackMonitor.get().player(pygame.mixer.Channel(channel_id))
+
+
+def resolved(result: bool = True) -> Future:
+    """A future that is already complete - for skipped or empty playback"""
+    future = Future()
+    future.set_result(result)
+    return future
@@ -0,0 +1,118 @@
+"""
+🎚️ WORM CAPTURE RESAMPLER
+Lets capture open the microphone at its native rate (44.1/48 kHz USB and
+HDMI devices) and hands Vosk 16 kHz audio
+Streaming rational polyphase FIR in NumPy: each block is one gather and
+one multiply-sum into preallocated work arrays, with the filter history
+carried between blocks
+"""
+
+from math import gcd
+from typing import Optional
+
+import numpy as np
+import sounddevice as sd
+
+TARGET_RATE = 16000
+
+
+def design_lowpass(up: int, down: int, taps_per_phase: int = 64) -> np.ndarray:
+    """Kaiser-windowed sinc prototype at the upsampled rate (gain = up)"""
+    length = up * taps_per_phase
+    cutoff = 0.5 / max(up, down) * 0.92  # cycles per upsampled sample, with a guard band
+    n = np.arange(length) - (length - 1) / 2
+    prototype = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(length, 8.0)
+    return prototype * up / prototype.sum()
+
+
+class PolyphaseResampler:
+    """Stream int16 audio from in_rate to out_rate in arbitrary block sizes"""
+
+    def __init__(self, in_rate: int, out_rate: int = TARGET_RATE, taps_per_phase: int = 64):
+        self.in_rate = int(in_rate)
+        self.out_rate = int(out_rate)
+        g = gcd(self.in_rate, self.out_rate)
+        self.up = self.out_rate // g
+        self.down = self.in_rate // g
+        self.taps = taps_per_phase
+        self.passthrough = self.up == self.down
+
+        prototype = design_lowpass(self.up, self.down, taps_per_phase)
+        # phases[p, j] = prototype[p + j * up] - coefficient for input sample k - j
+        self.phases = prototype.reshape(taps_per_phase, self.up).T.astype(np.float32).copy()
+
+        self._history = self.taps - 1
+        self._t = 0  # next output position (upsampled units) relative to the block start
+        self._offsets = np.arange(self.taps)[None, :]
+        # Work arrays reused between calls; grown if a larger block ever arrives
+        self._buffer = np.zeros(self._history, dtype=np.float32)
+        self._allocate(4096)
+
+    def _allocate(self, n_in: int):
+        """Size the work arrays for blocks of up to n_in samples (keeps the filter history)"""
+        buffer = np.zeros(self._history + n_in, dtype=np.float32)
+        buffer[:self._history] = self._buffer[:self._history]
+        self._buffer = buffer
+        n_out = self.output_length(n_in)
+        self._steps = self.down * np.arange(n_out)
+        self._times = np.zeros(n_out, dtype=np.int64)
+        self._k = np.zeros(n_out, dtype=np.int64)
+        self._p = np.zeros(n_out, dtype=np.int64)
+        self._index = np.zeros((n_out, self.taps), dtype=np.int64)
+        self._window = np.zeros((n_out, self.taps), dtype=np.float32)
+        self._coeffs = np.zeros((n_out, self.taps), dtype=np.float32)
+        self._values = np.zeros(n_out, dtype=np.float32)
+        self._out = np.zeros(n_out, dtype=np.int16)
+
+    def output_length(self, n_in: int) -> int:
+        """Upper bound on outputs produced for n_in inputs"""
+        return -(-n_in * self.up // self.down) + 1
+
+    def process(self, data) -> np.ndarray:
+        """Resample one block; the result is a view valid until the next call"""
+        samples = np.frombuffer(data, dtype=np.int16)
+        if self.passthrough:
+            return samples
+        n_in = len(samples)
+
+        needed = self._history + n_in
+        if len(self._buffer) < needed:
+            self._allocate(n_in)
+
+        buffer = self._buffer
+        buffer[self._history:needed] = samples
+
+        # Output m sits at upsampled time t: input k = t // up, phase p = t % up
+        n_out = max(0, -(-(n_in * self.up - self._t) // self.down))
+        times = np.add(self._steps[:n_out], self._t, out=self._times[:n_out])
+        k = np.floor_divide(times, self.up, out=self._k[:n_out])
+        p = np.remainder(times, self.up, out=self._p[:n_out])
+        index = np.subtract(k[:, None], self._offsets, out=self._index[:n_out])
+        index += self._history
+        window = np.take(buffer, index, out=self._window[:n_out], mode='clip')
+        coeffs = np.take(self.phases, p, axis=0, out=self._coeffs[:n_out], mode='clip')
+        values = np.einsum('ij,ij->i', window, coeffs, out=self._values[:n_out])
+
+        out = self._out[:n_out]
+        np.rint(values, out=values)
+        np.clip(values, -32768, 32767, out=values)
+        np.copyto(out, values, casting='unsafe')
+
+        # Carry the filter history and output phase into the next block
+        buffer[:self._history] = buffer[n_in:needed]
+        self._t += self.down * n_out - n_in * self.up
+        return out
+
+    def reset(self):
+        self._buffer[:self._history] = 0
+        self._t = 0
+
+
+def device_capture_rate(device: Optional[int] = None) -> int:
+    """The input device's native sample rate (16 kHz if it can't be queried)"""
+    try:
+        info = sd.query_devices(device, kind='input')
+        return int(info['default_samplerate'])
+    except Exception as e:
+        print(f"⚠️  Could not query input device rate ({e}) - assuming {TARGET_RATE} Hz")
+        return TARGET_RATE
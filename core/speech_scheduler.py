@@ -0,0 +1,252 @@
+"""
+📣 WORM SPEECH SCHEDULER
+Priority queue for everything the worm says
+Higher-priority lines preempt chit-chat, duplicate lines are coalesced,
+and stale lines expire with a log message instead of vanishing silently
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Callable, Dict, List, Optional
+
+
+class SpeechPriority(IntEnum):
+    """Speech priorities - higher values are spoken first and may preempt"""
+    CHAT = 0        # AI-generated conversation
+    RESPONSE = 1    # Defined responses from worm_responses.json
+    SYSTEM = 2      # Goodbye, mode switches, command failures
+
+
+@dataclass
+class Utterance:
+    """One line waiting to be spoken"""
+    text: Any                      # str or an iterable of text chunks
+    priority: SpeechPriority
+    mouth_movements: int = 1
+    enqueued_at: float = field(default_factory=time.monotonic)
+    future: Future = field(default_factory=Future)
+    seq: int = 0
+    interrupted: bool = False
+
+    @property
+    def key(self) -> Optional[str]:
+        """Coalescing key - streamed text is never coalesced"""
+        if isinstance(self.text, str):
+            return " ".join(self.text.lower().split())
+        return None
+
+
+class SpeechScheduler:
+    """Thread-safe priority speech queue with preemption and queue metrics"""
+
+    def __init__(self, speak: Callable[[Utterance], None], stop: Callable[[], None],
+                 max_queue_age: float = 10.0):
+        """
+        speak: blocking callable that plays one utterance to completion -
+            it must check `utterance.interrupted` once playback has started,
+            since a stop() issued before that point has nothing to cut off
+        stop: cuts off whatever is currently playing
+        max_queue_age: seconds a line may wait before it is dropped as stale
+        """
+        self._speak = speak
+        self._stop = stop
+        self.max_queue_age = max_queue_age
+
+        self._condition = threading.Condition()
+        self._heap: List[tuple] = []
+        self._queued: Dict[str, Utterance] = {}
+        self._current: Optional[Utterance] = None
+        self._counter = itertools.count()
+        self._running = True
+
+        self._metrics = {
+            "submitted": 0,
+            "spoken": 0,
+            "coalesced": 0,
+            "preempted": 0,
+            "interrupted": 0,
+            "expired": 0,
+            "started": 0,
+            "max_queue_depth": 0,
+            "total_wait": 0.0,
+        }
+
+        threading.Thread(target=self._worker, daemon=True).start()
+
+    def submit(self, text, priority: SpeechPriority = SpeechPriority.RESPONSE,
+               mouth_movements: int = 1) -> Future:
+        """Queue a line - returns a future resolved True once spoken, False if dropped or cut off"""
+        utterance = Utterance(text=text, priority=priority, mouth_movements=mouth_movements)
+        utterance.future.set_running_or_notify_cancel()
+
+        preempt = None
+        existing = None
+        with self._condition:
+            self._metrics["submitted"] += 1
+            key = utterance.key
+
+            # Same line already playing or waiting - share its future
+            if key is not None:
+                if self._current is not None and self._current.key == key:
+                    self._metrics["coalesced"] += 1
+                    return self._current.future
+                if key in self._queued:
+                    existing = self._queued[key]
+                    self._metrics["coalesced"] += 1
+                    if priority > existing.priority:
+                        self._requeue(existing, priority)
+                        preempt = self._preempt_for(priority)
+                    utterance = existing
+
+            if utterance is not existing:
+                utterance.seq = next(self._counter)
+                self._push(utterance)
+                preempt = self._preempt_for(priority)
+
+            self._condition.notify()
+
+        # Stopping playback waits on the speech thread - do it outside the lock,
+        # and only if the preempted line is still the one playing. A line that
+        # has not started playing yet sees `interrupted` and stops itself.
+        if preempt:
+            with self._condition:
+                still_playing = self._current is preempt
+            if still_playing:
+                self._stop()
+        return utterance.future
+
+    def _preempt_for(self, priority: SpeechPriority) -> Optional[Utterance]:
+        """Mark the current line interrupted if `priority` outranks it (condition held)"""
+        if (self._current is None or priority <= self._current.priority
+                or self._current.interrupted):
+            return None
+        print(f"✂️  Preempting speech for {priority.name.lower()} message")
+        self._metrics["preempted"] += 1
+        self._current.interrupted = True
+        return self._current
+
+    def _push(self, utterance: Utterance):
+        """Add to the heap (condition held)"""
+        heapq.heappush(self._heap, (-utterance.priority, utterance.seq, utterance))
+        if utterance.key is not None:
+            self._queued[utterance.key] = utterance
+        self._metrics["max_queue_depth"] = max(self._metrics["max_queue_depth"], len(self._heap))
+
+    def _requeue(self, utterance: Utterance, priority: SpeechPriority):
+        """Raise the priority of a queued line (condition held)"""
+        self._heap = [entry for entry in self._heap if entry[2] is not utterance]
+        heapq.heapify(self._heap)
+        utterance.priority = priority
+        self._push(utterance)
+
+    def _next(self) -> Optional[Utterance]:
+        """Pop the next fresh utterance, expiring stale ones (condition held)"""
+        while self._heap:
+            _, _, utterance = heapq.heappop(self._heap)
+            if utterance.key is not None:
+                self._queued.pop(utterance.key, None)
+
+            waited = time.monotonic() - utterance.enqueued_at
+            if waited > self.max_queue_age:
+                self._metrics["expired"] += 1
+                print(f"⏱️  Dropped stale speech after {waited:.1f}s in queue: {utterance.text!r}")
+                utterance.future.set_result(False)
+                continue
+
+            self._metrics["started"] += 1
+            self._metrics["total_wait"] += waited
+            return utterance
+        return None
+
+    def _worker(self):
+        """Speak queued lines one at a time"""
+        while True:
+            with self._condition:
+                utterance = self._next()
+                while utterance is None and self._running:
+                    self._condition.wait()
+                    utterance = self._next()
+                if not self._running:
+                    return
+                self._current = utterance
+
+            completed = False
+            try:
+                # Preempted between being picked and starting - skip it
+                if not utterance.interrupted:
+                    self._speak(utterance)
+                completed = not utterance.interrupted
+            except Exception as e:
+                print(f"❌ Speech error: {e}")
+            finally:
+                with self._condition:
+                    self._current = None
+                    if completed:
+                        self._metrics["spoken"] += 1
+                    self._condition.notify_all()
+                utterance.future.set_result(completed)
+
+    def interrupt(self) -> bool:
+        """Cut off the line playing now (barge-in, rollback) - its future resolves False
+
+        Returns False if nothing was playing.
+        """
+        with self._condition:
+            current = self._current
+            if current is None or current.interrupted:
+                return False
+            current.interrupted = True
+            self._metrics["interrupted"] += 1
+
+        # As for preemption: outside the lock, and only if it is still playing
+        with self._condition:
+            still_playing = self._current is current
+        if still_playing:
+            self._stop()
+        return True
+
+    def is_speaking(self) -> bool:
+        """Check if a line is playing or waiting to play"""
+        with self._condition:
+            return self._current is not None or bool(self._heap)
+
+    def queue_depth(self) -> int:
+        """Number of lines waiting (not counting the one playing)"""
+        with self._condition:
+            return len(self._heap)
+
+    def get_metrics(self) -> Dict:
+        """Queue depth and throughput counters"""
+        with self._condition:
+            metrics = dict(self._metrics)
+            metrics["queue_depth"] = len(self._heap)
+            started = metrics["started"]
+            metrics["avg_wait"] = metrics.pop("total_wait") / started if started else 0.0
+            return metrics
+
+    def clear(self, below: SpeechPriority = SpeechPriority.SYSTEM):
+        """Drop queued lines with priority lower than `below`"""
+        with self._condition:
+            keep = []
+            for entry in self._heap:
+                utterance = entry[2]
+                if utterance.priority < below:
+                    if utterance.key is not None:
+                        self._queued.pop(utterance.key, None)
+                    utterance.future.set_result(False)
+                else:
+                    keep.append(entry)
+            self._heap = keep
+            heapq.heapify(self._heap)
+
+    def close(self):
+        """Stop the worker after the current line"""
+        with self._condition:
+            self._running = False
+            self.clear(below=max(SpeechPriority) + 1)
+            self._condition.notify_all()
@@ -0,0 +1,235 @@
+"""
+🗣️ WORM SPEECH STREAM
+Sentence-streaming text-to-speech pipeline
+Splits replies into clauses, synthesizes them ahead of playback and plays
+them back-to-back so speech starts after the first clause, not the whole reply
+"""
+
+import io
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterable, List, Optional, Union
+
+import pygame
+from gtts import gTTS
+
+from .playback import ChannelPlayer, reserve_player
+
+# Split after sentence/clause punctuation followed by whitespace
+CLAUSE_BOUNDARY = re.compile(r'(?<=[.!?;:,])\s+')
+
+# Clauses shorter than this are merged with the next one - gTTS pays a full
+# HTTP round trip per request, so "Oh," on its own costs more than it saves
+MIN_CLAUSE_CHARS = 20
+
+
+class ClauseSplitter:
+    """Incrementally split a text stream (e.g. LLM tokens) into clauses"""
+
+    def __init__(self, min_chars: int = MIN_CLAUSE_CHARS):
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, chunk: str) -> List[str]:
+        """Add text and return any clauses that are now complete"""
+        self._buffer += chunk
+        parts = CLAUSE_BOUNDARY.split(self._buffer)
+
+        # The last part may still be growing - keep it buffered
+        self._buffer = parts.pop()
+
+        clauses = []
+        pending = ""
+        for part in parts:
+            pending = f"{pending} {part}".strip()
+            if len(pending) >= self.min_chars:
+                clauses.append(pending)
+                pending = ""
+
+        if pending:
+            self._buffer = f"{pending} {self._buffer}"
+        return clauses
+
+    def flush(self) -> List[str]:
+        """Return whatever text is left once the source is exhausted"""
+        remainder = self._buffer.strip()
+        self._buffer = ""
+        return [remainder] if remainder else []
+
+
+def split_clauses(text: str, min_chars: int = MIN_CLAUSE_CHARS) -> List[str]:
+    """Split a complete reply into speakable clauses"""
+    splitter = ClauseSplitter(min_chars)
+    return splitter.feed(text) + splitter.flush()
+
+
+def synthesize_clause(text: str, slow: bool = False) -> pygame.mixer.Sound:
+    """Synthesize one clause with gTTS and decode it in memory"""
+    tts = gTTS(text=text, lang='en', slow=slow, tld='com')
+    mp3_data = io.BytesIO()
+    tts.write_to_fp(mp3_data)
+    mp3_data.seek(0)
+    return pygame.mixer.Sound(mp3_data)
+
+
+class SpeechStream:
+    """Synthesize clauses concurrently and queue them for gapless playback"""
+
+    def __init__(self, synthesize: Callable[[str], pygame.mixer.Sound] = synthesize_clause,
+                 lookahead: int = 2, min_clause_chars: int = MIN_CLAUSE_CHARS):
+        self.synthesize = synthesize
+        self.lookahead = max(1, lookahead)
+        self.min_clause_chars = min_clause_chars
+        self.executor = ThreadPoolExecutor(max_workers=self.lookahead,
+                                           thread_name_prefix="worm-tts")
+        self.player: Optional[ChannelPlayer] = None
+        self.volume = 1.0
+        self._stop_event = threading.Event()
+        self._done_event = threading.Event()
+        self._done_event.set()
+        self._first_audio = threading.Event()
+        self.completion: Future = Future()
+        self.completion.set_result(True)
+
+        # Reserve the channel up front, before any synthesis thread asks for it
+        self._get_player()
+
+    def _get_player(self) -> ChannelPlayer:
+        """Reserve a dedicated mixer channel for speech"""
+        if self.player is None:
+            self.player = reserve_player(0)
+            self.player.channel.set_volume(self.volume)
+        return self.player
+
+    def set_volume(self, volume: float):
+        """Set speech volume (0.0 to 1.0)"""
+        self.volume = max(0.0, min(1.0, volume))
+        if self.player is not None:
+            self.player.channel.set_volume(self.volume)
+
+    def speak(self, source: Union[str, Iterable[str]], slow: bool = False,
+              cue: Optional[Callable[[], None]] = None, cue_offset: float = 0.0) -> Future:
+        """Start speaking a reply or an incremental text source (non-blocking)
+
+        `cue` is fired `cue_offset` seconds after the first clause starts
+        playing - a negative offset fires it first and holds playback back,
+        for hardware that lags behind the audio.
+
+        Returns a future resolved when the reply has finished playing -
+        True if it played to the end, False if it was cut off.
+        """
+        self.stop()
+        self.completion = Future()
+        self.completion.set_running_or_notify_cancel()
+
+        # Each reply gets its own events so a slow, abandoned synthesis
+        # request can never signal completion for the next reply
+        self._stop_event = threading.Event()
+        self._done_event = threading.Event()
+        self._first_audio = threading.Event()
+
+        threading.Thread(target=self._run,
+                         args=(source, slow, self.completion, self._stop_event,
+                               self._done_event, self._first_audio, cue, cue_offset),
+                         daemon=True).start()
+        return self.completion
+
+    def _clauses(self, source: Union[str, Iterable[str]],
+                 stop_event: threading.Event) -> Iterable[str]:
+        """Yield clauses from a complete string or a stream of text chunks"""
+        if isinstance(source, str):
+            source = [source]
+
+        splitter = ClauseSplitter(self.min_clause_chars)
+        for chunk in source:
+            if stop_event.is_set():
+                return
+            yield from splitter.feed(chunk)
+        yield from splitter.flush()
+
+    def _run(self, source: Union[str, Iterable[str]], slow: bool, completion: Future,
+             stop_event: threading.Event, done_event: threading.Event,
+             first_audio: threading.Event, cue: Optional[Callable[[], None]],
+             cue_offset: float):
+        """Producer/player loop - keeps at most `lookahead` clauses in flight"""
+        pending: List[Future] = []
+        clauses = iter(self._clauses(source, stop_event))
+        exhausted = False
+        last_played: Optional[Future] = None
+        finished = False
+
+        try:
+            while not stop_event.is_set():
+                # Top up synthesis work to the look-ahead bound
+                while not exhausted and len(pending) < self.lookahead:
+                    try:
+                        clause = next(clauses)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending.append(self.executor.submit(self.synthesize, clause, slow))
+
+                if not pending:
+                    break
+
+                sound = pending.pop(0).result()
+                if stop_event.is_set():
+                    break
+
+                if not first_audio.is_set() and cue is not None:
+                    self._fire_cue(cue, cue_offset, stop_event)
+
+                # The player queues clauses behind each other without gaps
+                last_played = self._get_player().play(sound)
+                first_audio.set()
+                # stop() may have run between the check above and play()
+                if stop_event.is_set():
+                    self.player.stop()
+
+            # Resolved by the playback monitor (or by stop())
+            finished = last_played.result() if last_played else not stop_event.is_set()
+        except Exception as e:
+            print(f"❌ Speech stream error: {e}")
+        finally:
+            for future in pending:
+                future.cancel()
+            first_audio.set()
+            done_event.set()
+            completion.set_result(finished and not stop_event.is_set())
+
+    def _fire_cue(self, cue: Callable[[], None], cue_offset: float,
+                  stop_event: threading.Event):
+        """Fire the sync cue relative to the first clause's play()"""
+        if cue_offset <= 0:
+            cue()
+            # Hold playback back so the audio lines up with the slower cue
+            stop_event.wait(-cue_offset)
+        else:
+            timer = threading.Timer(cue_offset, lambda: stop_event.is_set() or cue())
+            timer.daemon = True
+            timer.start()
+
+    def wait_for_start(self, timeout: Optional[float] = None) -> bool:
+        """Block until the first clause is audible"""
+        return self._first_audio.wait(timeout)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the whole reply has been spoken"""
+        return self._done_event.wait(timeout)
+
+    def is_busy(self) -> bool:
+        """Check if a reply is still being synthesized or played"""
+        return not self._done_event.is_set()
+
+    def stop(self):
+        """Cut off the current reply"""
+        self._stop_event.set()
+        if self.player is not None:
+            self.player.stop()
+        self._done_event.wait(1.0)
+
+    def close(self):
+        """Stop speech and release synthesis threads"""
+        self.stop()
+        self.executor.shutdown(wait=False, cancel_futures=True)
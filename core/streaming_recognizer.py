@@ -0,0 +1,134 @@
+"""
+🎧 WORM STREAMING RECOGNIZER
+Wraps a Vosk KaldiRecognizer to surface partial results as audio arrives
+High-confidence exact-trigger matches on stable partial text are dispatched
+before Kaldi declares the endpoint; the final text then confirms or rolls
+back the early dispatch
+"""
+
+import json
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from .vad import VoiceActivityDetector
+
+PARTIAL = "partial"
+EARLY = "early"
+FINAL = "final"
+
+
+@dataclass
+class RecognitionEvent:
+    """Something the recognizer learned from the latest audio block"""
+    kind: str                    # PARTIAL, EARLY or FINAL
+    text: str
+    match: Optional[str] = None  # trigger key for EARLY events
+    elapsed: float = 0.0         # seconds since the utterance started
+
+
+def normalize_transcript(text: str) -> str:
+    """Lowercase and collapse whitespace"""
+    return " ".join(text.lower().split())
+
+
+class StreamingRecognizer:
+    """Feed audio blocks, get partial/early/final recognition events"""
+
+    def __init__(self, recognizer, exact_matcher: Optional[Callable[[str], Optional[str]]] = None,
+                 stable_partials: int = 2, vad: Optional[VoiceActivityDetector] = None):
+        """
+        recognizer: a vosk.KaldiRecognizer
+        exact_matcher: returns a trigger key only when the whole text is that trigger
+        stable_partials: identical consecutive partials required before an early dispatch
+        vad: optional gate - only speech reaches the recognizer, and the end of
+             a speech segment finalizes the utterance
+        """
+        self.recognizer = recognizer
+        self.exact_matcher = exact_matcher
+        self.stable_partials = max(1, stable_partials)
+        self.vad = vad
+        self.reset()
+
+    def reset(self):
+        """Start a new utterance"""
+        self.started_at = time.perf_counter()
+        self.first_partial_at: Optional[float] = None
+        self.final_at: Optional[float] = None
+        self.dispatched: Optional[RecognitionEvent] = None
+        self._last_partial = ""
+        self._repeat_count = 0
+
+    def _elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    def accept(self, data: bytes) -> Optional[RecognitionEvent]:
+        """Feed one audio block; returns the most useful event it produced"""
+        if self.vad is None:
+            return self._accept_audio(bytes(data))
+
+        events = []
+        for audio, segment_ended in self.vad.process(data):
+            if audio:
+                events.append(self._accept_audio(audio))
+            if segment_ended:
+                events.append(self.finish())
+
+        events = [event for event in events if event is not None]
+        finals = [event for event in events if event.kind == FINAL]
+        if finals:
+            if any(event.kind == EARLY for event in events):
+                # The early match never reached the caller - the final text wins
+                self.dispatched = None
+            # Kaldi may endpoint just before the VAD does - keep the one with text
+            return next((event for event in finals if event.text), finals[0])
+
+        early = [event for event in events if event.kind == EARLY]
+        if early:
+            return early[0]
+        return events[-1] if events else None
+
+    def _accept_audio(self, data: bytes) -> Optional[RecognitionEvent]:
+        """Feed audio straight to the recognizer"""
+        if self.recognizer.AcceptWaveform(data):
+            text = json.loads(self.recognizer.Result()).get("text", "").strip()
+            self.final_at = self._elapsed()
+            return RecognitionEvent(FINAL, text, elapsed=self.final_at)
+
+        partial = json.loads(self.recognizer.PartialResult()).get("partial", "").strip()
+        if not partial:
+            return None
+
+        if self.first_partial_at is None:
+            self.first_partial_at = self._elapsed()
+
+        normalized = normalize_transcript(partial)
+        if normalized == self._last_partial:
+            self._repeat_count += 1
+        else:
+            self._last_partial = normalized
+            self._repeat_count = 1
+
+        # Only dispatch once per utterance, and only on a settled partial
+        if (self.dispatched is None and self.exact_matcher is not None
+                and self._repeat_count >= self.stable_partials):
+            match = self.exact_matcher(normalized)
+            if match:
+                self.dispatched = RecognitionEvent(EARLY, normalized, match, self._elapsed())
+                return self.dispatched
+
+        return RecognitionEvent(PARTIAL, partial, elapsed=self._elapsed())
+
+    def finish(self) -> RecognitionEvent:
+        """Flush the recognizer at end of input"""
+        text = json.loads(self.recognizer.FinalResult()).get("text", "").strip()
+        self.final_at = self._elapsed()
+        return RecognitionEvent(FINAL, text, elapsed=self.final_at)
+
+    def confirms(self, final: RecognitionEvent,
+                 resolver: Callable[[str], Optional[str]]) -> bool:
+        """Does the final text resolve to the same trigger as the early dispatch?"""
+        if self.dispatched is None or not final.text:
+            # Nothing dispatched, or no contrary evidence
+            return True
+        return resolver(normalize_transcript(final.text)) == self.dispatched.match
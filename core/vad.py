@@ -0,0 +1,151 @@
+"""
+🔈 WORM VOICE ACTIVITY DETECTION
+Energy + zero-crossing voice activity gate in front of Vosk
+Only speech segments (with pre-roll padding) reach the recognizer, so
+recognition CPU scales with how much people talk, not with uptime
+"""
+
+import json
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Deque, List, Tuple
+
+import numpy as np
+
+SETTINGS_FILE = "worm_settings.json"
+
+
+@dataclass
+class VADConfig:
+    """Tunable VAD parameters (worm_settings.json -> voice.vad)"""
+    enabled: bool = True
+    sample_rate: int = 16000
+    frame_ms: int = 20
+    energy_threshold: float = 300.0   # minimum RMS (int16 scale) for speech
+    noise_ratio: float = 3.0          # ...and this many times the noise floor
+    zcr_max: float = 0.25             # zero crossings per sample; hiss is higher
+    loud_ratio: float = 3.0           # this far above threshold ignores ZCR (fricatives)
+    hangover_ms: int = 400            # keep forwarding after the last speech frame
+    preroll_ms: int = 300             # audio forwarded from before speech onset
+    noise_adapt: float = 0.05         # noise floor smoothing for non-speech frames
+
+
+def load_vad_config(settings_file: str = SETTINGS_FILE) -> VADConfig:
+    """Read VAD settings (defaults for anything missing)"""
+    try:
+        with open(settings_file, 'r') as f:
+            vad = json.load(f).get("voice", {}).get("vad", {})
+        known = VADConfig.__dataclass_fields__
+        return VADConfig(**{k: v for k, v in vad.items() if k in known})
+    except Exception as e:
+        print(f"⚠️  Could not load VAD settings: {e}")
+        return VADConfig()
+
+
+class VoiceActivityDetector:
+    """Frame-level speech gate with hangover and pre-roll"""
+
+    def __init__(self, config: VADConfig = None):
+        self.config = config or VADConfig()
+        self.frame_samples = self.config.sample_rate * self.config.frame_ms // 1000
+        self.hangover_frames = max(1, self.config.hangover_ms // self.config.frame_ms)
+        preroll_frames = self.config.preroll_ms // self.config.frame_ms
+        self._preroll: Deque[bytes] = deque(maxlen=max(1, preroll_frames))
+        self._remainder = np.zeros(0, dtype=np.int16)
+        self.noise_floor = self.config.energy_threshold / self.config.noise_ratio
+        self.in_speech = False
+        self._hangover_left = 0
+
+        self.total_frames = 0
+        self.forwarded_frames = 0
+
+    def classify(self, frames: np.ndarray) -> np.ndarray:
+        """Speech/non-speech decision for a (n_frames, frame_samples) int16 array"""
+        samples = frames.astype(np.float32)
+        rms = np.sqrt(np.mean(samples * samples, axis=1))
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / frames.shape[1]
+
+        threshold = max(self.config.energy_threshold, self.noise_floor * self.config.noise_ratio)
+        voiced = (rms > threshold) & (zcr < self.config.zcr_max)
+        loud = rms > threshold * self.config.loud_ratio
+        speech = voiced | loud
+
+        # Track the noise floor on frames that are clearly not speech
+        quiet = rms[~speech]
+        if quiet.size:
+            a = self.config.noise_adapt
+            self.noise_floor = (1 - a) * self.noise_floor + a * float(np.mean(quiet))
+        return speech
+
+    def process(self, block: bytes) -> List[Tuple[bytes, bool]]:
+        """Gate one capture block
+
+        Returns (audio, segment_ended) pieces to forward in order. When
+        segment_ended is True the hangover ran out at the end of that piece -
+        the caller should finalize recognition instead of waiting for
+        Kaldi's own endpoint silence.
+        """
+        if not self.config.enabled:
+            return [(bytes(block), False)]
+
+        samples = np.concatenate([self._remainder, np.frombuffer(block, dtype=np.int16)])
+        n_frames = len(samples) // self.frame_samples
+        self._remainder = samples[n_frames * self.frame_samples:]
+        if n_frames == 0:
+            return []
+
+        frames = samples[:n_frames * self.frame_samples].reshape(n_frames, self.frame_samples)
+        speech = self.classify(frames)
+
+        pieces: List[Tuple[bytes, bool]] = []
+        current: List[bytes] = []
+        for frame, is_speech in zip(frames, speech):
+            self.total_frames += 1
+
+            if is_speech:
+                if not self.in_speech:
+                    # Speech onset - include the pre-roll so the first phoneme isn't clipped
+                    current.extend(self._preroll)
+                    self.forwarded_frames += len(self._preroll)
+                    self._preroll.clear()
+                    self.in_speech = True
+                self._hangover_left = self.hangover_frames
+            elif self.in_speech:
+                self._hangover_left -= 1
+
+            if self.in_speech:
+                current.append(frame.tobytes())
+                self.forwarded_frames += 1
+                if self._hangover_left <= 0:
+                    self.in_speech = False
+                    pieces.append((b"".join(current), True))
+                    current = []
+            else:
+                self._preroll.append(frame.tobytes())
+
+        if current:
+            pieces.append((b"".join(current), False))
+        return pieces
+
+    @property
+    def duty_cycle(self) -> float:
+        """Fraction of captured audio forwarded to the recognizer"""
+        return self.forwarded_frames / self.total_frames if self.total_frames else 0.0
+
+    def get_metrics(self) -> dict:
+        """Duty cycle and noise floor for tuning"""
+        return {
+            "duty_cycle": self.duty_cycle,
+            "total_seconds": self.total_frames * self.config.frame_ms / 1000,
+            "forwarded_seconds": self.forwarded_frames * self.config.frame_ms / 1000,
+            "noise_floor": self.noise_floor,
+            "config": asdict(self.config),
+        }
+
+    def reset(self):
+        """Forget the current segment (keeps the learned noise floor)"""
+        self._preroll.clear()
+        self._remainder = np.zeros(0, dtype=np.int16)
+        self.in_speech = False
+        self._hangover_left = 0
@@ -0,0 +1,129 @@
+"""
+🧠 WORM VOSK MODEL REGISTRY
+One process-wide Vosk model, loaded on a background thread at launch
+Every listener gets its own KaldiRecognizer on the shared model, so
+switching to voice mode doesn't wait on disk and memory holds one copy
+"""
+
+import json
+import os
+import threading
+import time
+from typing import List, Optional
+
+import vosk
+
+# Searched in order - "model" is what the README setup instructions produce
+MODEL_PATHS = [
+    "model",
+    "vosk-model-small-en-us-0.15",
+    "model/vosk-model-small-en-us-0.15",
+]
+
+
+class VoskModelRegistry:
+    """Loads the Vosk model once and hands out recognizers that share it"""
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, model_paths: List[str] = None):
+        self.model_paths = model_paths or MODEL_PATHS
+        self.model: Optional[vosk.Model] = None
+        self.model_path: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.error: Optional[str] = None
+        self.recognizers_issued = 0
+        self._loaded = threading.Event()
+        self._loader: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get(cls) -> "VoskModelRegistry":
+        """Process-wide registry"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def find_model_path(self) -> Optional[str]:
+        """First configured path that exists"""
+        for path in self.model_paths:
+            if os.path.isdir(path):
+                return path
+        return None
+
+    def preload(self):
+        """Start loading in the background (no-op if already started)"""
+        with self._lock:
+            if self._loader is not None:
+                return
+            self._loader = threading.Thread(target=self._load, daemon=True)
+            self._loader.start()
+
+    def _load(self):
+        """Load the model and record how long it took"""
+        try:
+            self.model_path = self.find_model_path()
+            if self.model_path is None:
+                self.error = "model not found"
+                print("⚠️  Vosk model not found - voice input disabled")
+                print("💡 To enable voice input, download a Vosk model:")
+                print("   wget https://alphacephei.com/vosk/models/vosk-model-small-en-us-0.15.zip")
+                print("   unzip vosk-model-small-en-us-0.15.zip")
+                print("   mv vosk-model-small-en-us-0.15 model")
+                return
+
+            started = time.perf_counter()
+            self.model = vosk.Model(self.model_path)
+            self.load_seconds = time.perf_counter() - started
+            print(f"✅ Voice model loaded from {self.model_path} ({self.load_seconds:.1f}s)")
+        except Exception as e:
+            self.error = str(e)
+            print(f"❌ Voice model loading failed: {e}")
+        finally:
+            self._loaded.set()
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[vosk.Model]:
+        """The shared model, waiting for the background load if needed"""
+        self.preload()
+        if not self._loaded.is_set():
+            print("🎤 Waiting for voice recognition model...")
+        self._loaded.wait(timeout)
+        return self.model
+
+    def is_loaded(self) -> bool:
+        return self.model is not None
+
+    def recognizer(self, sample_rate: int = 16000,
+                   grammar: Optional[List[str]] = None) -> Optional[vosk.KaldiRecognizer]:
+        """A fresh recognizer on the shared model (None if no model)
+
+        KaldiRecognizer keeps per-utterance state, so each stream needs its own.
+        """
+        model = self.wait()
+        if model is None:
+            return None
+
+        with self._lock:
+            self.recognizers_issued += 1
+        if grammar is not None:
+            return vosk.KaldiRecognizer(model, sample_rate, json.dumps(grammar))
+        return vosk.KaldiRecognizer(model, sample_rate)
+
+    def get_stats(self) -> dict:
+        """Load status and timing"""
+        return {
+            "loaded": self.is_loaded(),
+            "model_path": self.model_path,
+            "load_seconds": self.load_seconds,
+            "error": self.error,
+            "recognizers_issued": self.recognizers_issued,
+        }
+
+
+def preload_vosk_model() -> VoskModelRegistry:
+    """Kick off the shared model load - call once at launch"""
+    registry = VoskModelRegistry.get()
+    registry.preload()
+    return registry
@@ -0,0 +1,107 @@
+"""
+👂 WORM WAKE WORD SPOTTER
+A tiny Vosk grammar ("worm", "hey worm") listens all the time; the full
+recognizer only runs for a window after the worm is addressed
+Decoding a three-word grammar costs a fraction of open-vocabulary
+recognition, and background chatter without the wake word is ignored
+"""
+
+import json
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from .vad import VoiceActivityDetector
+
+SETTINGS_FILE = "worm_settings.json"
+
+UNKNOWN = "[unk]"
+
+
+@dataclass
+class WakeWordConfig:
+    """Wake word settings (worm_settings.json -> voice.wake_word)"""
+    enabled: bool = True
+    phrases: List[str] = field(default_factory=lambda: ["worm", "hey worm"])
+    window_seconds: float = 8.0   # full recognition stays on this long after a detection
+
+
+def load_wake_word_config(settings_file: str = SETTINGS_FILE) -> WakeWordConfig:
+    """Read wake word settings (defaults for anything missing)"""
+    try:
+        with open(settings_file, 'r') as f:
+            wake = json.load(f).get("voice", {}).get("wake_word", {})
+        known = WakeWordConfig.__dataclass_fields__
+        return WakeWordConfig(**{k: v for k, v in wake.items() if k in known})
+    except Exception as e:
+        print(f"⚠️  Could not load wake word settings: {e}")
+        return WakeWordConfig()
+
+
+def wake_grammar(config: WakeWordConfig) -> List[str]:
+    """Grammar for the spotting recognizer - anything else decodes as [unk]"""
+    return [phrase.lower() for phrase in config.phrases] + [UNKNOWN]
+
+
+class WakeWordSpotter:
+    """Keyword spotting on a grammar-constrained recognizer, plus the awake window"""
+
+    def __init__(self, recognizer, config: WakeWordConfig = None,
+                 vad: Optional[VoiceActivityDetector] = None):
+        """
+        recognizer: a KaldiRecognizer built with wake_grammar(config)
+        vad: optional gate so silence never reaches even the tiny grammar
+        """
+        self.recognizer = recognizer
+        self.config = config or WakeWordConfig()
+        self.vad = vad
+        self.awake_until = 0.0
+        self.detections = 0
+        self.spotted_seconds = 0.0
+
+    def accept(self, block: bytes) -> bool:
+        """Feed audio while asleep; True when the wake word was heard"""
+        pieces = self.vad.process(block) if self.vad is not None else [(bytes(block), False)]
+        for audio, segment_ended in pieces:
+            if audio and self._spot(audio):
+                return True
+            if segment_ended:
+                self.recognizer.FinalResult()  # start the next segment clean
+        return False
+
+    def _spot(self, audio: bytes) -> bool:
+        self.spotted_seconds += len(audio) / 32000
+        if self.recognizer.AcceptWaveform(audio):
+            text = json.loads(self.recognizer.Result()).get("text", "")
+        else:
+            text = json.loads(self.recognizer.PartialResult()).get("partial", "")
+
+        padded = f" {text.lower()} "
+        if not any(f" {phrase.lower()} " in padded for phrase in self.config.phrases):
+            return False
+
+        print(f"👂 Wake word: '{text}'")
+        self.detections += 1
+        self.recognizer.FinalResult()
+        if self.vad is not None:
+            self.vad.reset()
+        self.extend()
+        return True
+
+    def extend(self):
+        """Keep full recognition on for another window"""
+        self.awake_until = time.time() + self.config.window_seconds
+
+    def is_awake(self) -> bool:
+        return not self.config.enabled or time.time() < self.awake_until
+
+    def sleep(self):
+        """Go back to spotting"""
+        self.awake_until = 0.0
+
+    def get_metrics(self) -> dict:
+        return {
+            "detections": self.detections,
+            "spotted_seconds": self.spotted_seconds,
+            "awake": self.is_awake(),
+        }
@@ -104,45 +104,48 @@ class SimpleResponseEditor:
             return
             
         print("Select response to edit:")
-        for i, (trigger, output_text, movement) in enumerate(responses):
-            print(f"{i+1}. Input: {trigger[:30]}... -> Output: {output_text[:30]}...")
+        for i, entry in enumerate(responses):
+            print(f"{i+1}. Input: {(entry.trigger or entry.name)[:30]}... -> Output: {entry.text[:30]}...")
             
         try:
             choice = int(input(f"Response number (1-{len(responses)}): ")) - 1
             if 0 <= choice < len(responses):
-                old_trigger, old_output, old_movement = responses[choice]
+                entry = responses[choice]
                 print(f"\nEditing response:")
-                print(f"Input: {old_trigger}")
-                print(f"Output: {old_output}")
-                print(f"Movement: {old_movement}")
+                print(f"Input: {entry.trigger or entry.name}")
+                print(f"Output: {entry.text}")
+                print(f"Movement: {entry.movement}")
                 
                 # Go through creation flow with current values as defaults
-                self.edit_response_flow(old_trigger, old_output, old_movement)
+                self.edit_response_flow(entry)
             else:
                 print("Invalid selection")
         except ValueError:
             print("Invalid input")
     
-    def edit_response_flow(self, old_trigger, old_output, old_movement):
+    def edit_response_flow(self, entry):
         """Edit flow for existing response"""
+        old_trigger = entry.trigger or ""
         print(f"\nInput text [{old_trigger}]: ", end="")
         new_input = input().strip()
         if not new_input:
             new_input = old_trigger
             
-        print(f"Output text [{old_output}]: ", end="")
+        print(f"Output text [{entry.text}]: ", end="")
         new_output = input().strip()
         if not new_output:
-            new_output = old_output
+            new_output = entry.text
                 
         # Movement selection
         print("\nMovement commands:")
         movements = ["none", "d", "s", "fl", "fr", "bl", "br", "sl", "sr", "b", "om", "cm"]
+        if entry.movement and entry.movement not in movements:
+            movements.append(entry.movement)  # e.g. choreographedTalk - keep it selectable
         for i, movement in enumerate(movements):
             print(f"  {i+1}. {movement}")
             
-        # Try to detect current movement from old_movement
-        current_movement = old_movement if old_movement in movements else None
+        # Try to detect current movement from the entry
+        current_movement = entry.movement if entry.movement in movements else None
         current_idx = movements.index(current_movement) + 1 if current_movement else 1
         
         try:
@@ -161,38 +164,22 @@ class SimpleResponseEditor:
         print(f"Output: {new_output}")
         print(f"Movement: {movement or 'none'}")
         
-        # Save changes
+        changes = {"text": new_output, "movement": movement}
+        if new_input and new_input != old_trigger:
+            existing = self.config.store.find(new_input)
+            if existing is not None and existing is not entry:
+                print(f"Input '{new_input}' already triggers another response")
+                return
+            changes["trigger"] = new_input
+        
+        # Save changes in place, whichever schema the response lives in
         if input("Save changes? (y/n): ").lower().startswith('y'):
-            # Remove old response and add new one
-            self.remove_old_response(old_trigger)
-            self.save_simple_response(new_input, new_output, movement)
+            self.config.store.update(entry, **changes)
             print("Response updated!")
     
     def get_all_responses(self):
-        """Get all responses as a flat list with triggers"""
-        responses = []
-        data = self.config.list_responses()
-        
-        for category, category_data in data.items():
-            if isinstance(category_data, dict):
-                for subcategory, response_list in category_data.items():
-                    if isinstance(response_list, list):
-                        for response in response_list:
-                            trigger = response.get('trigger', f"{category}/{subcategory}")
-                            responses.append((
-                                trigger,
-                                response.get('text', ''),
-                                response.get('movement', '')
-                            ))
-            elif isinstance(category_data, list):
-                for response in category_data:
-                    trigger = response.get('trigger', category)
-                    responses.append((
-                        trigger,
-                        response.get('text', ''),
-                        response.get('movement', '')
-                    ))
-        return responses
+        """Get all responses (both schemas) as a flat list, highest priority first"""
+        return list(self.config.store.entries)
     
     def list_responses(self):
         """List all responses with input triggers"""
@@ -200,41 +187,18 @@ class SimpleResponseEditor:
         print(f"\nALL RESPONSES ({len(responses)} total):")
         print("-" * 40)
         
-        for i, (trigger, output_text, movement) in enumerate(responses):
-            print(f"{i+1}. Input: {trigger}")
-            print(f"   Output: {output_text[:60]}...")
-            print(f"   Movement: {movement}")
+        for i, entry in enumerate(responses):
+            print(f"{i+1}. Input: {entry.trigger or entry.name}")
+            print(f"   Output: {entry.text[:60]}...")
+            print(f"   Movement: {entry.movement}")
             print()
     
     def save_simple_response(self, input_text, output_text, movement):
         """Save a simple response"""
+        if self.config.store.find(input_text) is not None:
+            print(f"Note: '{input_text}' already triggers a response - the existing one takes priority")
         # Add to a simple "custom" category with input text as trigger
-        if "custom" not in self.config.responses:
-            self.config.responses["custom"] = {"user_created": []}
-        
-        if "user_created" not in self.config.responses["custom"]:
-            self.config.responses["custom"]["user_created"] = []
-            
-        new_response = {
-            "text": output_text,
-            "movement": movement,
-            "trigger": input_text.lower()
-        }
-        
-        self.config.responses["custom"]["user_created"].append(new_response)
-        self.config.save_responses()
-        print(f"Added response to custom/user_created")
-    
-    def remove_old_response(self, trigger):
-        """Remove old response by trigger"""
-        if 'custom' in self.config.responses:
-            for subcategory, response_list in self.config.responses['custom'].items():
-                if isinstance(response_list, list):
-                    for i, response in enumerate(response_list):
-                        if response.get('trigger') == trigger:
-                            response_list.pop(i)
-                            self.config.save_responses()
-                            return
+        self.config.add_response("custom", "user_created", output_text, movement, trigger=input_text)
 
 def main():
     """Main entry point"""
@@ -4,24 +4,30 @@
 Simple tool to edit worm responses without touching the main code
 """
 
-import json
 import os
 from pathlib import Path
+from response_store import ResponseStore
+
+# Shared with the runtimes - keeps the trigger index for duplicate checks
+store = ResponseStore()
 
 def load_responses():
     """Load current responses"""
-    try:
-        with open("worm_responses.json", 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
+    if not os.path.exists(store.responses_file):
         print("❌ worm_responses.json not found!")
         return None
+    return store.data if store.load() else None
 
 def save_responses(responses):
     """Save responses back to file"""
-    with open("worm_responses.json", 'w') as f:
-        json.dump(responses, f, indent=2)
-    print("✅ Responses saved!")
+    store.data = responses
+    if store.save():
+        print("✅ Responses saved!")
+
+def trigger_taken(trigger, key=None):
+    """Does a different response (either schema) already answer to this trigger?"""
+    entry = store.find(trigger)
+    return entry is not None and (key is None or entry.key != key)
 
 def edit_startup_message():
     """Edit the startup message"""
@@ -132,7 +138,7 @@ def edit_single_response(responses, key, data):
         new_trigger = input(f"\nEnter new input trigger (currently '{readable_key}'): ").strip()
         if new_trigger:
             new_key = new_trigger.replace(" ", "_").lower()
-            if new_key != key and new_key in responses["responses"]:
+            if trigger_taken(new_trigger, key):
                 print(f"❌ Trigger '{new_trigger}' already exists!")
                 return
             
@@ -185,7 +191,7 @@ def edit_single_response(responses, key, data):
             new_speech = input("Enter new speech output: ").strip()
             if new_speech:
                 new_key = new_trigger.replace(" ", "_").lower()
-                if new_key != key and new_key in responses["responses"]:
+                if trigger_taken(new_trigger, key):
                     print(f"❌ Trigger '{new_trigger}' already exists!")
                     return
                 
@@ -288,7 +294,7 @@ def edit_single_response(responses, key, data):
                             mouth_count = int(new_mouth.replace('t', ''))
                             if mouth_count >= 0:
                                 new_key = new_trigger.replace(" ", "_").lower()
-                                if new_key != key and new_key in responses["responses"]:
+                                if trigger_taken(new_trigger, key):
                                     print(f"❌ Trigger '{new_trigger}' already exists!")
                                     return
                                 
@@ -335,7 +341,7 @@ def add_new_response():
         print("❌ Key cannot be empty!")
         return
     
-    if key in responses["responses"]:
+    if trigger_taken(key):
         print(f"❌ Key '{key}' already exists!")
         return
     
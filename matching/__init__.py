@@ -0,0 +1,18 @@
+"""
+🔎 WORM MATCHING PACKAGE
+Response lookup without AI, hardware or audio dependencies
+"""
+
+from .trigger_index import TriggerIndex, TriggerHit, build_trigger_index, KEY, ALIAS, KEYWORD
+from .fuzzy import (FuzzyMatcher, FuzzyMatch, build_fuzzy_matcher, load_confidence_threshold,
+                    load_fuzzy_threshold, best_match)
+from .phonetic import PhoneticIndex, build_phonetic_index, phonetic_key, load_phonetic_threshold
+from .dispatch_cache import DispatchCache, DispatchDecision, normalize_input, RESPONSE, CHAT
+from .resolver import ResponseResolver
+
+__all__ = ['TriggerIndex', 'TriggerHit', 'build_trigger_index', 'KEY', 'ALIAS', 'KEYWORD',
+           'FuzzyMatcher', 'FuzzyMatch', 'build_fuzzy_matcher', 'load_confidence_threshold',
+           'load_fuzzy_threshold', 'best_match',
+           'PhoneticIndex', 'build_phonetic_index', 'phonetic_key', 'load_phonetic_threshold',
+           'DispatchCache', 'DispatchDecision', 'normalize_input', 'RESPONSE', 'CHAT',
+           'ResponseResolver']
@@ -0,0 +1,95 @@
+"""
+⚡ WORM DISPATCH CACHE
+Remembers what an input resolved to (a response and its movement, speech
+and mouth plan, or "hand it to the AI") so repeat phrases skip matching
+Keys are normalized inputs, so "Dance for me!" and "um dance for me" share
+an entry; the owner clears the cache whenever responses change
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+# Hesitations and recognizer noise tokens that never change what was meant
+FILLER_WORDS = {"um", "umm", "uh", "uhh", "er", "erm", "ah", "hmm", "mm", "[unk]"}
+
+RESPONSE = "response"   # a defined response - perform it
+CHAT = "chat"           # nothing matched - generate an AI reply
+
+
+def normalize_input(text: str) -> str:
+    """Case, punctuation, whitespace and filler words folded away"""
+    words = [word for word in text.lower().split() if word not in FILLER_WORDS]
+    words = re.sub(r"[^a-z0-9' ]+", " ", " ".join(words)).split()
+    return " ".join(word for word in words if word not in FILLER_WORDS)
+
+
+@dataclass(frozen=True)
+class DispatchDecision:
+    """Everything process_command needs to act on an input"""
+    kind: str
+    key: Optional[str] = None            # response key / trigger that matched
+    speech: Optional[str] = None
+    movement: Optional[str] = None
+    mouth_movements: int = 1
+    label: str = ""                      # how it matched, for the log
+
+
+class DispatchCache:
+    """Bounded LRU of normalized input -> DispatchDecision (thread-safe)"""
+
+    def __init__(self, capacity: int = 256):
+        self.capacity = capacity
+        self._entries: "OrderedDict[str, DispatchDecision]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, normalized: str) -> Optional[DispatchDecision]:
+        with self._lock:
+            decision = self._entries.get(normalized)
+            if decision is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(normalized)
+            self.hits += 1
+            return decision
+
+    def put(self, normalized: str, decision: DispatchDecision):
+        with self._lock:
+            self._entries[normalized] = decision
+            self._entries.move_to_end(normalized)
+            if len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        """Forget every decision (responses were reloaded)"""
+        with self._lock:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hit_rate,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,220 @@
+"""
+🎯 WORM FUZZY MATCHER
+Character n-gram TF-IDF over every response trigger, so misrecognized
+voice input ("dants for me") still resolves locally instead of going to GPT
+Trigger vectors are precomputed into a sparse column matrix; scoring an
+input against the whole library is one sparse matrix-vector product
+"""
+
+import json
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .trigger_index import response_triggers
+
+SETTINGS_FILE = "worm_settings.json"
+
+NGRAM = 3
+DEFAULT_THRESHOLD = 0.55
+DEFAULT_CONFIDENCE_THRESHOLD = 0.6
+# Trigger words this long must be (partly) heard for the trigger to match
+MIN_WORD_CHARS = 3
+
+
+def load_confidence_threshold(settings_file: str = SETTINGS_FILE) -> float:
+    """Minimum AI confidence (worm_settings.json -> ai.ai_confidence_threshold)"""
+    try:
+        with open(settings_file, 'r') as f:
+            return float(json.load(f).get("ai", {}).get("ai_confidence_threshold", DEFAULT_CONFIDENCE_THRESHOLD))
+    except Exception as e:
+        print(f"⚠️  Could not load AI confidence threshold: {e}")
+        return DEFAULT_CONFIDENCE_THRESHOLD
+
+
+def load_fuzzy_threshold(settings_file: str = SETTINGS_FILE) -> float:
+    """Minimum n-gram similarity for a fuzzy match (worm_settings.json -> matching.fuzzy_threshold)
+
+    Calibrated with benchmark_matching.py - it is not on the same scale as
+    the AI confidence threshold.
+    """
+    try:
+        with open(settings_file, 'r') as f:
+            return float(json.load(f).get("matching", {}).get("fuzzy_threshold", DEFAULT_THRESHOLD))
+    except Exception as e:
+        print(f"⚠️  Could not load fuzzy match threshold: {e}")
+        return DEFAULT_THRESHOLD
+
+
+def char_ngrams(text: str, n: int = NGRAM) -> List[str]:
+    """Character n-grams of each word, padded so word edges count"""
+    grams = []
+    for word in text.lower().split():
+        padded = f" {word} "
+        grams.extend(padded[i:i + n] for i in range(max(1, len(padded) - n + 1)))
+    return grams
+
+
+@dataclass(frozen=True)
+class FuzzyMatch:
+    key: str       # response key
+    phrase: str    # best-scoring trigger for that key
+    score: float   # similarity, 0..1
+    method: str = "ngram"
+
+
+class _SparseColumns:
+    """Row values stored by column (CSC), so a query only touches the columns it has"""
+
+    def __init__(self, rows: List[Dict[int, float]], width: int):
+        lengths = [len(row) for row in rows]
+        row_ids = np.repeat(np.arange(len(rows), dtype=np.int64), lengths)
+        columns = np.fromiter((column for row in rows for column in row), dtype=np.int64, count=sum(lengths))
+        values = np.fromiter((value for row in rows for value in row.values()), dtype=np.float64,
+                             count=sum(lengths))
+        order = np.argsort(columns, kind='stable')
+        self.height = len(rows)
+        self._rows = row_ids[order]
+        self._values = values[order].astype(np.float32)
+        self._indptr = np.zeros(width + 1, dtype=np.int64)
+        np.cumsum(np.bincount(columns, minlength=width), out=self._indptr[1:])
+
+    def dot(self, columns: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """Sparse matrix-vector product with a sparse query (column indices and weights)"""
+        # Gather each query column's entries, scatter-add per row
+        starts, ends = self._indptr[columns], self._indptr[columns + 1]
+        lengths = ends - starts
+        total = int(lengths.sum())
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+        products = self._values[offsets] * np.repeat(weights, lengths)
+        return np.bincount(self._rows[offsets], weights=products, minlength=self.height)
+
+
+class FuzzyMatcher:
+    """Cosine similarity between an input and every trigger, in one pass
+
+    Every trigger word of MIN_WORD_CHARS or more must also share at least
+    one n-gram with the input: a fragment ("for me", "hello") or a sentence
+    that only shares some words ("i saw a question") can be close in n-gram
+    space without being the trigger.
+    """
+
+    def __init__(self, triggers: List[Tuple[str, str]], n: int = NGRAM):
+        """triggers: (phrase, response key) pairs"""
+        self.n = n
+        self.phrases = [phrase.lower() for phrase, _ in triggers]
+        self.keys = sorted({key for _, key in triggers})
+        key_column = {key: i for i, key in enumerate(self.keys)}
+        self.row_key = np.array([key_column[key] for _, key in triggers], dtype=np.int64)
+
+        # Vocabulary and document frequency
+        self.vocabulary: Dict[str, int] = {}
+        counts = []
+        word_bags, word_rows = [], []
+        for row, phrase in enumerate(self.phrases):
+            bag: Dict[int, int] = {}
+            for word in phrase.split():
+                columns = [self.vocabulary.setdefault(gram, len(self.vocabulary))
+                           for gram in char_ngrams(word, n)]
+                for column in columns:
+                    bag[column] = bag.get(column, 0) + 1
+                if len(word) >= MIN_WORD_CHARS:
+                    word_bags.append(dict.fromkeys(columns, 1.0))
+                    word_rows.append(row)
+            counts.append(bag)
+        df = np.zeros(len(self.vocabulary))
+        for bag in counts:
+            df[list(bag)] += 1
+        self.idf = np.log((1 + len(self.phrases)) / (1 + df)) + 1
+
+        # L2-normalized TF-IDF rows, stored by column for sparse queries
+        rows = []
+        for bag in counts:
+            cols = np.fromiter(bag, dtype=np.int64, count=len(bag))
+            weights = np.fromiter(bag.values(), dtype=np.float64, count=len(bag)) * self.idf[cols]
+            rows.append(dict(zip(bag, weights / (np.linalg.norm(weights) or 1.0))))
+        self._matrix = _SparseColumns(rows, len(self.vocabulary))
+        # Telling words, one row each, for the word coverage check
+        self._words = _SparseColumns(word_bags, len(self.vocabulary))
+        self.word_row = np.array(word_rows, dtype=np.int64)
+        self.required_words = np.bincount(self.word_row, minlength=len(self.phrases))
+
+    def _query(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Columns and normalized weights of the input (unknown n-grams only add to the norm)"""
+        bag: Dict[str, int] = {}
+        for gram in char_ngrams(text, self.n):
+            bag[gram] = bag.get(gram, 0) + 1
+        known = [(self.vocabulary[gram], count) for gram, count in bag.items() if gram in self.vocabulary]
+        # Unseen n-grams count at the minimum idf - a misheard letter shouldn't
+        # outweigh the trigger n-grams it replaced
+        unseen = [count for gram, count in bag.items() if gram not in self.vocabulary]
+
+        columns = np.array([column for column, _ in known], dtype=np.int64)
+        weights = np.array([count for _, count in known], dtype=np.float64) * self.idf[columns]
+        norm = np.sqrt(np.sum(weights ** 2) + np.sum(np.square(unseen)))
+        return columns, (weights / norm if norm else weights)
+
+    def scores(self, text: str) -> np.ndarray:
+        """Similarity of the input to every trigger (0 where a telling word is missing)"""
+        columns, weights = self._query(text)
+        if len(columns) == 0:
+            return np.zeros(len(self.phrases), dtype=np.float32)
+        similarity = self._matrix.dot(columns, weights)
+        heard = self.word_row[self._words.dot(columns, np.ones(len(columns))) > 0]
+        covered = np.bincount(heard, minlength=len(self.phrases)) == self.required_words
+        return np.where(covered, similarity, 0).astype(np.float32)
+
+    def top(self, text: str, k: int = 3) -> List[FuzzyMatch]:
+        """Best k response keys by their best-scoring trigger"""
+        if not self.phrases:
+            return []
+        scores = self.scores(text)
+        per_key = np.zeros(len(self.keys), dtype=np.float32)
+        np.maximum.at(per_key, self.row_key, scores)
+        k = min(k, len(self.keys))
+        best = np.argpartition(-per_key, k - 1)[:k]
+        best = best[np.argsort(-per_key[best], kind='stable')]
+
+        matches = []
+        for column in best:
+            if per_key[column] <= 0:
+                break
+            rows = np.flatnonzero(self.row_key == column)
+            row = rows[np.argmax(scores[rows])]
+            matches.append(FuzzyMatch(self.keys[column], self.phrases[row], float(per_key[column])))
+        return matches
+
+    def best(self, text: str, threshold: float = DEFAULT_THRESHOLD) -> Optional[FuzzyMatch]:
+        """The top match if it clears the threshold, else None"""
+        matches = self.top(text, 1)
+        return matches[0] if matches and matches[0].score >= threshold else None
+
+    def __len__(self) -> int:
+        return len(self.phrases)
+
+
+def build_fuzzy_matcher(responses: Dict, n: int = NGRAM) -> FuzzyMatcher:
+    """Index the key phrases and aliases of a worm_responses.json document
+
+    Single-word keywords are left to the exact trigger index - on their own
+    they are too short to score meaningfully against a whole utterance.
+    """
+    return FuzzyMatcher(response_triggers(responses), n)
+
+
+def best_match(text: str, *tiers: Tuple[object, float]) -> Optional[FuzzyMatch]:
+    """The match that clears its own (matcher, threshold) tier by the widest margin
+
+    Scores from different matchers are on different scales, so they are
+    never compared directly: each is ranked by how far it sits above its
+    threshold, as a share of the headroom between threshold and 1.
+    """
+    best, best_margin = None, None
+    for matcher, threshold in tiers:
+        for match in matcher.top(text, 1):
+            if match.score >= threshold:
+                margin = (match.score - threshold) / max(1.0 - threshold, 1e-9)
+                if best is None or margin > best_margin:
+                    best, best_margin = match, margin
+    return best
@@ -0,0 +1,208 @@
+"""
+🔊 WORM PHONETIC INDEX
+Sound-alike matching for voice input: every trigger word is reduced to a
+Metaphone-style key at load time, so "warming" finds "wormin" and "dans"
+finds "dance" even when the spelling is far off
+A trigger scores by the F-measure of how much of it is heard in the input
+and how much of the input it accounts for (both idf-weighted, so "for"
+and "me" count little) - 0..1, with its own threshold, since a sound-alike
+key is weaker evidence than a matching spelling
+"""
+
+import json
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Tuple
+
+from .fuzzy import FuzzyMatch
+from .trigger_index import response_triggers
+
+SETTINGS_FILE = "worm_settings.json"
+
+DEFAULT_THRESHOLD = 0.75
+
+VOWELS = set("aeiou")
+FRONT_VOWELS = set("eiy")
+# "g" stays hard before e/i/y in these spellings ("get", "forget", "give", "girl")
+HARD_G = ("get", "gea", "gee", "gif", "gig", "gil", "gir", "giv")
+
+
+def load_phonetic_threshold(settings_file: str = SETTINGS_FILE) -> float:
+    """Minimum sound-alike score (worm_settings.json -> matching.phonetic_threshold)"""
+    try:
+        with open(settings_file, 'r') as f:
+            return float(json.load(f).get("matching", {}).get("phonetic_threshold", DEFAULT_THRESHOLD))
+    except Exception as e:
+        print(f"⚠️  Could not load phonetic match threshold: {e}")
+        return DEFAULT_THRESHOLD
+
+
+def phonetic_key(word: str) -> str:
+    """Simplified Metaphone: consonant skeleton with common spellings of the same sound merged"""
+    word = re.sub(r"[^a-z]", "", word.lower())
+    if not word:
+        return ""
+    # Final "ng" is one sound, and dropped g's sound the same:
+    # "worming" / "wormin'", "sing" / "thing" alike
+    if word.endswith("ng") and len(word) > 2:
+        word = word[:-1]
+    for prefix, replacement in (("kn", "n"), ("gn", "n"), ("pn", "n"), ("wr", "r"),
+                                ("ps", "s"), ("wh", "w"), ("x", "s")):
+        if word.startswith(prefix):
+            word = replacement + word[len(prefix):]
+            break
+
+    key = []
+    length = len(word)
+    i = 0
+    while i < length:
+        char = word[i]
+        nxt = word[i + 1] if i + 1 < length else ""
+        prev = word[i - 1] if i else ""
+        code = ""
+
+        if char in VOWELS:
+            code = "A" if i == 0 else ""
+        elif char == "b":
+            code = "" if prev == "m" and i == length - 1 else "P"
+        elif char == "c":
+            if nxt == "h":
+                code, i = "X", i + 1
+            elif nxt in FRONT_VOWELS:
+                code = "S"
+            elif nxt == "k":
+                code, i = "K", i + 1
+            else:
+                code = "K"
+        elif char == "d":
+            if nxt == "g" and word[i + 2:i + 3] in FRONT_VOWELS:
+                code, i = "J", i + 1
+            else:
+                code = "T"
+        elif char == "g":
+            if nxt == "h":
+                # Silent in "eight", "night"; hard at the start ("ghost")
+                code, i = ("K" if i == 0 else ""), i + 1
+            elif nxt == "n" and i + 2 >= length:
+                code = ""
+            elif nxt in FRONT_VOWELS and prev != "g" and word[i:i + 3] not in HARD_G:
+                code = "J"
+            else:
+                code = "K"
+        elif char == "h":
+            code = "H" if nxt in VOWELS and prev not in set("cgpst") else ""
+        elif char == "p":
+            if nxt == "h":
+                code, i = "F", i + 1
+            else:
+                code = "P"
+        elif char == "q":
+            code = "K"
+        elif char == "s":
+            if nxt == "h":
+                code, i = "X", i + 1
+            elif word[i:i + 3] in ("sio", "sia"):
+                code = "X"
+            else:
+                code = "S"
+        elif char == "t":
+            if nxt == "h":
+                code, i = "0", i + 1
+            elif word[i:i + 3] in ("tio", "tia"):
+                code = "X"
+            else:
+                code = "T"
+        elif char == "v":
+            code = "F"
+        elif char in "wy":
+            code = char.upper() if nxt in VOWELS else ""
+        elif char == "x":
+            code = "KS"
+        elif char == "z":
+            code = "S"
+        else:
+            code = char.upper()
+
+        # Doubled letters sound once
+        if code and not (key and key[-1] == code):
+            key.append(code)
+        i += 1
+    return "".join(key)
+
+
+class PhoneticIndex:
+    """Inverted index of phonetic key -> triggers containing a word with that key"""
+
+    def __init__(self, triggers: List[Tuple[str, str]]):
+        """triggers: (phrase, response key) pairs"""
+        self.triggers = triggers
+        self.trigger_keys: List[Counter] = []
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+
+        for row, (phrase, _) in enumerate(triggers):
+            keys = Counter(key for key in map(phonetic_key, phrase.split()) if key)
+            self.trigger_keys.append(keys)
+            for key in keys:
+                self.postings[key].append(row)
+
+        # Words that appear in many triggers carry little evidence
+        count = len(triggers)
+        self.idf = {key: math.log((1 + count) / (1 + len(rows))) + 1
+                    for key, rows in self.postings.items()}
+        # A word no trigger has is strong evidence the input is something else
+        self.unseen_idf = math.log(1 + count) + 1
+        self.totals = [sum(self.idf[key] * n for key, n in keys.items()) for keys in self.trigger_keys]
+        # The trigger's most telling word must be heard - shared filler alone never matches
+        self.anchors = [max(keys, key=lambda key: (self.idf[key], len(key))) if keys else None
+                        for keys in self.trigger_keys]
+
+    def _weight(self, key: str) -> float:
+        return self.idf.get(key, self.unseen_idf)
+
+    def top(self, text: str, k: int = 3) -> List[FuzzyMatch]:
+        """Best k response keys by F-measure of trigger heard and input explained"""
+        words = text.split()
+        keys = [phonetic_key(word) for word in words]
+        heard = Counter(key for key in keys if key)
+        spoken = sum(self._weight(key) for key in keys if key)
+
+        # matched: trigger weight heard; explained: input weight it accounts for
+        matched: Dict[int, float] = defaultdict(float)
+        explained: Dict[int, float] = defaultdict(float)
+        for key, n in heard.items():
+            for row in self.postings.get(key, ()):
+                weight = self.idf[key] * min(n, self.trigger_keys[row][key])
+                matched[row] += weight
+                explained[row] += weight
+        # Adjacent words run together too ("good morning" -> "goodmorning")
+        joined = set()
+        for (a, key_a), (b, key_b) in zip(zip(words, keys), zip(words[1:], keys[1:])):
+            key = phonetic_key(a + b)
+            if key in heard or key in joined:
+                continue
+            joined.add(key)
+            for row in self.postings.get(key, ()):
+                matched[row] += self.idf[key]
+                explained[row] += self._weight(key_a) + self._weight(key_b)
+        heard.update(joined)
+
+        best: Dict[str, FuzzyMatch] = {}
+        for row, weight in matched.items():
+            if self.anchors[row] not in heard:
+                continue
+            recall = min(1.0, weight / self.totals[row])
+            precision = min(1.0, explained[row] / spoken) if spoken else 0.0
+            score = 2 * recall * precision / (recall + precision)
+            phrase, response_key = self.triggers[row]
+            if response_key not in best or score > best[response_key].score:
+                best[response_key] = FuzzyMatch(response_key, phrase, score, "phonetic")
+        return sorted(best.values(), key=lambda match: -match.score)[:k]
+
+    def __len__(self) -> int:
+        return len(self.triggers)
+
+
+def build_phonetic_index(responses: Dict) -> PhoneticIndex:
+    """Index the key phrases and aliases of a worm_responses.json document"""
+    return PhoneticIndex(response_triggers(responses))
@@ -0,0 +1,68 @@
+"""
+🧭 WORM RESPONSE RESOLVER
+The live lookup order for a defined response, in one place so the runtime
+and the benchmarks resolve inputs identically:
+    exact trigger (either schema) -> contained trigger/alias/keyword ->
+    spelling (n-gram) similarity -> sound (phonetic) similarity
+"""
+
+from typing import Optional
+
+from response_store import ResponseStore
+from .trigger_index import build_trigger_index, KEYWORD
+from .fuzzy import build_fuzzy_matcher, load_fuzzy_threshold, best_match
+from .phonetic import build_phonetic_index, load_phonetic_threshold
+from .dispatch_cache import DispatchDecision, normalize_input, RESPONSE
+
+
+class ResponseResolver:
+    """Every response index, built once from a loaded ResponseStore"""
+
+    def __init__(self, store: ResponseStore, fuzzy_threshold: float = None,
+                 phonetic_threshold: float = None):
+        self.store = store
+        # Every key phrase, alias and keyword, compiled for one-pass lookup
+        self.trigger_index = build_trigger_index(store.data)
+        # N-gram similarity for misrecognized triggers ("dants for me")
+        self.fuzzy_matcher = build_fuzzy_matcher(store.data)
+        # Sound-alike keys for what Vosk mishears ("really warming")
+        self.phonetic_index = build_phonetic_index(store.data)
+        self.fuzzy_threshold = fuzzy_threshold if fuzzy_threshold is not None else load_fuzzy_threshold()
+        self.phonetic_threshold = (phonetic_threshold if phonetic_threshold is not None
+                                   else load_phonetic_threshold())
+
+    def resolve(self, text: str) -> Optional[DispatchDecision]:
+        """Find a defined response for normalized text: exact, contained, then similar"""
+        # Exact trigger from either schema (responses.<key> or custom/*) - one lookup
+        entry = self.store.find(text)
+        if entry is not None:
+            label = f"✅ Matched: {entry.name}"
+        else:
+            hit = self.trigger_index.best(text)
+            if hit is not None:
+                entry = self.store.get(hit.key)
+                if hit.tier == KEYWORD:
+                    label = f"🎯 Fuzzy match: {hit.key} ('{hit.phrase}')"
+                else:
+                    label = f"✅ Matched: {hit.key}"
+            else:
+                # Spelling (n-gram) and sound (phonetic) similarity, each with its own threshold
+                fuzzy = best_match(text, (self.fuzzy_matcher, self.fuzzy_threshold),
+                                   (self.phonetic_index, self.phonetic_threshold))
+                if fuzzy is None:
+                    return None
+                entry = self.store.get(fuzzy.key)
+                label = f"🎯 Fuzzy match: {fuzzy.key} (~'{fuzzy.phrase}', {fuzzy.method} {fuzzy.score:.2f})"
+
+        return DispatchDecision(RESPONSE, key=entry.name, speech=entry.text, movement=entry.movement,
+                                mouth_movements=entry.mouth_movements, label=label)
+
+    def find_key(self, text: str) -> Optional[str]:
+        """The response raw input resolves to (normalized first, as process_command does)"""
+        decision = self.resolve(normalize_input(text))
+        return decision.key if decision is not None else None
+
+    def match_exact(self, text: str) -> Optional[str]:
+        """A response only if the whole text is its trigger phrase (early dispatch)"""
+        entry = self.store.find(text)
+        return entry.name if entry else None
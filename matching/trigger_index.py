@@ -0,0 +1,143 @@
+"""
+🔎 WORM TRIGGER INDEX
+Aho-Corasick automaton over every response trigger (key phrases, aliases
+and keywords), compiled once when responses load
+One pass over the input finds every trigger it contains, however large
+the library grows; ties resolve by tier, then longest match, then
+earliest position, then library order
+"""
+
+import re
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+# Priority tiers - lower wins
+KEY = 0       # the response key itself ("dance_for_me" -> "dance for me")
+ALIAS = 1     # alternative full phrases ("aliases" in worm_responses.json)
+KEYWORD = 2   # single telling words ("keywords" in worm_responses.json)
+
+
+@dataclass(frozen=True)
+class TriggerHit:
+    """One trigger found in the input"""
+    key: str      # response key
+    phrase: str
+    start: int
+    end: int
+    tier: int
+    order: int    # position of the response in the library
+
+    @property
+    def rank(self) -> Tuple[int, int, int, int]:
+        return (self.tier, -(self.end - self.start), self.start, self.order)
+
+
+def key_phrases(key: str) -> List[str]:
+    """Spoken forms of a response key (as written, and without punctuation)"""
+    written = key.replace("_", " ").lower()
+    spoken = " ".join(re.sub(r"[^a-z0-9' ]+", " ", written).split())
+    return [written] if spoken == written else [written, spoken]
+
+
+class TriggerIndex:
+    """Multi-pattern substring matcher"""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # (phrase, key, tier, order) for every trigger ending at this node
+        self._out: List[List[Tuple[str, str, int, int]]] = [[]]
+        self._compiled = False
+        self.size = 0
+
+    def add(self, phrase: str, key: str, tier: int = KEY, order: int = 0):
+        """Register a trigger (call compile() once everything is added)"""
+        phrase = phrase.lower().strip()
+        if not phrase:
+            return
+        node = 0
+        for char in phrase:
+            nxt = self._goto[node].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        entry = (phrase, key, tier, order)
+        if entry not in self._out[node]:
+            self._out[node].append(entry)
+            self.size += 1
+        self._compiled = False
+
+    def compile(self):
+        """Build failure links breadth-first and merge suffix outputs"""
+        queue = deque()
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            queue.append(child)
+
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+        self._compiled = True
+
+    def find_all(self, text: str) -> List[TriggerHit]:
+        """Every trigger occurrence in the text, in order of where it ends"""
+        if not self._compiled:
+            self.compile()
+
+        hits: List[TriggerHit] = []
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for position, char in enumerate(text.lower()):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for phrase, key, tier, order in out[node]:
+                end = position + 1
+                hits.append(TriggerHit(key, phrase, end - len(phrase), end, tier, order))
+        return hits
+
+    def best(self, text: str) -> Optional[TriggerHit]:
+        """The single winning trigger, or None"""
+        hits = self.find_all(text)
+        return min(hits, key=lambda hit: hit.rank) if hits else None
+
+    def __len__(self) -> int:
+        return self.size
+
+
+def response_triggers(responses: Dict) -> List[Tuple[str, str]]:
+    """(phrase, response key) for every key phrase and alias, without duplicates"""
+    triggers, seen = [], set()
+    for key, entry in responses.get("responses", {}).items():
+        for phrase in key_phrases(key) + list(entry.get("aliases", [])):
+            trigger = (phrase.lower(), key)
+            if trigger not in seen:
+                seen.add(trigger)
+                triggers.append(trigger)
+    return triggers
+
+
+def build_trigger_index(responses: Dict) -> TriggerIndex:
+    """Index every trigger in a worm_responses.json document"""
+    index = TriggerIndex()
+    for order, (key, entry) in enumerate(responses.get("responses", {}).items()):
+        for phrase in key_phrases(key):
+            index.add(phrase, key, KEY, order)
+        for alias in entry.get("aliases", []):
+            index.add(alias, key, ALIAS, order)
+        for keyword in entry.get("keywords", []):
+            index.add(keyword, key, KEYWORD, order)
+    index.compile()
+    return index
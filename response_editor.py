@@ -11,6 +11,7 @@ import sys
 import time
 from typing import Dict, List, Optional
 from config_manager import ConfigManager
+from response_store import KEYED
 from core.audio_controller import AudioController
 
 class ResponseEditor:
@@ -84,30 +85,24 @@ class ResponseEditor:
         print("\n📖 BROWSING RESPONSES")
         print("-" * 30)
         
-        responses = self.config.list_responses()
+        store = self.config.store
         
-        if not responses:
+        if not len(store):
             print("❌ No responses found!")
             return
         
-        for category_name, category_data in responses.items():
+        for category_name in store.categories():
             print(f"\n📁 {category_name.upper()}")
             
-            if isinstance(category_data, dict):
-                # Category has subcategories
-                for subcategory_name, subcategory_responses in category_data.items():
+            subcategory_name = None
+            for entry in store.by_category(category_name):
+                if entry.subcategory != subcategory_name:
+                    subcategory_name = entry.subcategory
                     print(f"  📂 {subcategory_name}")
-                    if isinstance(subcategory_responses, list):
-                        for i, response in enumerate(subcategory_responses):
-                            text = response.get('text', 'No text')[:60]
-                            movement = response.get('movement', 'none')
-                            print(f"    {i+1}. {text}... (movement: {movement})")
-            elif isinstance(category_data, list):
-                # Category is a direct list
-                for i, response in enumerate(category_data):
-                    text = response.get('text', 'No text')[:60]
-                    movement = response.get('movement', 'none')
-                    print(f"  {i+1}. {text}... (movement: {movement})")
+                indent = "    " if subcategory_name else "  "
+                label = f"{entry.key}: " if entry.key else f"{entry.index + 1}. "
+                trigger = f" [trigger: {entry.trigger}]" if entry.trigger and not entry.key else ""
+                print(f"{indent}{label}{entry.text[:60]}... (movement: {entry.movement or 'none'}){trigger}")
     
     def _add_new_response(self):
         """Add a new response to the system"""
@@ -116,7 +111,8 @@ class ResponseEditor:
         
         # Get category
         print("\nAvailable categories:")
-        categories = list(self.config.list_responses().keys())
+        # Keyed "responses" entries are edited with edit_worm_responses.py
+        categories = [cat for cat in self.config.store.categories() if cat != KEYED]
         for i, cat in enumerate(categories):
             print(f"  {i+1}. {cat}")
         print(f"  {len(categories)+1}. Create new category")
@@ -360,16 +356,8 @@ class ResponseEditor:
         
         # Count by category
         print(f"\nBreakdown by category:")
-        for category_name, category_data in self.config.responses.items():
-            count = 0
-            if isinstance(category_data, dict):
-                for subcategory in category_data.values():
-                    if isinstance(subcategory, list):
-                        count += len(subcategory)
-            elif isinstance(category_data, list):
-                count = len(category_data)
-            
-            print(f"  {category_name}: {count} responses")
+        for category_name in self.config.store.categories():
+            print(f"  {category_name}: {len(self.config.store.by_category(category_name))} responses")
     
     def _quit(self):
         """Quit the response editor"""
@@ -0,0 +1,281 @@
+"""
+🗂️ WORM RESPONSE STORE
+One in-memory index over worm_responses.json, shared by both runtimes and
+the editors
+No AI or hardware dependencies
+
+The file holds two schemas side by side:
+    keyed:       "responses": {"dance_for_me": {"speech", "movement", "mouth_movements"}}
+    categorized: "<category>": {"<subcategory>": [{"text", "movement", "emotion", "trigger"}]}
+                 "fallbacks": [{"text", "movement"}]
+
+Entries are indexed by normalized trigger, category and movement, so a
+lookup never walks the document. Trigger collisions follow
+RESPONSE_PRIORITY_SYSTEM.md: defined "responses" entries win over custom
+triggers, and fallbacks are only ever picked when nothing else matched.
+"""
+
+import json
+import os
+import random
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+RESPONSES_FILE = "worm_responses.json"
+
+KEYED = "responses"         # worm_system schema
+FALLBACKS = "fallbacks"     # config_manager's last resort
+NOT_RESPONSES = {"startup_message", "system_messages"}
+
+
+def normalize_trigger(text: str) -> str:
+    """The form triggers are indexed under (matches what Vosk transcribes)"""
+    words = re.sub(r"[^a-z0-9' ]+", " ", text.replace("_", " ").lower())
+    return " ".join(words.split())
+
+
+@dataclass
+class ResponseEntry:
+    """One response, whichever schema it came from"""
+    text: str
+    movement: Optional[str] = None
+    mouth_movements: int = 1
+    trigger: Optional[str] = None       # normalized; None for category-only entries
+    category: str = KEYED
+    subcategory: Optional[str] = None
+    key: Optional[str] = None           # responses.<key> for keyed entries
+    index: Optional[int] = None         # position in its category list otherwise
+    emotion: Optional[str] = None
+    data: Dict = field(default_factory=dict, repr=False)  # the JSON object itself
+
+    @property
+    def name(self) -> str:
+        """Stable identifier: the response key, else the trigger or location"""
+        return self.key or self.trigger or f"{self.category}/{self.subcategory}/{self.index}"
+
+
+class ResponseStore:
+    """Responses file plus trigger, category and movement indexes"""
+
+    def __init__(self, responses_file: str = RESPONSES_FILE):
+        self.responses_file = responses_file
+        self.data: Dict = {}
+        self.entries: List[ResponseEntry] = []
+        self._by_trigger: Dict[str, ResponseEntry] = {}
+        self._by_listed_trigger: Dict[str, ResponseEntry] = {}
+        self._by_category: Dict[str, List[ResponseEntry]] = {}
+        self._by_movement: Dict[str, List[ResponseEntry]] = {}
+        self._by_key: Dict[str, ResponseEntry] = {}
+        self.mtime: Optional[float] = None
+
+    def _current_mtime(self) -> Optional[float]:
+        try:
+            return os.path.getmtime(self.responses_file)
+        except OSError:
+            return None
+
+    def changed(self) -> bool:
+        """Has the file been edited (by anyone else) since it was loaded or saved?"""
+        return self._current_mtime() != self.mtime
+
+    def load(self) -> bool:
+        """Read and index the responses file (the store is left empty on failure)"""
+        self.mtime = self._current_mtime()
+        try:
+            with open(self.responses_file, 'r', encoding='utf-8') as f:
+                self.use(json.load(f))
+            return True
+        except Exception as e:
+            print(f"⚠️  Could not load {self.responses_file}: {e}")
+            self.use({})
+            return False
+
+    def use(self, data: Dict):
+        """Adopt an in-memory document (defaults, imports) and index it"""
+        self.data = data
+        self.reindex()
+
+    def save(self) -> bool:
+        """Write the document back and refresh the indexes"""
+        self.reindex()
+        try:
+            with open(self.responses_file, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, indent=2, ensure_ascii=False)
+            self.mtime = self._current_mtime()
+            return True
+        except Exception as e:
+            print(f"❌ Could not save {self.responses_file}: {e}")
+            return False
+
+    def reindex(self):
+        """Rebuild every index from self.data - call after editing it directly"""
+        entries = []
+        # Defined responses first so they win trigger collisions
+        for key, item in self.data.get(KEYED, {}).items():
+            if isinstance(item, dict):
+                entries.append(ResponseEntry(
+                    text=item.get("speech", ""), movement=item.get("movement"),
+                    mouth_movements=item.get("mouth_movements", 1),
+                    trigger=normalize_trigger(key), key=key, data=item))
+
+        for category, value in self.data.items():
+            if category == KEYED or category in NOT_RESPONSES:
+                continue
+            if isinstance(value, list):
+                entries.extend(self._categorized(category, None, value))
+            elif isinstance(value, dict):
+                for subcategory, items in value.items():
+                    if isinstance(items, list):
+                        entries.extend(self._categorized(category, subcategory, items))
+
+        self.entries = entries
+        self._by_trigger, self._by_category, self._by_movement, self._by_key = {}, {}, {}, {}
+        self._by_listed_trigger = {}
+        for entry in entries:
+            if entry.trigger and entry.category != FALLBACKS:
+                self._by_trigger.setdefault(entry.trigger, entry)
+                if entry.key is None:
+                    self._by_listed_trigger.setdefault(entry.trigger, entry)
+            self._by_category.setdefault(entry.category, []).append(entry)
+            if entry.movement:
+                self._by_movement.setdefault(entry.movement, []).append(entry)
+            if entry.key:
+                self._by_key[entry.key] = entry
+
+    @staticmethod
+    def _categorized(category: str, subcategory: Optional[str], items: List) -> List[ResponseEntry]:
+        entries = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                continue
+            trigger = item.get("trigger")
+            entries.append(ResponseEntry(
+                text=item.get("text", ""), movement=item.get("movement"),
+                mouth_movements=item.get("mouth_movements", 1),
+                trigger=normalize_trigger(trigger) if trigger else None,
+                category=category, subcategory=subcategory, index=index,
+                emotion=item.get("emotion"), data=item))
+        return entries
+
+    # Lookups
+
+    def find(self, text: str, keyed: bool = True) -> Optional[ResponseEntry]:
+        """The response whose trigger is exactly this text (after normalization)
+
+        keyed=False only looks at triggered category entries (custom/*),
+        skipping the responses.<key> schema.
+        """
+        triggers = self._by_trigger if keyed else self._by_listed_trigger
+        return triggers.get(normalize_trigger(text))
+
+    def get(self, key: str) -> Optional[ResponseEntry]:
+        """A keyed response by its key"""
+        return self._by_key.get(key)
+
+    def by_category(self, category: str, subcategory: Optional[str] = None) -> List[ResponseEntry]:
+        entries = self._by_category.get(category, [])
+        if subcategory is None:
+            return list(entries)
+        return [entry for entry in entries if entry.subcategory == subcategory]
+
+    def by_movement(self, movement: str) -> List[ResponseEntry]:
+        return list(self._by_movement.get(movement, []))
+
+    def categories(self) -> List[str]:
+        return list(self._by_category)
+
+    def triggers(self) -> List[str]:
+        """Every normalized trigger, highest priority first"""
+        return list(self._by_trigger)
+
+    def spoken_phrases(self) -> List[str]:
+        """Every trigger, alias and keyword in the form Vosk transcribes it
+
+        The same phrases the trigger index matches, so a recognizer grammar
+        built from them can reach every response.
+        """
+        phrases = list(self._by_trigger)
+        for entry in self.entries:
+            if entry.key is not None:
+                spoken = list(entry.data.get("aliases", [])) + list(entry.data.get("keywords", []))
+                phrases += [normalize_trigger(phrase) for phrase in spoken]
+        return list(dict.fromkeys(phrase for phrase in phrases if phrase))
+
+    def random_fallback(self) -> Optional[ResponseEntry]:
+        fallbacks = self._by_category.get(FALLBACKS)
+        return random.choice(fallbacks) if fallbacks else None
+
+    def system_message(self, name: str, default: str = "") -> str:
+        return self.data.get("system_messages", {}).get(name, default)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    # Edits (each one saves)
+
+    def add_keyed(self, key: str, speech: str, movement: str = "t", mouth_movements: int = 1) -> bool:
+        self.data.setdefault(KEYED, {})[key] = {
+            "speech": speech,
+            "movement": movement,
+            "mouth_movements": mouth_movements,
+        }
+        return self.save()
+
+    def add(self, category: str, subcategory: Optional[str], text: str, movement: str = None,
+            emotion: str = None, trigger: str = None) -> bool:
+        """Append a categorized response (subcategory None for a flat list like fallbacks)"""
+        item = {"text": text, "movement": movement}
+        if emotion is not None:
+            item["emotion"] = emotion
+        if trigger is not None:
+            item["trigger"] = trigger.lower()
+        if subcategory is None:
+            self.data.setdefault(category, []).append(item)
+        else:
+            self.data.setdefault(category, {}).setdefault(subcategory, []).append(item)
+        return self.save()
+
+    def update(self, entry: ResponseEntry, **changes) -> bool:
+        """Edit an entry in place, keeping it in its own schema
+
+        changes: any of text, movement, mouth_movements, trigger (a keyed
+        entry's trigger is its key, so changing it renames the key)
+        """
+        item = entry.data
+        if "text" in changes:
+            item["speech" if entry.key is not None else "text"] = changes["text"]
+        if "movement" in changes:
+            item["movement"] = changes["movement"]
+        if "mouth_movements" in changes:
+            item["mouth_movements"] = changes["mouth_movements"]
+        if "trigger" in changes:
+            if entry.key is None:
+                item["trigger"] = changes["trigger"].lower()
+            else:
+                new_key = changes["trigger"].strip().lower().replace(" ", "_")
+                # Rebuild to keep the library order
+                self.data[KEYED] = {
+                    (new_key if key == entry.key else key): value
+                    for key, value in self.data[KEYED].items()
+                }
+        return self.save()
+
+    def remove(self, entry: ResponseEntry) -> bool:
+        if entry.key is not None:
+            self.data[KEYED].pop(entry.key, None)
+        else:
+            container = self.data[entry.category]
+            if entry.subcategory is not None:
+                container = container[entry.subcategory]
+            # By position - two identical responses must not be confused
+            del container[entry.index]
+        return self.save()
+
+    def remove_at(self, category: str, subcategory: Optional[str], index: int) -> Optional[ResponseEntry]:
+        """Remove the index-th response of a category list; returns it, or None if absent"""
+        matches = [entry for entry in self.by_category(category, subcategory) if entry.index == index]
+        if not matches:
+            return None
+        self.remove(matches[0])
+        return matches[0]
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+🧭 WORM INTENT CLASSIFIER TRAINING
+Cross-validates the local movement-command classifier, measures
+per-input latency, then trains on everything and saves intent_model.npz
+Run again after intent_log.jsonl has collected more API-labeled inputs
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from ai.intent_classifier import (IntentClassifier, training_examples, load_intent_threshold,
+                                  LABELS, CONVERSATION, MODEL_FILE, INTENT_LOG, RESPONSES_FILE)
+
+# Talk about moving, not requests to move - none may trigger a movement locally
+CONVERSATION_CHECKS = [
+    "that was a great dance", "how do you dance", "what is your favorite kind of music",
+    "what is your favorite kind of dirt", "i like your dance", "did you see me dance",
+    "can you dance", "why do worms wiggle", "nice to meet you", "good morning",
+]
+
+
+def cross_validate(texts, labels, folds: int, seed: int, threshold: float) -> dict:
+    """k-fold accuracy, plus how often a confident answer would skip the API"""
+    order = np.random.default_rng(seed).permutation(len(texts))
+    correct = confident = confident_correct = 0
+    per_label = {label: [0, 0] for label in LABELS}  # [correct, total]
+
+    for fold in range(folds):
+        test = set(order[fold::folds].tolist())
+        model = IntentClassifier().fit([texts[i] for i in range(len(texts)) if i not in test],
+                                       [labels[i] for i in range(len(texts)) if i not in test])
+        for i in test:
+            prediction = model.predict(texts[i])
+            hit = prediction.label == labels[i]
+            correct += hit
+            per_label[labels[i]][0] += hit
+            per_label[labels[i]][1] += 1
+            if prediction.confidence >= threshold:
+                confident += 1
+                confident_correct += hit
+
+    return {
+        "examples": len(texts),
+        "folds": folds,
+        "accuracy": correct / len(texts),
+        "local_rate": confident / len(texts),
+        "local_accuracy": confident_correct / confident if confident else None,
+        "per_label_accuracy": {label: (c / n if n else None) for label, (c, n) in per_label.items()},
+    }
+
+
+def check_conversation(model: IntentClassifier, threshold: float) -> list:
+    """CONVERSATION_CHECKS phrasings the model would act on as a movement"""
+    failures = []
+    for text in CONVERSATION_CHECKS:
+        prediction = model.predict(text)
+        if prediction.command is not None and prediction.confidence >= threshold:
+            failures.append({"text": text, "label": prediction.label,
+                             "confidence": round(prediction.confidence, 3)})
+    return failures
+
+
+def measure_latency(model: IntentClassifier, texts, repeats: int) -> dict:
+    timings = []
+    for _ in range(repeats):
+        for text in texts:
+            started = time.perf_counter()
+            model.predict(text)
+            timings.append(time.perf_counter() - started)
+    timings = np.array(timings) * 1000
+    return {
+        "mean_ms": float(timings.mean()),
+        "p99_ms": float(np.percentile(timings, 99)),
+        "max_ms": float(timings.max()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train and evaluate the local intent classifier")
+    parser.add_argument('--responses', default=RESPONSES_FILE, help='Responses file (triggers)')
+    parser.add_argument('--log', default=INTENT_LOG, help='API-labeled inputs (JSON lines)')
+    parser.add_argument('--output', default=MODEL_FILE, help='Where to save the trained model')
+    parser.add_argument('--folds', type=int, default=5, help='Cross-validation folds')
+    parser.add_argument('--threshold', type=float, default=None,
+                        help='Confidence needed to skip the API (default: ai.intent_threshold)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-save', action='store_true', help='Evaluate only')
+    args = parser.parse_args()
+    threshold = args.threshold if args.threshold is not None else load_intent_threshold()
+
+    print("🧭 WORM Intent Classifier", file=sys.stderr)
+    examples = training_examples(args.responses, args.log)
+    texts = [text for text, _ in examples]
+    labels = [label for _, label in examples]
+    print(f"📚 {len(examples)} examples "
+          f"({sum(label != CONVERSATION for label in labels)} commands)", file=sys.stderr)
+
+    report = {"cross_validation": cross_validate(texts, labels, args.folds, args.seed, threshold)}
+
+    started = time.perf_counter()
+    model = IntentClassifier().fit(texts, labels)
+    report["train_seconds"] = time.perf_counter() - started
+    report["latency"] = measure_latency(model, texts, repeats=20)
+    report["conversation_failures"] = check_conversation(model, threshold)
+
+    cv = report["cross_validation"]
+    print(f"✅ Accuracy {cv['accuracy']:.1%}, {cv['local_rate']:.0%} resolved locally, "
+          f"{report['latency']['mean_ms']:.3f} ms per input", file=sys.stderr)
+
+    for failure in report["conversation_failures"]:
+        print(f"❌ \"{failure['text']}\" -> {failure['label']} ({failure['confidence']:.2f})",
+              file=sys.stderr)
+
+    print(json.dumps(report, indent=2))
+
+    if report["conversation_failures"]:
+        print("❌ Conversation would move the worm - model not saved", file=sys.stderr)
+        sys.exit(1)
+
+    if not args.no_save:
+        model.save(args.output)
+        print(f"💾 Model saved to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,41 +7,73 @@ Supports both voice and text input with proper feedback prevention
 
 import os
 import sys
-import json
 import time
 import threading
 import queue
 import serial
-from typing import Optional, Union
+from typing import Optional, Union, Iterable, Iterator
 from openai import OpenAI
 import sounddevice as sd
-from vosk import Model, KaldiRecognizer
-from gtts import gTTS
 import pygame
 from pathlib import Path
-import difflib
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from core.speech_stream import SpeechStream
+from core.audio_workers import AudioWorkerPool
+from core.latency_calibration import load_sync_offsets
+from core.vad import VoiceActivityDetector, load_vad_config
+from core.streaming_recognizer import StreamingRecognizer, EARLY, FINAL
+from core.speech_scheduler import SpeechScheduler, SpeechPriority, Utterance
+from core.grammar import ResponseGrammar, GrammarFallbackRecognizer
+from core.vosk_models import preload_vosk_model
+from core.audio_ring import AudioRingBuffer
+from core.resample import PolyphaseResampler, device_capture_rate
+from core.echo import (PlaybackReference, EchoSuppressor, BargeInDetector,
+                       load_echo_config, capture_time)
+from response_store import ResponseStore
+from ai.intent_classifier import load_intent_classifier, load_intent_threshold, log_example, CONVERSATION
+from ai.response_cache import ResponseCache, load_cache_config, TRANSLATE, CONVERSATION as CHAT_REPLY
+from ai.structured_turn import TurnStream, WormTurn, stream_turn, load_turn_config, COMMAND_GUIDE
+from matching import ResponseResolver, DispatchCache, DispatchDecision, normalize_input, RESPONSE, CHAT
 
 class WormController:
     def __init__(self):
+        self.dispatch_cache = DispatchCache()  # Normalized input -> resolved action
+        # On-box movement translation; GPT only below the confidence threshold
+        self.intent_classifier = load_intent_classifier()
+        self.intent_threshold = load_intent_threshold()
+        self.ai_cache = ResponseCache(load_cache_config())  # Same prompt, same show - one API call
+        self.turn_config = load_turn_config()  # One structured call: action and reply together
         self.load_responses()
+        self.sync_offsets = load_sync_offsets()  # Measured by calibrate_sync.py
+        self.vad = VoiceActivityDetector(load_vad_config())  # Gates silence out of Vosk
         self.setup_openai()
         self.setup_serial()
         self.setup_audio()
+        self.setup_echo_suppression()
         self.input_mode = "text"  # Start with text mode
-        self.is_speaking = False  # Flag to prevent feedback loops
-        self.audio_queue = queue.Queue()
+        self.audio_ring = AudioRingBuffer()  # Bounded capture buffer - drops oldest if we fall behind
+        # Open the mic at its native rate and resample to Vosk's 16 kHz ourselves
+        self.capture_rate = device_capture_rate()
+        self.resampler = PolyphaseResampler(self.capture_rate)
+        self.corrected_inputs = queue.Queue()  # Final transcripts that overrode an early dispatch
+        self.confirmation_done = threading.Event()
+        self.confirmation_done.set()
+        
+    @property
+    def is_speaking(self) -> bool:
+        """True while a line is playing or queued - used to prevent feedback loops"""
+        return self.speech_scheduler.is_speaking()
         
     def load_responses(self):
         """Load all responses from configuration file"""
-        try:
-            with open("worm_responses.json", 'r') as f:
-                self.responses = json.load(f)
+        self.response_store = ResponseStore()
+        if self.response_store.load():
             print("✅ Loaded worm responses from config file")
-        except Exception as e:
-            print(f"⚠️  Could not load worm_responses.json: {e}")
+        else:
             print("🔄 Using default responses")
             # Fallback to default responses
-            self.responses = {
+            self.response_store.use({
                 "startup_message": "Hello there!",
                 "responses": {},
                 "system_messages": {
@@ -52,7 +84,12 @@ class WormController:
                     "ai_brain_needed": "I need my AI brain to work properly!",
                     "thinking_trouble": "I'm having trouble thinking right now!"
                 }
-            }
+            })
+        self.responses = self.response_store.data
+        self.dispatch_cache.invalidate()
+            
+        # Trigger index, n-gram and phonetic matchers over the new library
+        self.resolver = ResponseResolver(self.response_store)
         
     def setup_openai(self):
         """Initialize OpenAI API with robust key loading"""
@@ -141,50 +178,78 @@ class WormController:
             
     def setup_audio(self):
         """Initialize audio components for voice input/output"""
+        self.audio_workers = None
+        self.speech_stream = None  # Stays None without a mixer - speech is printed instead
+        # Everything the worm says goes through one priority queue
+        self.speech_scheduler = SpeechScheduler(self._speak_utterance, self._stop_speech)
+        
         try:
-            # Initialize pygame for audio playback (fast)
-            pygame.mixer.init()
-            print("✅ Audio playback ready")
+            # Initialize pygame for audio playback (fast) - the buffer size is
+            # part of the calibrated output latency
+            pygame.mixer.init(buffer=self.sync_offsets.mixer_buffer)
             
-            # Don't load Vosk model immediately - do it lazily when voice mode is activated
-            self.vosk_model = None
-            self.recognizer = None
-            self.vosk_checked = False  # Flag to avoid repeated checks
+            # Synthesis and MP3 decoding run out of process so they don't
+            # steal the GIL from recognition and mouth-cue timing
+            try:
+                self.audio_workers = AudioWorkerPool()
+                self.speech_stream = SpeechStream(synthesize=self.audio_workers.synthesize_sound)
+            except Exception as e:
+                print(f"⚠️  Audio worker pool unavailable ({e}) - synthesizing in-process")
+                self.audio_workers = None
+                self.speech_stream = SpeechStream()
+            print("✅ Audio playback ready")
             
         except Exception as e:
             print(f"⚠️  Audio setup failed: {e}")
-            self.vosk_model = None
             
+        # The shared Vosk model loads in the background so voice mode is instant
+        self.voice_models = preload_vosk_model()
+        self.response_grammar = None
+        self.recognizer = None
+
+
+    def setup_echo_suppression(self):
+        """Subtract the worm's own voice from the mic so it can listen while talking"""
+        self.playback_reference = PlaybackReference(self.sync_offsets.audio_output_latency)
+        if self.speech_stream is not None:
+            self.playback_reference.attach(self.speech_stream.player)
+        self.echo = EchoSuppressor(self.playback_reference, load_echo_config())
+        self.barge_in = BargeInDetector(self.vad.config, self.echo.config)
 
     def setup_vosk_lazy(self):
-        """Lazy initialization of Vosk model only when needed"""
-        if self.vosk_checked:
-            return self.vosk_model is not None
+        """Get a recognizer on the shared, preloaded Vosk model"""
+        if self.recognizer is not None:
+            return True
             
-        self.vosk_checked = True
-        
-        if not os.path.exists("model"):
-            print("⚠️  Vosk model not found - voice input disabled")
-            print("💡 To enable voice input, download a Vosk model:")
-            print("   wget https://alphacephei.com/vosk/models/vosk-model-small-en-us-0.15.zip")
-            print("   unzip vosk-model-small-en-us-0.15.zip")
-            print("   mv vosk-model-small-en-us-0.15 model")
+        if self.voice_models.wait() is None:
             return False
             
-        try:
-            print("🎤 Loading voice recognition model...")
-            from vosk import Model, KaldiRecognizer
-            self.vosk_model = Model("model")
-            self.recognizer = KaldiRecognizer(self.vosk_model, 16000)
-            print("✅ Voice recognition ready")
-            return True
-        except Exception as e:
-            print(f"❌ Voice model loading failed: {e}")
-            self.vosk_model = None
-            return False
+        self.response_grammar = ResponseGrammar()
+        self.recognizer = self.build_recognizer()
+        print("✅ Voice recognition ready")
+        return True
+
+    def build_recognizer(self) -> GrammarFallbackRecognizer:
+        """Grammar-constrained recognizer; free-form fallback only when AI chat can use it"""
+        grammar_recognizer = self.voice_models.recognizer(grammar=self.response_grammar.phrases)
+        fallback = self.voice_models.recognizer() if self.openai_client else None
+        if fallback is None:
+            print("📜 Listening for known phrases only (no AI fallback)")
+        return GrammarFallbackRecognizer(grammar_recognizer, fallback)
+
+    def refresh_grammar(self):
+        """Rebuild the recognizer if worm_responses.json was edited"""
+        if self.response_grammar.refresh():
+            self.load_responses()
+            self.recognizer = self.build_recognizer()
 
     def translate_to_arduino_command(self, natural_language: str) -> Optional[str]:
-        """Use OpenAI to translate natural language to Arduino commands"""
+        """Translate natural language to an Arduino command - locally if confident, else via OpenAI"""
+        prediction = self.intent_classifier.predict(natural_language)
+        if prediction.confidence >= self.intent_threshold:
+            print(f"🧭 Local intent: {prediction.label} ({prediction.confidence:.2f}, "
+                  f"{prediction.seconds * 1000:.2f} ms)")
+            return prediction.command
         
         if not self.openai_client:
             print("❌ OpenAI not available - use direct commands")
@@ -214,28 +279,42 @@ If this is conversation, questions, or statements (like "how are you", "I love p
 Response:
 """
 
+        valid_commands = ["fl", "fr", "bl", "br", "b", "om", "cm", "t", "d"]
+
+        def clean(reply: str) -> str:
+            # Remove quotes if present
+            return reply.strip().lower().strip('"\'')
+
+        def accept(reply: str) -> bool:
+            # Only called for fresh API replies - cache hits were logged when first answered
+            label = clean(reply)
+            if label == "conversation":
+                log_example(natural_language, CONVERSATION)  # Training data for the local model
+            elif label in valid_commands:
+                log_example(natural_language, label)
+            else:
+                return False
+            return True
+
         try:
-            response = self.openai_client.chat.completions.create(
+            # Temperature 0 - the same input always translates the same way
+            command = clean(self.ai_cache.complete(
+                self.openai_client, TRANSLATE,
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": "You translate commands for a robotic worm."},
                     {"role": "user", "content": prompt}
                 ],
+                accept=accept,
                 temperature=0,
                 max_tokens=10
-            )
-            
-            command = response.choices[0].message.content.strip().lower()
-            
-            # Remove quotes if present
-            command = command.strip('"\'')
+            ))
             
             # Check if this is conversation rather than a command
             if command == "conversation":
                 return None
             
             # Validate command
-            valid_commands = ["fl", "fr", "bl", "br", "b", "om", "cm", "t", "d"]
             if command in valid_commands:
                 return command
             else:
@@ -267,121 +346,233 @@ Response:
             print(f"❌ Serial communication error: {e}")
             return False
 
-    def speak_response(self, text: str, use_mouth=True, mouth_movements=None):
-        """Convert text to speech with controlled mouth movements"""
-        if self.is_speaking:
-            return  # Prevent overlapping speech
-            
-        print(f"🗣️ Speaking: '{text}'")
+    def speak_response(self, text: Union[str, Iterable[str]], use_mouth=True, mouth_movements=None,
+                       priority: SpeechPriority = SpeechPriority.RESPONSE) -> Future:
+        """Queue text (or a stream of text chunks) for speech with controlled mouth movements
+
+        Returns a future resolved once playback has finished (False if it was
+        dropped or cut off by a higher-priority line).
+        """
+        if isinstance(text, str):
+            print(f"🗣️ Speaking: '{text}'")
+        else:
+            print("🗣️ Speaking streamed reply")
+
+        # Legacy behavior - no mouth movement unless requested
+        movements = mouth_movements if use_mouth and mouth_movements is not None else 0
+        return self.speech_scheduler.submit(text, priority, movements)
+
+    def _speak_utterance(self, utterance: Utterance):
+        """Play one scheduled line to completion (runs on the scheduler thread)"""
+        if self.speech_stream is None:
+            # No audio output - text only
+            text = utterance.text if isinstance(utterance.text, str) else "".join(utterance.text)
+            print(f"🔇 (no audio) {text}")
+            return
+
+        # First mouth cue is timed by the stream against the first clause's
+        # play(), shifted by the calibrated audio/servo latency difference
+        cue = None
+        if utterance.mouth_movements > 0:
+            cue = lambda: self.send_to_arduino("t")
             
-        def _speak():
-            try:
-                self.is_speaking = True
-                
-                # Generate audio file with female voice (using gTTS)
-                tts = gTTS(text=text, lang='en', slow=False, tld='com')
-                audio_file = "temp_response.mp3"
-                tts.save(audio_file)
-                
-                # Play audio
-                pygame.mixer.music.load(audio_file)
-                pygame.mixer.music.play()
-                
-                # Controlled mouth movements
-                if use_mouth and mouth_movements is not None:
-                    if mouth_movements == 0:
-                        # No mouth movements - just wait for audio to finish
-                        while pygame.mixer.music.get_busy():
-                            time.sleep(0.1)
-                    elif mouth_movements == 1:
-                        # Single mouth movement
-                        self.send_to_arduino("t")
-                        while pygame.mixer.music.get_busy():
-                            time.sleep(0.1)
-                    else:
-                        # Multiple mouth movements - spread them out during speech
-                        total_duration = 0
-                        movements_sent = 0
-                        
-                        # Send first movement immediately
-                        self.send_to_arduino("t")
-                        movements_sent += 1
-                        
-                        while pygame.mixer.music.get_busy() and total_duration < 10:  # Max 10 seconds
-                            time.sleep(0.5)
-                            total_duration += 0.5
-                            
-                            # Send additional movements at intervals
-                            if movements_sent < mouth_movements and pygame.mixer.music.get_busy():
-                                # Calculate when to send next movement
-                                interval = 3.0 / mouth_movements  # Spread over ~3 seconds
-                                if total_duration >= interval * movements_sent:
-                                    self.send_to_arduino("t")
-                                    movements_sent += 1
-                else:
-                    # Legacy behavior - wait for playback to finish without mouth movement
-                    while pygame.mixer.music.get_busy():
-                        time.sleep(0.1)
-                    
-                # Cleanup
-                if os.path.exists(audio_file):
-                    os.remove(audio_file)
-                
-            except Exception as e:
-                print(f"❌ Speech error: {e}")
-            finally:
-                self.is_speaking = False
-                
-        # Run speech in separate thread to avoid blocking
-        speech_thread = threading.Thread(target=_speak, daemon=True)
-        speech_thread.start()
+        # Stream clauses through gTTS - playback starts after the first clause
+        self.speech_stream.speak(utterance.text, cue=cue, cue_offset=self.sync_offsets.cue_offset)
+        # Preempted while the stream was starting - the scheduler's stop()
+        # may have landed before there was anything to stop
+        if utterance.interrupted:
+            self.speech_stream.stop()
+            return
+        self.speech_stream.wait_for_start()
+        
+        # Overlay the remaining mouth movements during speech (simultaneous with main movement)
+        self._overlay_mouth_movements(utterance.mouth_movements)
+        
+        # Resolved by the playback monitor - callers just wait
+        self.speech_stream.wait()
+
+    def _stop_speech(self):
+        """Cut off the current line (preemption and interrupt())"""
+        if self.speech_stream is not None:
+            self.speech_stream.stop()
+
+    def _overlay_mouth_movements(self, mouth_movements: int):
+        """Send the "t" mouth cues after the first while speech is playing"""
+        if mouth_movements <= 1:
+            return
+
+        # The first cue went out with playback - keep the rest on the same offset
+        if self.speech_stream.wait(max(0.0, self.sync_offsets.cue_offset)):
+            return
+
+        # Spread the rest over ~3 seconds, stopping early if speech ends
+        interval = 3.0 / mouth_movements
+        for _ in range(mouth_movements - 1):
+            if self.speech_stream.wait(interval):
+                break
+            self.send_to_arduino("t")
 
     def get_voice_input(self) -> Optional[str]:
-        """Get voice input using Vosk - only when not speaking"""
-        if not self.vosk_model or self.is_speaking:
+        """Get voice input using Vosk
+
+        Listening continues while the worm talks: its own voice is subtracted
+        from the mic, and sustained speech over it interrupts playback.
+        A stable partial result that is exactly a trigger phrase is returned
+        before Kaldi's endpoint; listening continues in the background and
+        rolls the dispatch back if the final text disagrees.
+        """
+        # Wait for any early-dispatch confirmation, then deliver its correction first
+        self.confirmation_done.wait()
+        try:
+            return self.corrected_inputs.get_nowait()
+        except queue.Empty:
+            pass
+            
+        if self.recognizer is None:
             return None
             
         print("🎤 Listening... (speak now)")
         
-        def audio_callback(indata, frames, time, status):
+        def audio_callback(indata, frames, time_info, status):
             if status:
                 print(f"Audio status: {status}")
-            self.audio_queue.put(bytes(indata))
+            self.audio_ring.write(self.resampler.process(indata),
+                                  capture_time(time_info, frames, self.capture_rate))
 
+        # Drop audio left over from the previous listen
+        self.audio_ring.clear()
+        self.resampler.reset()
+        self.echo.reset()
+            
+        stream = None
+        handed_off = False
         try:
-            with sd.RawInputStream(
-                samplerate=16000, 
-                blocksize=8000, 
+            # 100 ms blocks so partial results update fast enough to beat the endpoint
+            stream = sd.RawInputStream(
+                samplerate=self.capture_rate, 
+                blocksize=self.capture_rate // 10, 
                 dtype='int16',
                 channels=1, 
                 callback=audio_callback
-            ):
-                
-                start_time = time.time()
-                silence_count = 0
+            )
+            stream.start()
+            self.refresh_grammar()
+            streaming = StreamingRecognizer(self.recognizer, self.match_exact_trigger, vad=self.vad)
+            self.vad.reset()
                 
-                while time.time() - start_time < 5:  # 5 second timeout
-                    try:
-                        data = self.audio_queue.get(timeout=0.1)
+            start_time = time.time()
+            silence_count = 0
+            # Audio held back while the worm talks, fed in if the user barges in
+            held = deque(maxlen=(self.echo.config.barge_in_ms + self.vad.config.preroll_ms) // 100 + 1)
+            
+            while time.time() - start_time < 5:  # 5 second timeout
+                data = self.audio_ring.read(timeout=0.1)
+                if data is None:
+                    silence_count += 1
+                    if silence_count > 20:  # Too much silence
+                        break
+                    continue
+                    
+                for block in self._cleaned_blocks(data, held):
+                    event = streaming.accept(block)
+                    if event is None:
+                        continue
+                        
+                    if event.kind == FINAL and event.text:
+                        print(f"🎤 Heard: {event.text}")
+                        return event.text
+                        
+                    if event.kind == EARLY:
+                        print(f"⚡ Early match on partial: {event.text} ({event.elapsed:.2f}s)")
+                        # Keep the stream open to confirm against the final text
+                        self.confirmation_done.clear()
+                        threading.Thread(target=self._confirm_early_dispatch,
+                                         args=(stream, streaming), daemon=True).start()
+                        handed_off = True
+                        return event.text
                         
-                        if self.recognizer.AcceptWaveform(data):
-                            result = json.loads(self.recognizer.Result())
-                            text = result.get("text", "").strip()
-                            
-                            if text:
-                                print(f"🎤 Heard: {text}")
-                                return text
-                                
-                    except queue.Empty:
-                        silence_count += 1
-                        if silence_count > 20:  # Too much silence
-                            break
-                            
         except Exception as e:
             print(f"❌ Voice input error: {e}")
+        finally:
+            if stream is not None and not handed_off:
+                stream.close()
             
         return None
 
+    def _cleaned_blocks(self, data, held: deque) -> list:
+        """Echo-suppress one capture block and decide what reaches the recognizer
+
+        While the worm is talking, cleaned audio is held back so leftover
+        echo is never transcribed; once the barge-in detector hears the
+        user, speech stops and the held audio is released.
+        """
+        cleaned = self.echo.process(data, self.audio_ring.last_read_time)
+        if not cleaned:
+            return []
+            
+        if not self.is_speaking:
+            self.barge_in.reset()
+            held.clear()
+            return [cleaned]
+            
+        if not self.barge_in.update(cleaned):
+            held.append(cleaned)
+            return []
+            
+        self.interrupt_speech()
+        blocks = list(held) + [cleaned]
+        held.clear()
+        return blocks
+
+    def interrupt_speech(self):
+        """The user talked over the worm - stop speaking and moving now"""
+        print("✋ Barge-in - stopping speech")
+        self.stop_speech_and_motion()
+
+    def stop_speech_and_motion(self):
+        """Drop queued lines, cut off playback and return to neutral"""
+        self.speech_scheduler.clear(below=SpeechPriority.SYSTEM)
+        # Through the scheduler, so the cut-off line's future resolves False
+        self.speech_scheduler.interrupt()
+        self.send_to_arduino("b")
+
+    def _confirm_early_dispatch(self, stream, streaming: StreamingRecognizer):
+        """Finish recognizing an early-dispatched utterance and roll back on disagreement"""
+        try:
+            final = None
+            deadline = time.time() + 3.0  # The endpoint follows within the silence window
+            while final is None and time.time() < deadline:
+                data = self.audio_ring.read(timeout=0.1)
+                if data is None:
+                    continue
+                # The early match is already being spoken - keep its echo out
+                data = self.echo.process(data, self.audio_ring.last_read_time)
+                if not data:
+                    continue
+                event = streaming.accept(data)
+                if event is not None and event.kind == FINAL:
+                    final = event
+                    
+            if final is None:
+                final = streaming.finish()
+                
+            if streaming.confirms(final, self.find_response_key):
+                print(f"✅ Confirmed early match: {final.text or streaming.dispatched.text}")
+            else:
+                print(f"↩️  Heard '{final.text}' - rolling back early match '{streaming.dispatched.match}'")
+                self.rollback_early_dispatch()
+                self.corrected_inputs.put(final.text)
+        except Exception as e:
+            print(f"❌ Early dispatch confirmation error: {e}")
+        finally:
+            stream.close()
+            self.confirmation_done.set()
+
+    def rollback_early_dispatch(self):
+        """Undo an action started from a partial result"""
+        self.stop_speech_and_motion()
+        print("🔄 Returned to neutral position")
+
     def get_text_input(self) -> Optional[str]:
         """Get text input from user"""
         try:
@@ -408,8 +599,11 @@ Response:
         if user_input.lower() in ["quit", "exit", "stop"]:
             print("👋 Shutting down...")
             # No main movement for goodbye, just mouth movements
-            self.speak_response_with_overlay(self.responses["system_messages"]["goodbye"], 1)
-            time.sleep(3)  # Give time for speech to complete
+            goodbye_done = self.speak_response_with_overlay(self.responses["system_messages"]["goodbye"], 1, SpeechPriority.SYSTEM)
+            try:
+                goodbye_done.result(timeout=10)  # Let the goodbye finish before shutting down
+            except FutureTimeoutError:
+                print("⚠️  Goodbye still playing - shutting down anyway")
             return False
             
         # Mode switching
@@ -420,192 +614,175 @@ Response:
         if user_input.lower() in ["text", "stop listening", "back to text mode"]:
             self.input_mode = "text"
             print("💬 Switched to TEXT mode")
-            self.speak_response_with_overlay(self.responses["system_messages"]["typing_mode_now"], 1)
+            self.speak_response_with_overlay(self.responses["system_messages"]["typing_mode_now"], 1, SpeechPriority.SYSTEM)
             return True
 
-        # Check all responses for matches
-        response_match = self.check_response_matches(user_input)
-        if response_match:
-            return response_match
+        # Pick up edits to worm_responses.json (this also clears cached decisions)
+        if self.response_store.changed():
+            print("🔄 Responses changed - reloading")
+            self.load_responses()
+            
+        # Check all responses for matches - repeat inputs come straight from the cache
+        decision = self.decide(user_input)
+        if decision.kind == RESPONSE:
+            return self.perform_response(decision)
 
-        # Default: AI Generated Response with t movement
+        # Default: AI decides what to do and what to say
         print(f"🧠 Generating AI response for: {user_input}")
-        conversational_response = self.generate_conversational_response(user_input)
-        print(f"💬 {conversational_response}")
+        return self.respond_with_ai(user_input)
+
+    def respond_with_ai(self, user_input: str) -> bool:
+        """Unmatched input: one structured AI call, else translate then converse"""
+        started = time.time()
+        stream = self.interpret_with_ai(user_input)
+        turn = stream.head() if stream is not None else None
+        if turn is not None:
+            print(f"🧩 AI turn: {turn.intent} ({turn.emotion}) in {time.time() - started:.2f}s")
+            return self.perform_ai_turn(turn, stream)
+
+        # Two-call path: the action (local classifier first), then the reply
+        command = self.translate_to_arduino_command(user_input)
+        if command in ["om", "cm"]:
+            return self.perform_response(DispatchDecision(RESPONSE, key=command, movement=command,
+                                                          label=f"🧭 Command: {command}"))
         
-        # Start t movement, then immediately start speech with mouth overlay
-        self.send_to_arduino("t")
-        self.speak_response_with_overlay(conversational_response, 1)  # Default 1 mouth movement for AI
+        # Start the movement (t by default), then immediately start speech with mouth overlay.
+        # The reply is streamed so speech starts with the first clause.
+        movement = command or "t"
+        self.send_to_arduino(movement)
+        speech_done = self.speak_response_with_overlay(self.stream_conversational_response(user_input), 1, SpeechPriority.CHAT)  # Default 1 mouth movement for AI
         
-        # Return to neutral after AI response
-        time.sleep(1)  # Brief pause before returning to neutral
-        self.send_to_arduino("b")
-        print("🔄 Returned to neutral position")
+        # Return to neutral once the AI response has been spoken
+        if movement != "b":
+            self.return_to_neutral_after(speech_done)
         
         return True
 
-    def check_response_matches(self, user_input: str) -> bool:
-        """Check for any response matches using fuzzy matching"""
-        if "responses" not in self.responses:
-            return False
-            
-        user_input_lower = user_input.lower().strip()
-        
-        # Check for exact key matches or fuzzy matches
-        for response_key, response_data in self.responses["responses"].items():
-            # Convert key to natural language for matching
-            natural_key = response_key.replace("_", " ")
-            
-            # Check if the key phrase is in the user input
-            if natural_key in user_input_lower:
-                speech = response_data["speech"]
-                movement = response_data["movement"]
-                mouth_movements = response_data.get("mouth_movements", 1)  # Default to 1
-                
-                print(f"✅ Matched: {response_key}")
-                
-                # Handle mouth commands specially (no speech, no neutral reset)
-                if movement in ["om", "cm"]:
-                    success = self.send_to_arduino(movement)
-                    if success:
-                        if movement == "om":
-                            print("✅ Mouth opened")
-                        else:
-                            print("✅ Mouth closed")
-                    else:
-                        print("❌ Command failed")
-                        self.speak_response_with_overlay(self.responses["system_messages"]["command_failed"], 1)
-                else:
-                    # For all other movements: start movement, then immediately start speech with mouth overlay
-                    success = self.send_to_arduino(movement)
-                    
-                    if success:
-                        print(f"✅ {speech}")
-                        # Start speech with mouth movements that overlay the main movement
-                        self.speak_response_with_overlay(speech, mouth_movements)
-                        # Return to neutral after both movement and speech complete
-                        if movement != "b":  # Don't send b after b
-                            time.sleep(1)  # Brief pause before returning to neutral
-                            self.send_to_arduino("b")
-                            print("🔄 Returned to neutral position")
-                    else:
-                        print("❌ Command failed")
-                        self.speak_response_with_overlay(self.responses["system_messages"]["command_failed"], 1)
-                
-                return True
-        
-        # Fuzzy matching for your custom responses
-        fuzzy_response = self.find_fuzzy_custom_match(user_input_lower)
-        if fuzzy_response:
-            return fuzzy_response
-            
-        return False
+    def interpret_with_ai(self, user_input: str) -> Optional[TurnStream]:
+        """Intent, Arduino command and reply from one streamed, schema-validated call (None to fall back)"""
+        if not self.openai_client or not self.turn_config.enabled:
+            return None
+        return stream_turn(self.openai_client, self.ai_cache, self._turn_messages(user_input),
+                           self.turn_config)
+
+    def perform_ai_turn(self, turn: WormTurn, stream: TurnStream) -> bool:
+        """Start the turn's movement, then speak its reply while it is still streaming"""
+        movement = turn.command or "t"
+        if not self.send_to_arduino(movement):
+            print("❌ Command failed")
+
+        reply = self._spoken_reply(stream)
+        if movement in ["om", "cm"]:
+            # The mouth holds its new position - speak without talking cues
+            self.speak_response(reply, use_mouth=False, priority=SpeechPriority.CHAT)
+            return True
 
-    def find_fuzzy_custom_match(self, user_input: str) -> bool:
-        """Find fuzzy matches for custom responses"""
-        import difflib
+        speech_done = self.speak_response_with_overlay(reply, turn.mouth_movements, SpeechPriority.CHAT)
+        if movement != "b":
+            self.return_to_neutral_after(speech_done)
+        return True
+
+    def _spoken_reply(self, stream: TurnStream) -> Iterator[str]:
+        """The turn's reply_text as it streams (a stand-in line if none arrives)"""
+        spoken = False
+        for text in stream.reply():
+            spoken = spoken or bool(text.strip())
+            yield text
+        if stream.turn is not None:
+            print(f"💬 {stream.turn.reply_text}")
+        if not spoken:
+            yield self.responses["system_messages"]["thinking_trouble"]
+
+    def decide(self, user_input: str) -> DispatchDecision:
+        """What to do with an input; decisions are cached by normalized input"""
+        normalized = normalize_input(user_input)
+        decision = self.dispatch_cache.get(normalized)
+        if decision is None:
+            decision = self.resolve_response(normalized) or DispatchDecision(CHAT)
+            self.dispatch_cache.put(normalized, decision)
+        return decision
+
+    def resolve_response(self, text: str) -> Optional[DispatchDecision]:
+        """Find a defined response: exact trigger, contained trigger, then spelling/sound similarity"""
+        return self.resolver.resolve(text)
+
+    def perform_response(self, decision: DispatchDecision,
+                         priority: SpeechPriority = SpeechPriority.RESPONSE) -> bool:
+        """Carry out a defined response: movement, then speech with mouth overlay"""
+        print(decision.label)
+        speech = decision.speech
+        movement = decision.movement
+        mouth_movements = decision.mouth_movements
         
-        # Simple keyword matching for your custom responses
-        custom_matches = {
-            "hermaphrodite": "hermaphrodite_fact",
-            "dirt": "what_is_your_favorite_kind_of_dirt?", 
-            "trying": "trying_your_best",
-            "wormin": "really_wormin",
-            "worm": "really_wormin",  # also matches wormin
-            "dad": "do_you_have_something_to_say_to_dad?",
-            "father": "do_you_have_something_to_say_to_dad?",
-            "mariners": "do_you_have_something_to_say_to_dad?"
-        }
+        if not movement:
+            # Custom responses may have no movement - just talk
+            print(f"✅ {speech}")
+            self.speak_response_with_overlay(speech, mouth_movements, priority)
+            return True
         
-        for keyword, response_key in custom_matches.items():
-            if keyword in user_input and response_key in self.responses["responses"]:
-                response_data = self.responses["responses"][response_key]
-                speech = response_data["speech"]
-                movement = response_data["movement"]
-                mouth_movements = response_data.get("mouth_movements", 1)  # Default to 1
-                
-                print(f"🎯 Fuzzy match: {response_key}")
-                
-                # Start movement, then immediately start speech with mouth overlay
-                self.send_to_arduino(movement)
+        # Handle mouth commands specially (no speech, no neutral reset)
+        if movement in ["om", "cm"]:
+            success = self.send_to_arduino(movement)
+            if success:
+                if movement == "om":
+                    print("✅ Mouth opened")
+                else:
+                    print("✅ Mouth closed")
+            else:
+                print("❌ Command failed")
+                self.speak_response_with_overlay(self.responses["system_messages"]["command_failed"], 1, SpeechPriority.SYSTEM)
+        else:
+            # For all other movements: start movement, then immediately start speech with mouth overlay
+            success = self.send_to_arduino(movement)
+            
+            if success:
                 print(f"✅ {speech}")
                 # Start speech with mouth movements that overlay the main movement
-                self.speak_response_with_overlay(speech, mouth_movements)
-                
+                speech_done = self.speak_response_with_overlay(speech, mouth_movements, priority)
                 # Return to neutral after both movement and speech complete
                 if movement != "b":  # Don't send b after b
-                    time.sleep(1)  # Brief pause before returning to neutral
-                    self.send_to_arduino("b")
-                    print("🔄 Returned to neutral position")
-                
-                return True
-                
-        return False
+                    self.return_to_neutral_after(speech_done)
+            else:
+                print("❌ Command failed")
+                self.speak_response_with_overlay(self.responses["system_messages"]["command_failed"], 1, SpeechPriority.SYSTEM)
+        
+        return True
 
-    def speak_response_with_overlay(self, text: str, mouth_movements: int):
-        """Convert text to speech with mouth movements that overlay the main movement"""
-        if self.is_speaking:
-            return  # Prevent overlapping speech
-            
-        print(f"🗣️ Speaking: '{text}' (with {mouth_movements}t overlay)")
+    def find_response_key(self, user_input_lower: str) -> Optional[str]:
+        """Same resolution as process_command, without acting on it
+
+        Bypasses the dispatch cache - confirmations run on their own thread
+        and shouldn't count as cache traffic.
+        """
+        return self.resolver.find_key(user_input_lower)
+
+    def match_exact_trigger(self, text: str) -> Optional[str]:
+        """Return a response only if the whole text is its trigger phrase"""
+        return self.resolver.match_exact(text)
+
+    def return_to_neutral_after(self, speech_done: Future):
+        """Send "b" as soon as speech has finished playing"""
+        def _reset(_):
+            self.send_to_arduino("b")
+            print("🔄 Returned to neutral position")
             
-        def _speak():
-            try:
-                self.is_speaking = True
-                
-                # Generate audio file with female voice (using gTTS)
-                tts = gTTS(text=text, lang='en', slow=False, tld='com')
-                audio_file = "temp_response.mp3"
-                tts.save(audio_file)
-                
-                # Play audio
-                pygame.mixer.music.load(audio_file)
-                pygame.mixer.music.play()
-                
-                # Overlay mouth movements during speech (simultaneous with main movement)
-                if mouth_movements > 0:
-                    if mouth_movements == 1:
-                        # Single mouth movement overlaid immediately
-                        self.send_to_arduino("t")
-                        while pygame.mixer.music.get_busy():
-                            time.sleep(0.1)
-                    else:
-                        # Multiple mouth movements - spread them out during speech
-                        total_duration = 0
-                        movements_sent = 0
-                        
-                        # Send first mouth movement immediately (overlaying main movement)
-                        self.send_to_arduino("t")
-                        movements_sent += 1
-                        
-                        while pygame.mixer.music.get_busy() and total_duration < 10:  # Max 10 seconds
-                            time.sleep(0.5)
-                            total_duration += 0.5
-                            
-                            # Send additional mouth movements at intervals
-                            if movements_sent < mouth_movements and pygame.mixer.music.get_busy():
-                                # Calculate when to send next movement
-                                interval = 3.0 / mouth_movements  # Spread over ~3 seconds
-                                if total_duration >= interval * movements_sent:
-                                    self.send_to_arduino("t")
-                                    movements_sent += 1
-                else:
-                    # No mouth movements - just wait for audio to finish
-                    while pygame.mixer.music.get_busy():
-                        time.sleep(0.1)
-                    
-                # Cleanup
-                if os.path.exists(audio_file):
-                    os.remove(audio_file)
-                
-            except Exception as e:
-                print(f"❌ Speech error: {e}")
-            finally:
-                self.is_speaking = False
-                
-        # Run speech in separate thread to avoid blocking
-        speech_thread = threading.Thread(target=_speak, daemon=True)
-        speech_thread.start()
+        speech_done.add_done_callback(_reset)
+
+    def speak_response_with_overlay(self, text: Union[str, Iterable[str]], mouth_movements: int,
+                                    priority: SpeechPriority = SpeechPriority.RESPONSE) -> Future:
+        """Queue text (or a stream of text chunks) for speech with mouth movements that overlay the main movement
+
+        Lines are never dropped for overlapping: they wait in the speech queue,
+        and a higher priority preempts lower-priority speech. Returns a future
+        resolved once playback has finished, so callers can chain the return
+        to neutral instead of sleeping.
+        """
+        if isinstance(text, str):
+            print(f"🗣️ Speaking: '{text}' (with {mouth_movements}t overlay)")
+        else:
+            print(f"🗣️ Speaking streamed reply (with {mouth_movements}t overlay)")
+
+        return self.speech_scheduler.submit(text, priority, mouth_movements)
 
     def show_help(self):
         """Display help information"""
@@ -656,7 +833,7 @@ MODE SWITCHING:
         print("Type 'help' for more information")
         
         # Initial greeting with mouth movements
-        self.speak_response_with_overlay(self.responses["startup_message"], 2)  # 2 mouth movements for startup
+        self.speak_response_with_overlay(self.responses["startup_message"], 2, SpeechPriority.SYSTEM)  # 2 mouth movements for startup
         
         try:
             while True:
@@ -682,16 +859,34 @@ MODE SWITCHING:
         except KeyboardInterrupt:
             print("\n👋 Interrupted - shutting down...")
         finally:
+            self.speech_scheduler.close()
+            metrics = self.speech_scheduler.get_metrics()
+            print(f"📊 Speech queue: {metrics['spoken']} spoken, {metrics['preempted']} preempted, "
+                  f"{metrics['expired']} expired, max depth {metrics['max_queue_depth']}")
+            if self.vad.total_frames:
+                print(f"📊 Voice activity duty cycle: {self.vad.duty_cycle:.0%}")
+            if self.barge_in.barge_ins:
+                print(f"📊 Barge-ins: {self.barge_in.barge_ins}")
+            cache = self.dispatch_cache.get_metrics()
+            if cache["hits"] + cache["misses"]:
+                print(f"📊 Dispatch cache: {cache['hit_rate']:.0%} hit rate "
+                      f"({cache['hits']} hits, {cache['misses']} misses)")
+            ai_cache = self.ai_cache.get_metrics()
+            if ai_cache["hits"] + ai_cache["misses"]:
+                print(f"📊 AI cache: {ai_cache['hit_rate']:.0%} hit rate "
+                      f"({ai_cache['hits']} API calls saved, {ai_cache['entries']} stored)")
+            self.ai_cache.close()
+            if self.audio_ring.overruns:
+                print(f"📊 Capture overruns: {self.audio_ring.overruns} "
+                      f"({self.audio_ring.dropped_samples / 16000:.1f}s dropped)")
+            if self.audio_workers:
+                self.audio_workers.close()
             if self.arduino:
                 self.arduino.close()
             pygame.mixer.quit()
 
-    def generate_conversational_response(self, user_input: str) -> str:
-        """Use OpenAI to generate natural conversational responses ONLY when no defined response exists"""
-        
-        if not self.openai_client:
-            return self.responses["system_messages"]["ai_brain_needed"]
-        
+    def _conversation_messages(self, user_input: str) -> list:
+        """Build the chat messages for a conversational worm reply"""
         prompt = f"""
 IMPORTANT PRIORITY SYSTEM:
 You are a robotic worm. This function is ONLY called when the user input does NOT match any defined commands or responses. Your job is to generate a fresh conversational response.
@@ -716,27 +911,64 @@ What they said: "{user_input}"
 Generate a worm response (exactly 6 OR 12 syllables):
 """
 
+        return [
+            {"role": "system", "content": "You are a robotic worm with the personality described. Generate responses with exactly 6 or 12 syllables for optimal mouth movement synchronization."},
+            {"role": "user", "content": prompt}
+        ]
+
+    def _turn_messages(self, user_input: str) -> list:
+        """The conversational prompt, with the command guide and JSON reply fields"""
+        messages = self._conversation_messages(user_input)
+        messages[0] = {"role": "system", "content": (
+            "You are a robotic worm. Decide whether the user wants a movement, then reply in "
+            "character with exactly 6 or 12 syllables.\n\n" + COMMAND_GUIDE)}
+        return messages
+
+    def stream_conversational_response(self, user_input: str) -> Iterator[str]:
+        """Stream a conversational reply token by token for the speech pipeline
+
+        The fallback when the structured turn is disabled or invalid.
+        """
+        
+        if not self.openai_client:
+            yield self.responses["system_messages"]["ai_brain_needed"]
+            return
+
+        messages = self._conversation_messages(user_input)
+        cached = self.ai_cache.lookup(CHAT_REPLY, "gpt-4", messages, temperature=0.7, max_tokens=50)
+        if cached is not None:
+            reply = cached.strip().strip('"\'')
+            print(f"💬 {reply} (cached)")
+            yield reply
+            return
+
+        reply = ""
         try:
-            response = self.openai_client.chat.completions.create(
+            stream = self.openai_client.chat.completions.create(
                 model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a robotic worm with the personality described. Generate responses with exactly 6 or 12 syllables for optimal mouth movement synchronization."},
-                    {"role": "user", "content": prompt}
-                ],
+                messages=messages,
                 temperature=0.7,
-                max_tokens=50
+                max_tokens=50,
+                stream=True
             )
             
-            conversational_response = response.choices[0].message.content.strip()
-            
-            # Remove quotes if present
-            conversational_response = conversational_response.strip('"\'')
-                
-            return conversational_response
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                token = chunk.choices[0].delta.content or ""
+                # No quoted replies - cached ones are stripped the same way
+                token = token.replace('"', '')
+                if token:
+                    reply += token
+                    yield token
+                    
+            print(f"💬 {reply.strip()}")
+            self.ai_cache.store(CHAT_REPLY, reply, "gpt-4", messages, temperature=0.7, max_tokens=50)
                 
         except Exception as e:
             print(f"❌ Conversation AI error: {e}")
-            return self.responses["system_messages"]["thinking_trouble"]
+            if not reply:
+                yield self.responses["system_messages"]["thinking_trouble"]
 
 def main():
     """Entry point"""
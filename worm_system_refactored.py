@@ -68,7 +68,8 @@ class WormSystem:
         self.listening = True
         
         # Start continuous listening
-        self.audio.start_continuous_listening(self._handle_voice_input)
+        self.audio.start_continuous_listening(self._handle_voice_input,
+                                              on_barge_in=self.hardware.reset_position)
         
         try:
             while self.running:
@@ -99,17 +100,19 @@ class WormSystem:
         
         # Check for wake word or direct commands
         text_lower = text.lower()
+        # With the wake word spotter on, only speech addressed to the worm gets here
+        addressed = self.audio.wake_word is not None
         
-        if 'worm' in text_lower or any(word in text_lower for word in ['hello', 'hey']):
+        if text_lower in ['quit', 'exit', 'stop']:
+            print("Goodbye!")
+            self.stop()
+        elif addressed or 'worm' in text_lower or any(word in text_lower for word in ['hello', 'hey']):
             # Remove wake word and process
-            processed_text = text_lower.replace('worm', '').strip()
+            processed_text = text_lower.replace('hey worm', '').replace('worm', '').strip()
             if processed_text:
                 self._process_input(processed_text)
             else:
                 self._respond("Yes? How can I help you?")
-        elif text_lower in ['quit', 'exit', 'stop']:
-            print("Goodbye!")
-            self.stop()
     
     def _process_input(self, user_input: str) -> Optional[Dict]:
         """Process user input and generate response (AI-free)"""
@@ -222,7 +225,12 @@ class WormSystem:
             },
             "audio": {
                 "is_speaking": self.audio.is_speaking,
-                "voice_recognition": self.audio.vosk_model is not None,
+                "voice_recognition": self.audio.voice_models.is_loaded(),
+                "voice_model_load_seconds": self.audio.voice_models.load_seconds,
+                "vad_duty_cycle": self.audio.vad.duty_cycle,
+                "capture_overruns": self.audio.audio_ring.overruns,
+                "barge_ins": self.audio.barge_in.barge_ins,
+                "wake_word": self.audio.wake_word.get_metrics() if self.audio.wake_word else None,
                 "tts_functional": True
             },
             "ai": {